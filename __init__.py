@@ -3,24 +3,41 @@ __version__ = "1.0.0"
 __author__ = "Cloud Cost Optimizer Team"
 __description__ = "AI-Powered Cloud Cost Optimizer with LLM-driven recommendations"
 
-from .llm_client import HFInferenceClient
-from .profile_extractor import ProfileExtractor
-from .billing_generator import BillingGenerator
-from .cost_analyzer import CostAnalyzer
-from .validators import (
-    validate_json_structure,
-    validate_profile,
-    validate_billing,
-    validate_recommendations
-)
-
-__all__ = [
-    "HFInferenceClient",
-    "ProfileExtractor",
-    "BillingGenerator",
-    "CostAnalyzer",
-    "validate_json_structure",
-    "validate_profile",
-    "validate_billing",
-    "validate_recommendations"
-]
+import importlib
+
+# Exports are imported on first attribute access, so `import` of the package
+# does not pull in huggingface_hub or numpy until a class is actually used
+_EXPORTS = {
+    "HFInferenceClient": "llm_client",
+    "AsyncHFInferenceClient": "llm_client",
+    "ProfileExtractor": "profile_extractor",
+    "BillingGenerator": "billing_generator",
+    "CostAnalyzer": "cost_analyzer",
+    "RuleBasedRecommender": "recommendation_rules",
+    "BillingFrame": "billing_frame",
+    "CostCube": "cost_cube",
+    "PortfolioAnalyzer": "portfolio",
+    "SyntheticBillingGenerator": "synthetic_billing",
+    "validate_json_structure": "validators",
+    "validate_profile": "validators",
+    "validate_billing": "validators",
+    "validate_recommendations": "validators",
+    "collect_billing_errors": "validators",
+    "collect_recommendation_errors": "validators"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    
+    return sorted(list(globals()) + __all__)
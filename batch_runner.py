@@ -0,0 +1,211 @@
+
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List
+
+from profile_extractor import ProfileExtractor
+from billing_generator import create_billing_generator
+from client_pool import client_pool
+from cost_analyzer import CostAnalyzer
+from instrumentation import export_run, span, stage_summary, start_run
+from prompt_budget import token_usage
+from run_history import RunHistory, history_enabled
+from utils import save_json, save_text
+
+
+def _safe_project_id(raw: str, fallback: str) -> str:
+
+    project_id = re.sub(r"[^A-Za-z0-9_.-]+", "-", (raw or "").strip()).strip("-.")
+    return project_id or fallback
+
+
+def load_descriptions(source: str) -> List[Dict[str, str]]:
+    """Load project descriptions from a directory of text files or a JSONL file.
+
+    Directory: every *.txt / *.md file is one project, named after the file stem.
+    JSONL: one object per line with a "description" and optional "id" or "name".
+    """
+    projects = []
+
+    if os.path.isdir(source):
+        for filename in sorted(os.listdir(source)):
+            stem, ext = os.path.splitext(filename)
+            if ext.lower() not in (".txt", ".md"):
+                continue
+            with open(os.path.join(source, filename), "r", encoding="utf-8") as f:
+                description = f.read().strip()
+            if description:
+                projects.append({"id": _safe_project_id(stem, f"project-{len(projects) + 1}"), "description": description})
+
+    elif os.path.isfile(source):
+        with open(source, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                description = entry.get("description", "") if isinstance(entry, dict) else str(entry)
+                if not description.strip():
+                    continue
+                raw_id = (entry.get("id") or entry.get("name")) if isinstance(entry, dict) else None
+                projects.append({
+                    "id": _safe_project_id(str(raw_id or ""), f"project-{line_no}"),
+                    "description": description.strip()
+                })
+
+    else:
+        raise ValueError(f"Batch input not found: {source}")
+
+    # Disambiguate duplicate ids so outputs never overwrite each other
+    seen = {}
+    for project in projects:
+        count = seen.get(project["id"], 0)
+        seen[project["id"]] = count + 1
+        if count:
+            project["id"] = f"{project['id']}-{count + 1}"
+
+    return projects
+
+
+class BatchRunner:
+    """Run profile -> billing -> analysis for many project descriptions in parallel."""
+
+    def __init__(
+        self,
+        output_dir: str = "batch_outputs",
+        workers: int = 4,
+        budget_threshold: float = 5000,
+        api_key: str = None,
+        model: str = None
+    ):
+
+        self.output_dir = output_dir
+        self.workers = max(1, int(workers))
+
+        # Stage objects are shared across workers (the clients are thread-safe)
+        self.extractor = ProfileExtractor(api_key=api_key, model=model)
+        self.generator = create_billing_generator(api_key=api_key, model=model)
+        self.analyzer = CostAnalyzer(api_key=api_key, model=model, budget_threshold=budget_threshold)
+        self.history = RunHistory() if history_enabled() else None
+
+    def run(self, projects: List[Dict[str, str]]) -> Dict[str, Any]:
+
+        started = time.time()
+        results = []
+        start_run()
+
+        print(f"\nRunning batch analysis for {len(projects)} projects with {self.workers} workers...")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._run_project, project): project for project in projects}
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                mark = "✓" if result["status"] == "ok" else "✗"
+                detail = "" if result["status"] == "ok" else f" ({result['stage']}: {result['error']})"
+                print(f"{mark} [{len(results)}/{len(projects)}] {result['id']} {result['duration_seconds']:.1f}s{detail}")
+
+        elapsed = time.time() - started
+        summary = self._summarize(results, elapsed)
+        save_json(summary, os.path.join(self.output_dir, "batch_summary.json"))
+        export_run(self.output_dir)
+        self._print_summary(summary)
+        return summary
+
+    def _run_project(self, project: Dict[str, str]) -> Dict[str, Any]:
+
+        project_dir = os.path.join(self.output_dir, project["id"])
+        started = time.time()
+        stage = "profile"
+
+        with span("project", id=project["id"]) as project_span:
+            try:
+                save_text(project["description"], os.path.join(project_dir, "project_description.txt"))
+
+                profile = self.extractor.extract(project["description"])
+                save_json(profile, os.path.join(project_dir, "project_profile.json"))
+
+                stage = "billing"
+                billing = self.generator.generate(profile)
+                save_json(billing, os.path.join(project_dir, "mock_billing.json"))
+
+                stage = "analysis"
+                report = self.analyzer.analyze(profile, billing)
+                save_json(report, os.path.join(project_dir, "cost_optimization_report.json"))
+                if self.history:
+                    self.history.record_run(profile, report, billing, project=project["id"])
+
+                return {
+                    "id": project["id"],
+                    "status": "ok",
+                    "stage": None,
+                    "error": None,
+                    "duration_seconds": round(time.time() - started, 3),
+                    "total_monthly_cost": report.get("analysis", {}).get("total_monthly_cost"),
+                    "total_potential_savings": report.get("summary", {}).get("total_potential_savings")
+                }
+
+            except Exception as e:
+                project_span.status = "error"
+                project_span.error = str(e)
+                return {
+                    "id": project["id"],
+                    "status": "failed",
+                    "stage": stage,
+                    "error": str(e),
+                    "duration_seconds": round(time.time() - started, 3)
+                }
+
+    def _summarize(self, results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+
+        succeeded = [r for r in results if r["status"] == "ok"]
+        failed = [r for r in results if r["status"] != "ok"]
+        durations = sorted(r["duration_seconds"] for r in results)
+
+        failures_by_stage = {}
+        for r in failed:
+            failures_by_stage[r["stage"]] = failures_by_stage.get(r["stage"], 0) + 1
+
+        return {
+            "total_projects": len(results),
+            "succeeded": len(succeeded),
+            "failed": len(failed),
+            "workers": self.workers,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_per_minute": round(len(results) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "mean_project_seconds": round(sum(durations) / len(durations), 3) if durations else 0.0,
+            "max_project_seconds": durations[-1] if durations else 0.0,
+            "failures_by_stage": failures_by_stage,
+            "token_usage": token_usage(),
+            "client_pool": client_pool().stats(),
+            "stages": stage_summary(),
+            "results": sorted(results, key=lambda r: r["id"])
+        }
+
+    def _print_summary(self, summary: Dict[str, Any]):
+
+        print("\n" + "-"*40)
+        print("BATCH SUMMARY")
+        print("-"*40)
+        print(f"Projects:      {summary['total_projects']}")
+        print(f"Succeeded:     {summary['succeeded']}")
+        print(f"Failed:        {summary['failed']}")
+        for stage, count in summary["failures_by_stage"].items():
+            print(f"  - {stage}: {count}")
+        print(f"Elapsed:       {summary['elapsed_seconds']:.1f}s")
+        print(f"Throughput:    {summary['throughput_per_minute']:.1f} projects/min")
+        print(f"Mean latency:  {summary['mean_project_seconds']:.1f}s per project")
+        for stage, usage in summary["token_usage"].items():
+            print(f"Tokens ({stage}): ~{usage['prompt_tokens']} prompt / ~{usage['completion_tokens']} completion")
+        pool = summary["client_pool"]
+        print(f"Clients:       {pool['created']} created, {pool['reused']} reused")
+        for stage, entry in summary["stages"].items():
+            if stage != "project":
+                print(
+                    f"Stage {stage}: {entry['runs']} runs, {entry['total_seconds']:.1f}s, "
+                    f"{entry.get('attempts', 0)} LLM calls, {entry.get('retries', 0)} retries"
+                )
+        print(f"\nOutputs written to {self.output_dir}/")
@@ -0,0 +1,146 @@
+
+"""Startup benchmark: import time of the CLI and of the report-only commands.
+
+Each sample runs in a fresh interpreter. The check fails (exit code 1) when the
+median exceeds the budget, or when viewing/exporting a saved report imports any
+of the LLM/HTTP modules.
+
+    python benchmarks/import_time.py [--runs 7] [--max-ms 200] [--top 10]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the report-only commands (menu options 3 and 4) must never load
+FORBIDDEN_MODULES = (
+    "huggingface_hub",
+    "requests",
+    "httpx",
+    "aiohttp",
+    "llm_client",
+    "profile_extractor",
+    "billing_generator",
+    "cost_analyzer"
+)
+
+SAMPLE_REPORT = {
+    "analysis": {"total_monthly_cost": 42000.0, "budget": 50000.0, "budget_variance": -8000.0, "is_over_budget": False},
+    "summary": {"total_potential_savings": 6300.0, "savings_percentage": 15.0, "recommendations_count": 1},
+    "recommendations": [{
+        "title": "Right-size compute",
+        "service": "EC2",
+        "potential_savings": 6300.0,
+        "recommendation_type": "right_sizing",
+        "implementation_effort": "low",
+        "risk_level": "low"
+    }]
+}
+
+# Runs inside the child interpreter, in a scratch directory holding a saved report
+CHILD_SCRIPT = """
+import contextlib, io, json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import cost_optimizer
+imported = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    optimizer = cost_optimizer.CloudCostOptimizer()
+    optimizer._menu_view_recommendations()
+    optimizer._menu_export_report()
+done = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "report_ms": (done - start) * 1000,
+    "forbidden": sorted(m for m in {forbidden!r} if m in sys.modules)
+}}))
+"""
+
+
+def _run_child(workdir: str) -> dict:
+    
+    code = CHILD_SCRIPT.format(root=ROOT, forbidden=FORBIDDEN_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=workdir,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _slowest_imports(workdir: str, top: int) -> list:
+    """(cumulative_us, module) for the slowest imports according to -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {ROOT!r}); import cost_optimizer"],
+        cwd=workdir,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)", line)
+        if not match:
+            continue
+        if match.group(3) == "site":
+            # Interpreter startup (site, .pth hooks) is not ours to optimize
+            rows = []
+            continue
+        rows.append((int(match.group(2)), match.group(3)))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None) -> int:
+    
+    parser = argparse.ArgumentParser(description="Measure CLI startup and report-only import cost")
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters to sample (default: 7)")
+    parser.add_argument("--max-ms", type=float, default=200.0, help="Budget for the median report path in ms")
+    parser.add_argument("--top", type=int, default=10, help="Show the N slowest imports (0 to skip)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        os.makedirs(os.path.join(workdir, "sample_outputs"))
+        with open(os.path.join(workdir, "sample_outputs", "cost_optimization_report.json"), "w") as f:
+            json.dump(SAMPLE_REPORT, f)
+        
+        samples = [_run_child(workdir) for _ in range(max(1, args.runs))]
+        slowest = _slowest_imports(workdir, args.top) if args.top else []
+    
+    forbidden = sorted({m for sample in samples for m in sample["forbidden"]})
+    results = {
+        "runs": len(samples),
+        "import_ms_median": round(statistics.median(s["import_ms"] for s in samples), 2),
+        "report_ms_median": round(statistics.median(s["report_ms"] for s in samples), 2),
+        "max_ms": args.max_ms,
+        "forbidden_imports": forbidden,
+        "slowest_imports": [{"module": module, "cumulative_ms": round(us / 1000, 2)} for us, module in slowest]
+    }
+    ok = not forbidden and results["report_ms_median"] <= args.max_ms
+    results["ok"] = ok
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"import cost_optimizer:  {results['import_ms_median']:.1f} ms (median of {len(samples)})")
+        print(f"view + export report:   {results['report_ms_median']:.1f} ms (budget {args.max_ms:.0f} ms)")
+        if slowest:
+            print("\nSlowest imports (cumulative):")
+            for row in results["slowest_imports"]:
+                print(f"  {row['cumulative_ms']:8.2f} ms  {row['module']}")
+        if forbidden:
+            print(f"\n✗ Report-only commands imported: {', '.join(forbidden)}")
+        print("\n✓ Startup within budget" if ok else "\n✗ Startup regression")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+
+"""End-to-end load test against the offline fake inference server.
+
+Runs N full analyses (profile -> billing -> recommendations) with C concurrent
+workers through the real stages, HFInferenceClient and HTTP stack, and reports
+throughput plus p50/p95/p99 latency per stage. No HuggingFace quota is used.
+
+    python benchmarks/load_test.py --analyses 50 --concurrency 8 --latency lognormal:0.3,0.5 --overload 0.05
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_inference_server import FakeInferenceServer
+from prompt_budget import percentiles
+
+STAGE_NAMES = ("profile", "billing", "recommendations")
+
+PRODUCTS = ["food delivery app", "e-learning platform", "fintech dashboard", "IoT telemetry service", "travel booking site"]
+STACKS = [
+    ("React", "Node.js", "PostgreSQL"),
+    ("Angular", "Django", "MySQL"),
+    ("Vue", "FastAPI", "MongoDB"),
+    ("Next.js", "Spring Boot", "PostgreSQL")
+]
+
+
+def make_descriptions(count: int) -> List[str]:
+    """Varied but deterministic project descriptions."""
+    descriptions = []
+    for i in range(count):
+        frontend, backend, database = STACKS[i % len(STACKS)]
+        descriptions.append(
+            f"{PRODUCTS[i % len(PRODUCTS)].capitalize()} #{i + 1} for {(i % 9 + 1) * 5000:,} users "
+            f"with a ₹{(i % 7 + 3) * 10000:,} monthly budget. Built with {frontend}, {backend} and {database}, "
+            f"behind Nginx on AWS. Needs high availability and low latency."
+        )
+    return descriptions
+
+
+def _run_analysis(stages: Dict[str, Any], description: str) -> Dict[str, Any]:
+
+    timings = {}
+    stage = "profile"
+    started = time.perf_counter()
+    try:
+        begin = time.perf_counter()
+        profile = stages["profile"].extract(description)
+        timings["profile"] = time.perf_counter() - begin
+
+        stage = "billing"
+        begin = time.perf_counter()
+        billing = stages["billing"].generate(profile)
+        timings["billing"] = time.perf_counter() - begin
+
+        stage = "recommendations"
+        begin = time.perf_counter()
+        stages["recommendations"].analyze(profile, billing)
+        timings["recommendations"] = time.perf_counter() - begin
+
+        return {"status": "ok", "timings": timings, "total": time.perf_counter() - started}
+    except Exception as e:
+        return {"status": "failed", "stage": stage, "error": str(e), "timings": timings, "total": time.perf_counter() - started}
+
+
+def _latency_summary(samples: List[float]) -> Dict[str, float]:
+
+    if not samples:
+        return {"count": 0}
+    summary = {"count": len(samples), "mean": round(sum(samples) / len(samples), 4)}
+    summary.update(percentiles([round(s, 4) for s in samples], points=(50, 95, 99)))
+    return summary
+
+
+def run_load_test(
+    analyses: int = 20,
+    concurrency: int = 4,
+    stream: bool = False,
+    server_options: Dict[str, Any] = None,
+    backoff_base: float = 0.05
+) -> Dict[str, Any]:
+    """Start a fake server, drive the analyses against it and return the results."""
+    from billing_generator import BillingGenerator
+    from client_pool import client_pool
+    from cost_analyzer import CostAnalyzer
+    from profile_extractor import ProfileExtractor
+
+    # Every request must reach the server, and retries should not sleep for real-world backoff times
+    os.environ["LLM_CACHE_DISABLED"] = "1"
+    os.environ["LLM_BACKOFF_BASE"] = str(backoff_base)
+
+    with FakeInferenceServer(**(server_options or {})) as server:
+        options = {"api_key": "offline-load-test", "model": server.url}
+        stages = {
+            "profile": ProfileExtractor(extraction_mode="llm", stream=stream, **options),
+            "billing": BillingGenerator(stream=stream, **options),
+            "recommendations": CostAnalyzer(recommendation_mode="llm", stream=stream, **options)
+        }
+
+        descriptions = make_descriptions(analyses)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            results = list(pool.map(lambda d: _run_analysis(stages, d), descriptions))
+        elapsed = time.perf_counter() - started
+        server_stats = server.stats()
+
+    succeeded = [r for r in results if r["status"] == "ok"]
+    failures_by_stage = {}
+    for r in results:
+        if r["status"] != "ok":
+            failures_by_stage[r["stage"]] = failures_by_stage.get(r["stage"], 0) + 1
+
+    return {
+        "analyses": len(results),
+        "concurrency": concurrency,
+        "stream": stream,
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "failures_by_stage": failures_by_stage,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(len(results) / elapsed, 3) if elapsed > 0 else 0.0,
+        "latency_seconds": {
+            **{name: _latency_summary([r["timings"][name] for r in results if name in r["timings"]]) for name in STAGE_NAMES},
+            "total": _latency_summary([r["total"] for r in succeeded])
+        },
+        "server": server_stats,
+        "client_pool": client_pool().stats(),
+        "errors": sorted({r["error"] for r in results if r["status"] != "ok"})[:10]
+    }
+
+
+def _print_results(results: Dict[str, Any]):
+
+    print("\n" + "-"*40)
+    print("LOAD TEST")
+    print("-"*40)
+    print(f"Analyses:      {results['analyses']} ({results['concurrency']} concurrent, stream={results['stream']})")
+    print(f"Succeeded:     {results['succeeded']}")
+    print(f"Failed:        {results['failed']}")
+    for stage, count in results["failures_by_stage"].items():
+        print(f"  - {stage}: {count}")
+    print(f"Elapsed:       {results['elapsed_seconds']:.2f}s")
+    print(f"Throughput:    {results['throughput_per_second']:.2f} analyses/s")
+    print(f"\n{'stage':<16}{'p50':>9}{'p95':>9}{'p99':>9}{'mean':>9}")
+    for stage, summary in results["latency_seconds"].items():
+        if summary["count"]:
+            print(f"{stage:<16}{summary['p50']:>8.3f}s{summary['p95']:>8.3f}s{summary['p99']:>8.3f}s{summary['mean']:>8.3f}s")
+    server = results["server"]
+    print(
+        f"\nServer: {sum(server['requests'].values())} requests over {server['connections']} connections; "
+        f"injected {server['rate_limited']} rate limits, {server['overloaded']} overloads, "
+        f"{server['malformed']} malformed, {server['invalid']} invalid"
+    )
+
+
+def main(argv=None) -> int:
+
+    parser = argparse.ArgumentParser(description="Load-test the full pipeline against an offline fake inference server")
+    parser.add_argument("--analyses", type=int, default=20, help="Full analyses to run (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent analyses (default: 4)")
+    parser.add_argument("--stream", action="store_true", help="Stream completions")
+    parser.add_argument("--latency", default="lognormal:0.2,0.5", help='Server latency, e.g. "fixed:0.1" or "uniform:0.1,0.5"')
+    parser.add_argument("--stage-latency", action="append", default=[], metavar="STAGE=SPEC",
+                        help='Per-stage latency override, e.g. "billing=lognormal:0.8,0.4" (repeatable)')
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--overload", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--malformed", type=float, default=0.0, help="Fraction of completions with unparseable JSON")
+    parser.add_argument("--invalid", type=float, default=0.0, help="Fraction of completions failing validation")
+    parser.add_argument("--retry-after", type=float, default=0.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", metavar="PATH", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    server_options = {
+        "latency": args.latency,
+        "stage_latency": dict(item.split("=", 1) for item in args.stage_latency),
+        "rate_limit_rate": args.rate_limit,
+        "overload_rate": args.overload,
+        "malformed_rate": args.malformed,
+        "invalid_rate": args.invalid,
+        "retry_after": args.retry_after,
+        "seed": args.seed
+    }
+    results = run_load_test(args.analyses, args.concurrency, stream=args.stream, server_options=server_options)
+    _print_results(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results written to {args.json}")
+    return 0 if results["succeeded"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
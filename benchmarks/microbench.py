@@ -0,0 +1,299 @@
+
+"""Microbenchmarks for the CPU-bound paths: metrics, validators, response parsing, JSON I/O and the HTML report.
+
+Each case runs over parameterized input sizes, fully offline, and the results
+are written as JSON. Pass a previous results file as --baseline to fail on
+regressions:
+
+    python benchmarks/microbench.py --preset quick --output bench.json
+    python benchmarks/microbench.py --preset quick --baseline bench.json --threshold 0.25
+    python benchmarks/microbench.py --preset full     # 10 .. 10M billing records, 10 .. 10k recommendations
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PRESETS = {
+    "quick": {"records": [10, 1000, 100000], "recommendations": [10, 1000]},
+    "full": {"records": [10, 1000, 100000, 1000000, 10000000], "recommendations": [10, 100, 1000, 10000]}
+}
+
+PROFILE = {
+    "name": "Benchmark Project",
+    "budget_inr_per_month": 50000,
+    "description": "Food delivery app with web and mobile clients.",
+    "tech_stack": {"frontend": "React", "backend": "Node.js", "database": "PostgreSQL", "proxy": "Nginx", "hosting": "AWS"},
+    "non_functional_requirements": ["high availability", "low latency"]
+}
+
+PROFILE_DESCRIPTION = (
+    "We are building a food delivery app with web and mobile clients. Budget is ₹50,000 per month. "
+    "React frontend, Node.js backend on PostgreSQL behind Nginx, hosted on AWS. "
+    "We need high availability and low latency at lunch-hour peaks."
+)
+
+
+def measure(fn: Callable[[], Any], min_time: float = 0.2, max_runs: int = 10) -> Dict[str, Any]:
+    """Run fn until at least 3 runs and min_time have passed (one run is enough for slow cases)."""
+    timings = []
+    gc.collect()
+    while True:
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+        total = sum(timings)
+        if len(timings) >= max_runs or (len(timings) >= 3 and total >= min_time) or total >= min_time * 10:
+            break
+    return {
+        "runs": len(timings),
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "max_s": max(timings)
+    }
+
+
+def make_recommendations(count: int) -> Dict[str, Any]:
+
+    services = ["Compute", "Database", "Storage", "CDN", "Networking", "Monitoring"]
+    recommendations = [{
+        "title": f"Recommendation {i}",
+        "service": services[i % len(services)],
+        "current_cost": 1000.0 + i,
+        "potential_savings": 100.0 + i % 50,
+        "recommendation_type": "Right-sizing",
+        "description": "Reduce instance size based on observed utilization.",
+        "implementation_effort": ("low", "medium", "high")[i % 3],
+        "risk_level": ("low", "medium", "high")[(i + 1) % 3],
+        "steps": ["Review usage", "Apply the change", "Monitor costs"],
+        "cloud_providers": ["AWS", "Azure", "GCP"]
+    } for i in range(count)]
+    savings = sum(r["potential_savings"] for r in recommendations)
+
+    return {
+        "analysis": {
+            "total_monthly_cost": 48000.0,
+            "budget": 50000,
+            "budget_variance": -2000.0,
+            "is_over_budget": False,
+            "service_costs": {s: 8000.0 for s in services},
+            "high_cost_services": {s: 8000.0 for s in services[:5]}
+        },
+        "recommendations": recommendations,
+        "summary": {
+            "total_potential_savings": savings,
+            "savings_percentage": round(savings / 48000 * 100, 2),
+            "recommendations_count": count,
+            "high_impact_recommendations": count // 3
+        }
+    }
+
+
+class MicroBenchmarks:
+    """Builds inputs once per size and times every case against them."""
+
+    def __init__(self, max_list_records: int = 1000000, max_json_records: int = 1000000, min_time: float = 0.2):
+
+        from synthetic_billing import SyntheticBillingGenerator
+
+        self.max_list_records = max_list_records
+        self.max_json_records = max_json_records
+        self.min_time = min_time
+        self.generator = SyntheticBillingGenerator(seed=7)
+        self.results = []
+
+    def _record(self, name: str, size: int, fn: Callable[[], Any] = None, skip: str = None):
+
+        if skip:
+            result = {"name": name, "size": size, "skipped": skip}
+            print(f"  {name:<32}{size:>10,}   skipped ({skip})")
+        else:
+            result = {"name": name, "size": size, **measure(fn, self.min_time)}
+            result["per_item_us"] = round(result["median_s"] / max(size, 1) * 1e6, 4)
+            print(f"  {name:<32}{size:>10,}   {result['median_s'] * 1000:>10.3f} ms  ({result['runs']} runs)")
+        self.results.append(result)
+
+    def billing_cases(self, size: int):
+
+        from billing_generator import BillingGenerator
+        from cost_analyzer import CostAnalyzer
+        from utils import load_json, save_json
+        from validators import collect_billing_errors, validate_billing
+
+        analyzer = CostAnalyzer(recommendation_mode="rules")
+        frame = self.generator.generate_frame(PROFILE, size, with_desc=size <= self.max_list_records)
+        self._record("calculate_metrics[frame]", size, lambda: analyzer._calculate_metrics(frame, PROFILE))
+        self._record("validate_billing[frame]", size, lambda: validate_billing(frame, None, None))
+
+        too_big = f"over --max-list-records {self.max_list_records:,}" if size > self.max_list_records else None
+        records = frame.to_records() if not too_big else None
+        self._record("calculate_metrics[records]", size, lambda: analyzer._calculate_metrics(records, PROFILE), too_big)
+        self._record("validate_billing[records]", size, lambda: validate_billing(records, None, None), too_big)
+        if records is not None:
+            # 1% of records broken so the collecting validator has work to report
+            broken = [dict(r) for r in records]
+            for record in broken[::100]:
+                record["cost_inr"] = "n/a"
+        self._record("collect_billing_errors", size, lambda: collect_billing_errors(broken), too_big)
+
+        too_big = too_big or (f"over --max-json-records {self.max_json_records:,}" if size > self.max_json_records else None)
+        path = f"billing_{size}.json"
+        text = json.dumps(records) if not too_big else None
+        self._record("save_json[billing]", size, lambda: save_json(records, path), too_big)
+        self._record("save_json[billing,compact]", size, lambda: save_json(records, path, compact=True), too_big)
+        self._record("load_json[billing]", size, lambda: load_json(path), too_big)
+
+        parser = BillingGenerator(api_key="offline-benchmark", model="offline-benchmark")
+        wrapped = f"Here are the records:\n```json\n{text}\n```" if text is not None else None
+        self._record("parse_response[billing]", size, lambda: parser._parse_response(wrapped), too_big)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def recommendation_cases(self, size: int):
+
+        from cost_analyzer import CostAnalyzer
+        from cost_optimizer import CloudCostOptimizer
+        from utils import load_json, save_json
+        from validators import collect_recommendation_errors, validate_recommendations
+
+        report = make_recommendations(size)
+        text = json.dumps(report, indent=2)
+        analyzer = CostAnalyzer(recommendation_mode="rules")
+        optimizer = CloudCostOptimizer.__new__(CloudCostOptimizer)
+        optimizer.cost_report = report
+        optimizer.billing_data = None
+        optimizer.report_page_size = 50
+
+        self._record("validate_recommendations", size, lambda: validate_recommendations(report, None, None))
+        self._record("collect_recommendation_errors", size, lambda: collect_recommendation_errors(report))
+        self._record("parse_response[recommendations]", size, lambda: analyzer._parse_response("Sure!\n" + text))
+        # Cut mid-element, as when the model hits max_tokens
+        truncated = text[:int(len(text) * 0.9)]
+        self._record("parse_response[truncated]", size, lambda: analyzer._parse_response(truncated))
+        self._record("save_json[report]", size, lambda: save_json(report, "report.json"))
+        self._record("save_json[report,compact]", size, lambda: save_json(report, "report.json", compact=True))
+        self._record("load_json[report]", size, lambda: load_json("report.json"))
+        self._record("generate_html_report", size, optimizer._generate_html_report)
+
+    def profile_cases(self):
+
+        from profile_extractor import ProfileExtractor
+        from validators import validate_profile
+
+        extractor = ProfileExtractor(api_key="offline-benchmark", model="offline-benchmark")
+        text = "Here is the profile:\n```json\n" + json.dumps(PROFILE, indent=2) + "\n```\nLet me know if you need changes."
+        self._record("validate_profile", 1, lambda: validate_profile(PROFILE))
+        self._record("parse_response[profile]", 1, lambda: extractor._parse_response(text))
+        self._record("extract_profile[rules]", 1, lambda: extractor.rules.extract(PROFILE_DESCRIPTION))
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], threshold: float, min_delta: float) -> List[Dict[str, Any]]:
+    """Cases whose median got slower than baseline by more than threshold (and min_delta seconds)."""
+    previous = {(r["name"], r["size"]): r for r in baseline if "median_s" in r}
+    regressions = []
+    for result in results:
+        before = previous.get((result["name"], result["size"]))
+        if before is None or "median_s" not in result:
+            continue
+        ratio = result["median_s"] / before["median_s"] if before["median_s"] else float("inf")
+        result["baseline_median_s"] = before["median_s"]
+        result["ratio"] = round(ratio, 3)
+        if ratio > 1 + threshold and result["median_s"] - before["median_s"] > min_delta:
+            regressions.append(result)
+    return regressions
+
+
+def _sizes(value: str) -> List[int]:
+
+    return [int(float(part)) for part in value.split(",") if part.strip()]
+
+
+def main(argv=None) -> int:
+
+    parser = argparse.ArgumentParser(description="Offline microbenchmarks for the CPU-bound hot paths")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--records", type=_sizes, help="Billing record counts, e.g. 10,1000,1e6 (overrides the preset)")
+    parser.add_argument("--recommendations", type=_sizes, help="Recommendation counts (overrides the preset)")
+    parser.add_argument("--only", help="Comma-separated substrings; run only matching case groups (billing, recommendations, profile)")
+    parser.add_argument("--max-list-records", type=int, default=1000000, help="Largest size for list-of-dict cases")
+    parser.add_argument("--max-json-records", type=int, default=1000000, help="Largest size for JSON text cases")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds spent per case")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the results")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    # Stages are only constructed for their parsers; nothing is sent anywhere
+    os.environ.setdefault("LLM_CACHE_DISABLED", "1")
+    preset = PRESETS[args.preset]
+    record_sizes = args.records or preset["records"]
+    recommendation_sizes = args.recommendations or preset["recommendations"]
+    groups = [g.strip() for g in args.only.split(",")] if args.only else ["billing", "recommendations", "profile"]
+    output = os.path.abspath(args.output)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    bench = MicroBenchmarks(args.max_list_records, args.max_json_records, args.min_time)
+    started = time.time()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        # save_json/load_json and the HTML report touch the disk; keep that out of the repo
+        os.chdir(workdir)
+        try:
+            if "billing" in groups:
+                for size in record_sizes:
+                    print(f"\nBilling records: {size:,}")
+                    bench.billing_cases(size)
+            if "recommendations" in groups:
+                for size in recommendation_sizes:
+                    print(f"\nRecommendations: {size:,}")
+                    bench.recommendation_cases(size)
+            if "profile" in groups:
+                print("\nProfile")
+                bench.profile_cases()
+        finally:
+            os.chdir(cwd)
+
+    regressions = compare(bench.results, baseline, args.threshold, args.min_delta_ms / 1000) if baseline else []
+    payload = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "platform": platform.platform(),
+            "preset": args.preset,
+            "elapsed_seconds": round(time.time() - started, 2)
+        },
+        "results": bench.results,
+        "regressions": [{"name": r["name"], "size": r["size"], "ratio": r["ratio"]} for r in regressions]
+    }
+    with open(output, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"\n✓ Results written to {output}")
+
+    if baseline is not None:
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for r in regressions:
+                print(f"  {r['name']} [{r['size']:,}]: {r['baseline_median_s'] * 1000:.3f} ms -> {r['median_s'] * 1000:.3f} ms ({r['ratio']:.2f}x)")
+            return 1
+        print(f"✓ No regressions over {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
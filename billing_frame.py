@@ -0,0 +1,173 @@
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+DIMENSIONS = ("service", "region", "usage_type", "unit", "month", "resource_id")
+MEASURES = ("usage_quantity", "cost_inr")
+
+_DIMENSION_DEFAULTS = {"service": "Unknown"}
+
+
+def _as_float(value: Any) -> float:
+
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class BillingFrame:
+    """Columnar billing records: dictionary-encoded dimensions plus float64 measures.
+
+    Each dimension is stored as an int32 code array and a list of categories in
+    first-appearance order, so group-by sums reduce to np.bincount over the codes.
+    """
+
+    def __init__(
+        self,
+        codes: Dict[str, np.ndarray],
+        categories: Dict[str, List[str]],
+        measures: Dict[str, np.ndarray],
+        desc: Optional[List[str]] = None
+    ):
+
+        self.codes = codes
+        self.categories = categories
+        self.measures = measures
+        self.desc = desc
+
+    @classmethod
+    def from_records(cls, billing_data: Union[List[Dict[str, Any]], Dict[str, Any]]) -> "BillingFrame":
+
+        # Handle both list and dict formats
+        if isinstance(billing_data, dict) and "billing_records" in billing_data:
+            records = billing_data["billing_records"]
+        else:
+            records = billing_data if isinstance(billing_data, list) else []
+
+        count = len(records)
+        codes = {}
+        categories = {}
+        for dim in DIMENSIONS:
+            default = _DIMENSION_DEFAULTS.get(dim, "")
+            lookup = {}
+            codes[dim] = np.fromiter(
+                (lookup.setdefault(str(r.get(dim, default)), len(lookup)) for r in records),
+                dtype=np.int32,
+                count=count
+            )
+            categories[dim] = list(lookup)
+
+        measures = {
+            measure: np.fromiter((_as_float(r.get(measure, 0)) for r in records), dtype=np.float64, count=count)
+            for measure in MEASURES
+        }
+        desc = [r.get("desc", "") for r in records]
+        return cls(codes, categories, measures, desc)
+
+    @classmethod
+    def concat(cls, frames: Sequence["BillingFrame"]) -> "BillingFrame":
+
+        frames = [f for f in frames if len(f)]
+        if not frames:
+            return cls.from_records([])
+
+        codes = {}
+        categories = {}
+        for dim in DIMENSIONS:
+            merged = {}
+            parts = []
+            for frame in frames:
+                remap = np.fromiter(
+                    (merged.setdefault(c, len(merged)) for c in frame.categories[dim]),
+                    dtype=np.int32,
+                    count=len(frame.categories[dim])
+                )
+                parts.append(remap[frame.codes[dim]])
+            codes[dim] = np.concatenate(parts)
+            categories[dim] = list(merged)
+
+        measures = {m: np.concatenate([f.measures[m] for f in frames]) for m in MEASURES}
+        desc = None
+        if all(f.desc is not None for f in frames):
+            desc = [d for f in frames for d in f.desc]
+        return cls(codes, categories, measures, desc)
+
+    def __len__(self) -> int:
+
+        return len(self.measures["cost_inr"])
+
+    def to_records(self) -> List[Dict[str, Any]]:
+
+        columns = {dim: [self.categories[dim][c] for c in self.codes[dim].tolist()] for dim in DIMENSIONS}
+        values = {m: self.measures[m].tolist() for m in MEASURES}
+        desc = self.desc if self.desc is not None else [""] * len(self)
+
+        return [
+            {
+                "month": columns["month"][i],
+                "service": columns["service"][i],
+                "resource_id": columns["resource_id"][i],
+                "region": columns["region"][i],
+                "usage_type": columns["usage_type"][i],
+                "usage_quantity": values["usage_quantity"][i],
+                "unit": columns["unit"][i],
+                "cost_inr": values["cost_inr"][i],
+                "desc": desc[i]
+            }
+            for i in range(len(self))
+        ]
+
+    def total(self, measure: str = "cost_inr") -> float:
+
+        return float(self.measures[measure].sum())
+
+    def group_sums(self, dim: str, measure: str = "cost_inr") -> np.ndarray:
+        """Per-category sums aligned with self.categories[dim]."""
+        return np.bincount(
+            self.codes[dim],
+            weights=self.measures[measure],
+            minlength=len(self.categories[dim])
+        )
+
+    def groupby_sum(self, dim: str, measure: str = "cost_inr") -> Dict[str, float]:
+
+        sums = self.group_sums(dim, measure)
+        present = np.bincount(self.codes[dim], minlength=len(self.categories[dim])) > 0
+        return {
+            category: float(total)
+            for category, total, keep in zip(self.categories[dim], sums.tolist(), present.tolist())
+            if keep
+        }
+
+    def top_k(self, dim: str, k: int = 5, measure: str = "cost_inr") -> List[Tuple[str, float]]:
+
+        sums = self.group_sums(dim, measure)
+        present = np.bincount(self.codes[dim], minlength=len(self.categories[dim])) > 0
+        candidates = np.flatnonzero(present)
+        # Stable ordering keeps ties in first-appearance order
+        order = candidates[np.argsort(-sums[candidates], kind="stable")][:k]
+        return [(self.categories[dim][i], float(sums[i])) for i in order.tolist()]
+
+    def filter(self, **conditions: Union[str, Iterable[str]]) -> "BillingFrame":
+        """Rows matching every dimension condition, e.g. filter(service="Compute", month=["2025-11", "2025-12"])."""
+        mask = np.ones(len(self), dtype=bool)
+        for dim, wanted in conditions.items():
+            values = [wanted] if isinstance(wanted, str) else list(wanted)
+            lookup = {c: i for i, c in enumerate(self.categories[dim])}
+            wanted_codes = [lookup[v] for v in values if v in lookup]
+            mask &= np.isin(self.codes[dim], wanted_codes)
+        return self.take(mask)
+
+    def take(self, mask: np.ndarray) -> "BillingFrame":
+        """Rows where the boolean mask is set; categories are shared with the parent frame."""
+        desc = None
+        if self.desc is not None:
+            desc = [d for d, keep in zip(self.desc, mask.tolist()) if keep]
+        return BillingFrame(
+            {dim: codes[mask] for dim, codes in self.codes.items()},
+            self.categories,
+            {m: values[mask] for m, values in self.measures.items()},
+            desc
+        )
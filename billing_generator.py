@@ -1,27 +1,74 @@
 
 
 import json
-from typing import Dict, Any, List
+import os
+from typing import Callable, Dict, Any, List
 
-from llm_client import HFInferenceClient
-from validators import validate_billing
+from json_extract import extract_json, is_repaired, mark_repaired
+from instrumentation import record_retry, record_validation_failure, traced
+from json_stream import StreamAbort
+from llm_client import AsyncHFInferenceClient, HFInferenceClient, resolve_model, streaming_enabled
+from prompt_budget import compact_mapping, fit_prompt, record_completion, renderings, truncate_text
+from resilience import Deadline, InferenceAbort
+from utils import load_config
+from validators import validate_billing, validate_billing_record
+
+MAX_BILLING_RECORDS = 20
 
 
 class BillingGenerator:
    
+    # Bump when the prompt template changes, so memoized billing is regenerated
+    PROMPT_VERSION = 1
     
-    def __init__(self, api_key: str = None, model: str = None):
-       
-        self.client = HFInferenceClient(api_key=api_key, model=model)
+    def __init__(
+        self,
+        api_key: str = None,
+        model: str = None,
+        async_client: AsyncHFInferenceClient = None,
+        stream: bool = None,
+        on_record: Callable[[int, Dict[str, Any]], None] = None
+    ):
+        
+        self.api_key = api_key
+        self.model = model
+        self._client = None
+        self._async_client = async_client
+        
+        # Streaming validates each record as it arrives; on_record(index, record) sees them early
+        self.stream = streaming_enabled(stream)
+        self.on_record = on_record
+    
+    def fingerprint(self) -> Dict[str, Any]:
+        """Settings the generated billing depends on, besides the profile."""
+        return {"generator": "llm", "prompt_version": self.PROMPT_VERSION, "model": resolve_model(self.model)}
+    
+    @property
+    def client(self) -> HFInferenceClient:
+        
+        # Built on first request, so a generator can be created (and fingerprinted) without credentials
+        if self._client is None:
+            self._client = HFInferenceClient.shared(api_key=self.api_key, model=self.model)
+        return self._client
+    
+    @property
+    def async_client(self) -> AsyncHFInferenceClient:
+        
+        # Pooled per event loop and sharing the sync client's response cache, unless one was passed in
+        if self._async_client is not None:
+            return self._async_client
+        return AsyncHFInferenceClient.shared(api_key=self.client.api_key, model=self.client.model)
     
+    @traced("billing")
     def generate(self, project_profile: Dict[str, Any], max_retries: int = 3) -> List[Dict[str, Any]]:
        
         prompt = self._build_prompt(project_profile)
         
+        deadline = Deadline.for_stage()
         for attempt in range(max_retries):
             try:
                 # Query LLM
-                response = self.client.query(prompt, max_retries=2, temperature=0.5)
+                response = self._request(prompt, deadline)
                 
                 # Parse JSON
                 billing_data = self._parse_response(response)
@@ -32,9 +79,11 @@ class BillingGenerator:
                     return billing_data
                 
                 # If validation failed, retry
+                record_validation_failure("schema", error_msg)
                 if attempt < max_retries - 1:
                     print(f"Billing validation failed: {error_msg}")
                     print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("validation")
                     continue
                 
                 # Last attempt
@@ -42,21 +91,126 @@ class BillingGenerator:
                 return billing_data if isinstance(billing_data, list) else []
             
             except json.JSONDecodeError as e:
+                record_validation_failure("json", str(e))
                 if attempt < max_retries - 1:
                     print(f"JSON parsing failed: {str(e)}")
                     print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("json_parse")
                     continue
                 raise
             
+            except InferenceAbort:
+                raise
+            
             except Exception as e:
                 if attempt < max_retries - 1:
                     print(f"Error generating billing: {str(e)}")
                     print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("error")
                     continue
                 raise
         
         raise Exception("Failed to generate billing data after max retries")
     
+    @traced("billing")
+    async def generate_async(self, project_profile: Dict[str, Any], max_retries: int = 3) -> List[Dict[str, Any]]:
+        
+        prompt = self._build_prompt(project_profile)
+        
+        deadline = Deadline.for_stage()
+        for attempt in range(max_retries):
+            try:
+                response = await self._request_async(prompt, deadline)
+                billing_data = self._parse_response(response)
+                
+                is_valid, error_msg = validate_billing(billing_data)
+                if is_valid:
+                    return billing_data
+                
+                record_validation_failure("schema", error_msg)
+                if attempt < max_retries - 1:
+                    print(f"Billing validation failed: {error_msg}")
+                    print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("validation")
+                    continue
+                
+                print(f"Final attempt: {error_msg}")
+                return billing_data if isinstance(billing_data, list) else []
+            
+            except json.JSONDecodeError as e:
+                record_validation_failure("json", str(e))
+                if attempt < max_retries - 1:
+                    print(f"JSON parsing failed: {str(e)}")
+                    print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("json_parse")
+                    continue
+                raise
+            
+            except InferenceAbort:
+                raise
+            
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    print(f"Error generating billing: {str(e)}")
+                    print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("error")
+                    continue
+                raise
+        
+        raise Exception("Failed to generate billing data after max retries")
+    
+    def _request(self, prompt: str, deadline: Deadline) -> str:
+        
+        if self.stream:
+            response = self.client.query_stream(
+                prompt,
+                on_item=self._check_streamed_record,
+                max_retries=2,
+                temperature=0.5,
+                accept=self._is_usable,
+                deadline=deadline
+            )
+        else:
+            response = self.client.query(prompt, max_retries=2, temperature=0.5, accept=self._is_usable, deadline=deadline)
+        record_completion("billing", response)
+        return response
+    
+    async def _request_async(self, prompt: str, deadline: Deadline) -> str:
+        
+        if self.stream:
+            response = await self.async_client.query_stream(
+                prompt,
+                on_item=self._check_streamed_record,
+                max_retries=2,
+                temperature=0.5,
+                accept=self._is_usable,
+                deadline=deadline
+            )
+        else:
+            response = await self.async_client.query(
+                prompt,
+                max_retries=2,
+                temperature=0.5,
+                accept=self._is_usable,
+                deadline=deadline
+            )
+        record_completion("billing", response)
+        return response
+    
+    def _check_streamed_record(self, path: tuple, index: int, record: Dict[str, Any]):
+        
+        # Abort generation on the first bad record instead of after all 2000 tokens
+        if path not in ((), ("billing_records",)):
+            return
+        if index >= MAX_BILLING_RECORDS:
+            raise StreamAbort(f"Expected at most {MAX_BILLING_RECORDS} billing records, got more")
+        
+        is_valid, error_msg = validate_billing_record(record, index)
+        if not is_valid:
+            raise StreamAbort(error_msg)
+        if self.on_record is not None:
+            self.on_record(index, record)
+    
     def _build_prompt(self, project_profile: Dict[str, Any]) -> str:
         
         name = project_profile.get("name", "Unknown Project")
@@ -64,11 +218,11 @@ class BillingGenerator:
         description = project_profile.get("description", "")
         tech_stack = project_profile.get("tech_stack", {})
         
-        return f"""Generate realistic synthetic cloud billing records for the following project:
+        template = """Generate realistic synthetic cloud billing records for the following project:
 Project: {name}
 Budget: ₹{budget}/month
 Description: {description}
-Tech Stack: {json.dumps(tech_stack)}
+Tech Stack: {tech_stack}
 
 Return a JSON array with 12-20 billing records. Each record must match this schema:
 {{
@@ -107,45 +261,49 @@ Example format:
   }}
 ]
 """
+        
+        # Long descriptions and verbose stacks are shortened to stay under the stage budget
+        return fit_prompt(
+            "billing",
+            template,
+            name=str(name),
+            budget=str(budget),
+            description=[description, truncate_text(description, 600), truncate_text(description, 200)],
+            tech_stack=renderings(tech_stack, json.dumps, [compact_mapping, lambda t: compact_mapping(t, 15)])
+        )
     
-    def _parse_response(self, response_text: str) -> List[Dict[str, Any]]:
+    def _is_usable(self, response_text: str) -> bool:
         
-        # Try direct parsing (for array format)
+        # Lets a hedged request race skip a response that would fail validation; output closed
+        # after truncation may validate but is incomplete, so it is never preferred or cached
         try:
-            parsed = json.loads(response_text)
-            if isinstance(parsed, list):
-                return parsed
-            elif isinstance(parsed, dict) and 'billing_records' in parsed:
-                return parsed.get('billing_records', [])
-            return [parsed] if isinstance(parsed, dict) else []
+            parsed = self._parse_response(response_text)
         except json.JSONDecodeError:
-            pass
-        
-        # Try to extract JSON array from text
-        start_idx = response_text.find('[')
-        if start_idx != -1:
-            end_idx = response_text.rfind(']')
-            if end_idx != -1 and end_idx > start_idx:
-                try:
-                    json_str = response_text[start_idx:end_idx + 1]
-                    parsed = json.loads(json_str)
-                    if isinstance(parsed, list):
-                        return parsed
-                except json.JSONDecodeError:
-                    pass
-        
-        # Try to extract JSON object from text
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}')
-        
-        if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-            try:
-                json_str = response_text[start_idx:end_idx + 1]
-                parsed = json.loads(json_str)
-                if isinstance(parsed, dict) and 'billing_records' in parsed:
-                    return parsed.get('billing_records', [])
-            except json.JSONDecodeError:
-                pass
-        
-        raise json.JSONDecodeError("Could not extract valid JSON", response_text, 0)
+            return False
+        return not is_repaired(parsed) and validate_billing(parsed)[0]
+    
+    def _parse_response(self, response_text: str) -> List[Dict[str, Any]]:
+        
+        # Prefer an array of records, but accept {"billing_records": [...]} or a single record
+        parsed = extract_json(response_text, prefer=(list, dict))
+        if isinstance(parsed, list):
+            return parsed
+        if isinstance(parsed, dict) and 'billing_records' in parsed:
+            records = parsed.get('billing_records', [])
+        else:
+            records = [parsed] if isinstance(parsed, dict) else []
+        # Records unwrapped from a truncated response stay marked as repaired
+        return mark_repaired(records) if is_repaired(parsed) else records
+
 
+def create_billing_generator(kind: str = None, api_key: str = None, model: str = None):
+    """Billing generator selected by kind or BILLING_GENERATOR ("llm" or "synthetic")."""
+    load_config()
+    kind = (kind or os.getenv("BILLING_GENERATOR", "llm")).strip().lower()
+    
+    if kind == "synthetic":
+        from synthetic_billing import SyntheticBillingGenerator
+        return SyntheticBillingGenerator()
+    if kind != "llm":
+        raise ValueError(f"Unknown billing generator: {kind} (expected 'llm' or 'synthetic')")
+    return BillingGenerator(api_key=api_key, model=model)
@@ -0,0 +1,205 @@
+
+import csv
+import gzip
+import io
+import json
+import math
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+# Billing record fields produced by BillingGenerator / checked by validate_billing
+BILLING_FIELDS = ["month", "service", "resource_id", "region", "usage_type", "usage_quantity", "unit", "cost_inr", "desc"]
+NUMERIC_FIELDS = ("usage_quantity", "cost_inr")
+
+# AWS Cost and Usage Report column names mapped onto the billing schema
+CUR_COLUMN_MAP = {
+    "month": "lineItem/UsageStartDate",
+    "service": "product/ProductName",
+    "resource_id": "lineItem/ResourceId",
+    "region": "product/region",
+    "usage_type": "lineItem/UsageType",
+    "usage_quantity": "lineItem/UsageAmount",
+    "unit": "pricing/unit",
+    "cost_inr": "lineItem/UnblendedCost",
+    "desc": "lineItem/LineItemDescription"
+}
+
+
+def _open_text(path: str):
+
+    if path.lower().endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _to_float(value: Any) -> float:
+    """Number from a cell; a blank cell is 0, anything else that is not a finite number raises ValueError."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        number = float(value)
+    else:
+        text = str(value if value is not None else "").replace(",", "").strip()
+        number = float(text) if text else 0.0
+    if not math.isfinite(number):
+        raise ValueError(f"not a finite number: {value!r}")
+    return number
+
+
+def _to_month(value: Any) -> str:
+
+    # Accept "2025-12", "2025-12-01" or "2025-12-01T00:00:00Z"
+    value = str(value or "").strip()
+    return value[:7]
+
+
+def _coerce(record: Dict[str, Any], cost_multiplier: float) -> Dict[str, Any]:
+
+    for field in NUMERIC_FIELDS:
+        if field in record:
+            try:
+                record[field] = _to_float(record[field])
+            except ValueError:
+                raise ValueError(f"{field} is not a number: {record[field]!r}") from None
+    if "cost_inr" in record and cost_multiplier != 1.0:
+        record["cost_inr"] = record["cost_inr"] * cost_multiplier
+    if "month" in record:
+        record["month"] = _to_month(record["month"])
+    return record
+
+
+class IngestStats:
+    """Rows read and rejected by iter_billing_chunks, with the first few rejections as examples.
+
+    A row whose cost or quantity cell cannot be parsed is skipped rather than
+    counted as 0, so a bad export shows up here instead of understating spend.
+    """
+
+    MAX_EXAMPLES = 5
+
+    def __init__(self):
+
+        self.rows = 0
+        self.rejected = 0
+        self.examples: List[str] = []
+
+    def reject(self, row: int, reason: str):
+
+        self.rejected += 1
+        if len(self.examples) < self.MAX_EXAMPLES:
+            self.examples.append(f"row {row}: {reason}")
+
+    def to_dict(self) -> Dict[str, Any]:
+
+        return {"rows": self.rows, "rejected": self.rejected, "examples": list(self.examples)}
+
+
+def detect_column_map(header: List[str]) -> Dict[str, str]:
+    """Map billing fields to CSV columns, preferring the billing schema's own names."""
+    columns = set(header)
+    if all(field in columns for field in ("service", "cost_inr")):
+        return {field: field for field in BILLING_FIELDS if field in columns}
+    return {field: column for field, column in CUR_COLUMN_MAP.items() if column in columns}
+
+
+def iter_billing_chunks(
+    path: str,
+    chunk_size: int = 50000,
+    fields: Optional[List[str]] = None,
+    column_map: Optional[Dict[str, str]] = None,
+    cost_multiplier: float = 1.0,
+    stats: Optional[IngestStats] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """Stream billing records from a CSV/JSONL export (optionally gzipped) in chunks.
+
+    Only the requested fields are materialized (column projection); numbers are
+    coerced to float and timestamps truncated to YYYY-MM. cost_multiplier converts
+    the export currency to INR (e.g. the USD rate for a CUR file). Rows with an
+    unparseable cost or quantity are skipped and counted in stats.
+    """
+    fields = fields or BILLING_FIELDS
+    stats = stats if stats is not None else IngestStats()
+    lowered = path.lower()
+    if lowered.endswith((".jsonl", ".jsonl.gz", ".ndjson", ".ndjson.gz")):
+        yield from _iter_jsonl_chunks(path, chunk_size, fields, column_map, cost_multiplier, stats)
+    else:
+        yield from _iter_csv_chunks(path, chunk_size, fields, column_map, cost_multiplier, stats)
+
+
+def _iter_csv_chunks(
+    path: str,
+    chunk_size: int,
+    fields: List[str],
+    column_map: Optional[Dict[str, str]],
+    cost_multiplier: float,
+    stats: IngestStats
+) -> Iterator[List[Dict[str, Any]]]:
+
+    with _open_text(path) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        column_map = column_map or detect_column_map(header)
+        positions = {name: idx for idx, name in enumerate(header)}
+        projection = [
+            (field, positions[column_map[field]])
+            for field in fields
+            if field in column_map and column_map[field] in positions
+        ]
+        if not projection:
+            raise ValueError(f"No billing columns recognised in {path}")
+
+        chunk = []
+        for row in reader:
+            if not row:
+                continue
+            stats.rows += 1
+            record = {field: row[idx] if idx < len(row) else "" for field, idx in projection}
+            try:
+                chunk.append(_coerce(record, cost_multiplier))
+            except ValueError as e:
+                stats.reject(reader.line_num, str(e))
+                continue
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _iter_jsonl_chunks(
+    path: str,
+    chunk_size: int,
+    fields: List[str],
+    column_map: Optional[Dict[str, str]],
+    cost_multiplier: float,
+    stats: IngestStats
+) -> Iterator[List[Dict[str, Any]]]:
+
+    detect = column_map is None
+    keys = set()
+
+    with _open_text(path) as f:
+        lines = ((line_no, line) for line_no, line in enumerate(f, 1) if line.strip())
+        while True:
+            batch = [(line_no, json.loads(line)) for line_no, line in islice(lines, chunk_size)]
+            if not batch:
+                return
+
+            if detect:
+                # Columns come from the union of keys seen so far, not just the first line
+                new_keys = set().union(*(raw.keys() for _, raw in batch)) - keys
+                if new_keys:
+                    keys |= new_keys
+                    column_map = detect_column_map(sorted(keys))
+
+            chunk = []
+            for line_no, raw in batch:
+                stats.rows += 1
+                record = {field: raw.get(column_map[field], "") for field in fields if field in column_map}
+                try:
+                    chunk.append(_coerce(record, cost_multiplier))
+                except ValueError as e:
+                    stats.reject(line_no, str(e))
+            if chunk:
+                yield chunk
@@ -0,0 +1,146 @@
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+def configure_http_session(pool_size: int = None, idle_seconds: float = None) -> bool:
+    """Size the keep-alive HTTP session huggingface_hub shares between all InferenceClients.
+
+    Returns False when the installed huggingface_hub offers no hook for it, in
+    which case its own defaults stay in place.
+    """
+    pool_size = int(pool_size or os.getenv("LLM_POOL_SIZE", 10))
+    idle_seconds = float(idle_seconds or os.getenv("LLM_POOL_IDLE_SECONDS", 120))
+
+    import huggingface_hub
+
+    if hasattr(huggingface_hub, "set_client_factory"):
+        # huggingface_hub >= 1.0: one httpx client per process. Keep its hooks and
+        # redirect handling, only the connection limits change.
+        import importlib
+
+        default = huggingface_hub.get_session()
+        client_cls = type(default)
+        limits_cls = importlib.import_module(client_cls.__module__.split(".")[0]).Limits
+        event_hooks = default.event_hooks
+
+        def client_factory():
+
+            return client_cls(
+                event_hooks=event_hooks,
+                follow_redirects=True,
+                timeout=None,
+                limits=limits_cls(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                    keepalive_expiry=idle_seconds
+                )
+            )
+
+        huggingface_hub.set_client_factory(client_factory)
+        return True
+
+    if hasattr(huggingface_hub, "configure_http_backend"):
+        # Older releases use one requests.Session per thread
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        def backend_factory():
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            return session
+
+        huggingface_hub.configure_http_backend(backend_factory=backend_factory)
+        return True
+
+    return False
+
+
+class ClientPool:
+    """Process-wide registry of inference clients keyed by (client class, api_key, model).
+
+    Every stage and every run in the process gets the same client, and with it
+    the same keep-alive connections, response cache, latency history and hedge
+    threads. Clients unused for idle_seconds, or beyond max_clients, are dropped
+    from the registry; stages still holding one keep using it.
+    """
+
+    def __init__(self, max_clients: int = None, idle_seconds: float = None):
+
+        self.max_clients = int(max_clients or os.getenv("LLM_POOL_MAX_CLIENTS", 16))
+        self.idle_seconds = float(idle_seconds or os.getenv("LLM_POOL_IDLE_SECONDS", 120))
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self.http_configured = None
+        self._clients = OrderedDict()
+        # Re-entrant: building an async client looks up its sync sibling's cache
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+
+            entry = self._clients.get(key)
+            if entry is not None:
+                entry[1] = now
+                self._clients.move_to_end(key)
+                self.reused += 1
+                return entry[0]
+
+            if self.http_configured is None:
+                self.http_configured = configure_http_session(idle_seconds=self.idle_seconds)
+
+            client = factory()
+            self._clients[key] = [client, now]
+            self.created += 1
+            self._evict(now)
+            return client
+
+    def _evict(self, now: float):
+
+        for key in [k for k, (_, last_used) in self._clients.items() if now - last_used > self.idle_seconds]:
+            del self._clients[key]
+            self.evicted += 1
+        while len(self._clients) > self.max_clients:
+            self._clients.popitem(last=False)
+            self.evicted += 1
+
+    def clear(self):
+
+        with self._lock:
+            self._clients.clear()
+
+    def stats(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted,
+                "max_clients": self.max_clients,
+                "idle_seconds": self.idle_seconds,
+                "http_pool_configured": bool(self.http_configured)
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def client_pool() -> ClientPool:
+
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ClientPool()
+        return _pool
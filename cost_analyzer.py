@@ -1,19 +1,96 @@
 
 
 import json
-from typing import Dict, Any, List
+import os
+from typing import Callable, Dict, Any, Iterable, List
 from datetime import datetime
 
-from llm_client import HFInferenceClient
-from validators import validate_recommendations
+from billing_frame import BillingFrame
+from incremental_metrics import MetricsState
+from instrumentation import record_retry, record_validation_failure, traced
+from json_extract import extract_json, is_repaired
+from json_stream import StreamAbort
+from llm_client import AsyncHFInferenceClient, HFInferenceClient, resolve_model, streaming_enabled
+from prompt_budget import (
+    compact_mapping,
+    fit_prompt,
+    percentiles,
+    record_completion,
+    renderings,
+    top_k_with_other
+)
+from resilience import Deadline, InferenceAbort
+from recommendation_rules import RuleBasedRecommender
+from utils import load_config
+from validators import validate_recommendation, validate_recommendations
+
+MAX_RECOMMENDATIONS = 10
 
 
 class CostAnalyzer:
+    
+    # rules: local rule engine only; hybrid: rules plus an LLM narrative; llm: LLM-generated recommendations
+    RECOMMENDATION_MODES = ("rules", "hybrid", "llm")
+    
+    # Bump when the prompts or the recommendation rules change, so memoized reports are rebuilt
+    PROMPT_VERSION = 1
    
-    def __init__(self, api_key: str = None, model: str = None, budget_threshold: float = 5000):
+    def __init__(
+        self,
+        api_key: str = None,
+        model: str = None,
+        budget_threshold: float = 5000,
+        async_client: AsyncHFInferenceClient = None,
+        recommendation_mode: str = None,
+        stream: bool = None,
+        on_recommendation: Callable[[int, Dict[str, Any]], None] = None
+    ):
         
-        self.client = HFInferenceClient(api_key=api_key, model=model)
+        load_config()
+        self.api_key = api_key
+        self.model = model
         self.budget_threshold = budget_threshold
+        self._client = None
+        self._async_client = async_client
+        self.recommender = RuleBasedRecommender()
+        
+        # Streaming validates each LLM recommendation as it arrives; on_recommendation(index, rec) sees them early
+        self.stream = streaming_enabled(stream)
+        self.on_recommendation = on_recommendation
+        
+        self.recommendation_mode = (recommendation_mode or os.getenv("RECOMMENDATION_MODE", "rules")).strip().lower()
+        if self.recommendation_mode not in self.RECOMMENDATION_MODES:
+            raise ValueError(
+                f"Unknown recommendation mode: {self.recommendation_mode} "
+                f"(expected one of {', '.join(self.RECOMMENDATION_MODES)})"
+            )
+    
+    def fingerprint(self) -> Dict[str, Any]:
+        """Settings the report depends on, besides the profile and billing."""
+        fingerprint = {
+            "prompt_version": self.PROMPT_VERSION,
+            # budget_threshold is not read by any analysis path, so it stays out of the key
+            "recommendation_mode": self.recommendation_mode
+        }
+        if self.recommendation_mode != "rules":
+            fingerprint["model"] = resolve_model(self.model)
+        return fingerprint
+    
+    @property
+    def client(self) -> HFInferenceClient:
+        
+        # Rules-only analyses never need (or fail on) the inference client
+        if self._client is None:
+            self._client = HFInferenceClient.shared(api_key=self.api_key, model=self.model)
+        return self._client
+    
+    @property
+    def async_client(self) -> AsyncHFInferenceClient:
+        
+        # Pooled per event loop and sharing the sync client's response cache, unless one was passed in
+        if self._async_client is not None:
+            return self._async_client
+        return AsyncHFInferenceClient.shared(api_key=self.client.api_key, model=self.client.model)
     
     def analyze(self, project_profile: Dict[str, Any], billing_data: List[Dict[str, Any]]) -> Dict[str, Any]:
        
@@ -27,6 +104,41 @@ class CostAnalyzer:
             metrics
         )
         
+        return self._build_report(project_profile, metrics, recommendations)
+    
+    async def analyze_async(self, project_profile: Dict[str, Any], billing_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        
+        metrics = self._calculate_metrics(billing_data, project_profile)
+        recommendations = await self._generate_recommendations_async(
+            project_profile,
+            billing_data,
+            metrics
+        )
+        return self._build_report(project_profile, metrics, recommendations)
+    
+    def analyze_stream(
+        self,
+        project_profile: Dict[str, Any],
+        billing_chunks: Iterable[List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Analyze billing delivered as chunks (e.g. billing_ingest.iter_billing_chunks) in constant memory."""
+        metrics = self._calculate_metrics_from_chunks(billing_chunks, project_profile)
+        recommendations = self._generate_recommendations(project_profile, [], metrics)
+        return self._build_report(project_profile, metrics, recommendations)
+    
+    def analyze_state(self, project_profile: Dict[str, Any], metrics_state: MetricsState) -> Dict[str, Any]:
+        """Analyze from an incrementally maintained MetricsState instead of raw records."""
+        metrics = metrics_state.metrics()
+        recommendations = self._generate_recommendations(project_profile, [], metrics)
+        return self._build_report(project_profile, metrics, recommendations)
+    
+    def _build_report(
+        self,
+        project_profile: Dict[str, Any],
+        metrics: Dict[str, Any],
+        recommendations: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        
         # Compile report with new schema
         report = {
             "analysis": {
@@ -41,25 +153,38 @@ class CostAnalyzer:
             "summary": recommendations.get("summary", {})
         }
         
+        if recommendations.get("narrative"):
+            report["narrative"] = recommendations["narrative"]
+        
         return report
     
     def _calculate_metrics(self, billing_data: List[Dict[str, Any]], project_profile: Dict[str, Any]) -> Dict[str, Any]:
         
-        # Handle both list and dict formats
-        if isinstance(billing_data, dict) and "billing_records" in billing_data:
-            records = billing_data["billing_records"]
+        # Accepts list/dict billing records or a prebuilt BillingFrame
+        if isinstance(billing_data, BillingFrame):
+            frame = billing_data
         else:
-            records = billing_data if isinstance(billing_data, list) else []
+            frame = BillingFrame.from_records(billing_data)
         
-        # Total cost
-        total_cost = sum(record.get("cost_inr", 0) for record in records)
+        return self._calculate_metrics_from_chunks([frame], project_profile)
+    
+    @traced("metrics")
+    def _calculate_metrics_from_chunks(
+        self,
+        billing_chunks: Iterable[List[Dict[str, Any]]],
+        project_profile: Dict[str, Any]
+    ) -> Dict[str, Any]:
         
-        # Cost per service
+        # One vectorized group-by per chunk; only per-service totals are kept in memory
+        total_cost = 0.0
+        record_count = 0
         cost_per_service = {}
-        for record in records:
-            service = record.get("service", "Unknown")
-            cost = record.get("cost_inr", 0)
-            cost_per_service[service] = cost_per_service.get(service, 0) + cost
+        for chunk in billing_chunks:
+            frame = chunk if isinstance(chunk, BillingFrame) else BillingFrame.from_records(chunk)
+            total_cost += frame.total()
+            for service, cost in frame.groupby_sum("service").items():
+                cost_per_service[service] = cost_per_service.get(service, 0.0) + cost
+            record_count += len(frame)
         
         # High cost services (top 5)
         high_cost_services = sorted(
@@ -70,6 +195,7 @@ class CostAnalyzer:
         
         return {
             "total_cost": round(total_cost, 2),
+            "record_count": record_count,
             "cost_per_service": {k: round(v, 2) for k, v in cost_per_service.items()},
             "high_cost_services": [
                 {"service": service, "cost": round(cost, 2)}
@@ -77,7 +203,51 @@ class CostAnalyzer:
             ]
         }
     
+    @traced("recommendations")
     def _generate_recommendations(
+        self,
+        project_profile: Dict[str, Any],
+        billing_data: List[Dict[str, Any]],
+        metrics: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        
+        if self.recommendation_mode == "llm":
+            return self._generate_llm_recommendations(project_profile, billing_data, metrics)
+        
+        recommendations = self.recommender.recommend(project_profile, billing_data, metrics)
+        self._emit_recommendations(recommendations)
+        if self.recommendation_mode == "hybrid":
+            try:
+                prompt = self._build_narrative_prompt(project_profile, metrics, recommendations)
+                recommendations["narrative"] = self.client.query(prompt, max_retries=2, temperature=0.3).strip()
+            except Exception as e:
+                # The narrative is optional; the rule-based report stands on its own
+                print(f"Narrative generation skipped: {str(e)}")
+        return recommendations
+    
+    @traced("recommendations")
+    async def _generate_recommendations_async(
+        self,
+        project_profile: Dict[str, Any],
+        billing_data: List[Dict[str, Any]],
+        metrics: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        
+        if self.recommendation_mode == "llm":
+            return await self._generate_llm_recommendations_async(project_profile, billing_data, metrics)
+        
+        recommendations = self.recommender.recommend(project_profile, billing_data, metrics)
+        self._emit_recommendations(recommendations)
+        if self.recommendation_mode == "hybrid":
+            try:
+                prompt = self._build_narrative_prompt(project_profile, metrics, recommendations)
+                response = await self.async_client.query(prompt, max_retries=2, temperature=0.3)
+                recommendations["narrative"] = response.strip()
+            except Exception as e:
+                print(f"Narrative generation skipped: {str(e)}")
+        return recommendations
+    
+    def _generate_llm_recommendations(
         self, 
         project_profile: Dict[str, Any],
         billing_data: List[Dict[str, Any]],
@@ -91,10 +261,11 @@ class CostAnalyzer:
             metrics
         )
         
+        deadline = Deadline.for_stage()
         for attempt in range(max_retries):
             try:
                 # Query LLM
-                response = self.client.query(prompt, max_retries=2, temperature=0.3)
+                response = self._request(prompt, deadline)
                 
                 # Parse JSON
                 recommendations = self._parse_response(response)
@@ -105,29 +276,178 @@ class CostAnalyzer:
                     return recommendations
                 
                 # If validation failed, retry
+                record_validation_failure("schema", error_msg)
+                if attempt < max_retries - 1:
+                    print(f"Recommendations validation failed: {error_msg}")
+                    print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("validation")
+                    continue
+                
+                return recommendations if isinstance(recommendations, dict) else {}
+            
+            except json.JSONDecodeError as e:
+                record_validation_failure("json", str(e))
+                if attempt < max_retries - 1:
+                    print(f"JSON parsing failed: {str(e)}")
+                    print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("json_parse")
+                    continue
+                raise
+            
+            except InferenceAbort:
+                raise
+            
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    print(f"Error generating recommendations: {str(e)}")
+                    print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("error")
+                    continue
+                raise
+        
+        raise Exception("Failed to generate recommendations after max retries")
+    
+    async def _generate_llm_recommendations_async(
+        self,
+        project_profile: Dict[str, Any],
+        billing_data: List[Dict[str, Any]],
+        metrics: Dict[str, Any],
+        max_retries: int = 3
+    ) -> Dict[str, Any]:
+        
+        prompt = self._build_recommendations_prompt(
+            project_profile,
+            billing_data,
+            metrics
+        )
+        
+        deadline = Deadline.for_stage()
+        for attempt in range(max_retries):
+            try:
+                response = await self._request_async(prompt, deadline)
+                recommendations = self._parse_response(response)
+                
+                is_valid, error_msg = validate_recommendations(recommendations)
+                if is_valid:
+                    return recommendations
+                
+                record_validation_failure("schema", error_msg)
                 if attempt < max_retries - 1:
                     print(f"Recommendations validation failed: {error_msg}")
                     print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("validation")
                     continue
                 
                 return recommendations if isinstance(recommendations, dict) else {}
             
             except json.JSONDecodeError as e:
+                record_validation_failure("json", str(e))
                 if attempt < max_retries - 1:
                     print(f"JSON parsing failed: {str(e)}")
                     print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("json_parse")
                     continue
                 raise
             
+            except InferenceAbort:
+                raise
+            
             except Exception as e:
                 if attempt < max_retries - 1:
                     print(f"Error generating recommendations: {str(e)}")
                     print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("error")
                     continue
                 raise
         
         raise Exception("Failed to generate recommendations after max retries")
     
+    def _request(self, prompt: str, deadline: Deadline) -> str:
+        
+        if self.stream:
+            response = self.client.query_stream(
+                prompt,
+                on_item=self._check_streamed_recommendation,
+                max_retries=2,
+                temperature=0.3,
+                accept=self._is_usable,
+                deadline=deadline
+            )
+        else:
+            response = self.client.query(prompt, max_retries=2, temperature=0.3, accept=self._is_usable, deadline=deadline)
+        record_completion("recommendations", response)
+        return response
+    
+    async def _request_async(self, prompt: str, deadline: Deadline) -> str:
+        
+        if self.stream:
+            response = await self.async_client.query_stream(
+                prompt,
+                on_item=self._check_streamed_recommendation,
+                max_retries=2,
+                temperature=0.3,
+                accept=self._is_usable,
+                deadline=deadline
+            )
+        else:
+            response = await self.async_client.query(
+                prompt,
+                max_retries=2,
+                temperature=0.3,
+                accept=self._is_usable,
+                deadline=deadline
+            )
+        record_completion("recommendations", response)
+        return response
+    
+    def _check_streamed_recommendation(self, path: tuple, index: int, recommendation: Dict[str, Any]):
+        
+        # Abort generation on the first bad recommendation instead of after the whole report
+        if path != ("recommendations",):
+            return
+        if index >= MAX_RECOMMENDATIONS:
+            raise StreamAbort(f"Expected at most {MAX_RECOMMENDATIONS} recommendations, got more")
+        
+        is_valid, error_msg = validate_recommendation(recommendation, index)
+        if not is_valid:
+            raise StreamAbort(error_msg)
+        if self.on_recommendation is not None:
+            self.on_recommendation(index, recommendation)
+    
+    def _emit_recommendations(self, recommendations: Dict[str, Any]):
+        
+        if self.on_recommendation is not None:
+            for index, recommendation in enumerate(recommendations.get("recommendations", [])):
+                self.on_recommendation(index, recommendation)
+    
+    def _build_narrative_prompt(
+        self,
+        project_profile: Dict[str, Any],
+        metrics: Dict[str, Any],
+        recommendations: Dict[str, Any]
+    ) -> str:
+        
+        name = project_profile.get("name", "Unknown")
+        budget = project_profile.get("budget_inr_per_month", 50000)
+        summary = recommendations.get("summary", {})
+        lines = "\n".join(
+            f"- {r['title']} ({r['service']}): save ₹{r['potential_savings']:,.0f}, effort {r['implementation_effort']}"
+            for r in recommendations.get("recommendations", [])
+        )
+        
+        return f"""Write a short executive summary (4-6 sentences, plain text, no JSON, no lists) of this cloud cost review.
+
+Project: {name}
+Budget: ₹{budget}/month
+Current Monthly Cost: ₹{metrics['total_cost']}
+Total Potential Savings: ₹{summary.get('total_potential_savings', 0)} ({summary.get('savings_percentage', 0)}%)
+
+Recommendations:
+{lines}
+
+Explain where the money goes, which two or three actions to take first and why.
+"""
+    
     def _build_recommendations_prompt(
         self,
         project_profile: Dict[str, Any],
@@ -140,15 +460,15 @@ class CostAnalyzer:
         tech_stack = project_profile.get("tech_stack", {})
         high_cost = metrics["high_cost_services"]
         
-        return f"""Generate cost optimization recommendations for a cloud project.
+        template = """Generate cost optimization recommendations for a cloud project.
 
 Project Details:
 - Name: {name}
 - Budget: ₹{budget}/month
-- Current Monthly Cost: ₹{metrics['total_cost']}
-- Budget Variance: ₹{metrics['total_cost'] - budget}
-- Tech Stack: {json.dumps(tech_stack)}
-- High Cost Services: {", ".join([f"{s['service']} (₹{s['cost']})" for s in high_cost[:3]])}
+- Current Monthly Cost: ₹{total_cost}
+- Budget Variance: ₹{variance}
+- Tech Stack: {tech_stack}
+- High Cost Services: {high_cost_line}{cost_profile}
 
 Generate 6-10 specific, actionable cost optimization recommendations covering:
 - Reserved Instances/Commitments
@@ -160,12 +480,12 @@ Generate 6-10 specific, actionable cost optimization recommendations covering:
 Return ONLY valid JSON with this exact structure:
 {{
   "analysis": {{
-    "total_monthly_cost": {metrics['total_cost']},
+    "total_monthly_cost": {total_cost},
     "budget": {budget},
-    "budget_variance": {metrics['total_cost'] - budget},
-    "is_over_budget": {str(metrics['total_cost'] > budget).lower()},
-    "service_costs": {json.dumps(metrics['cost_per_service'])},
-    "high_cost_services": {json.dumps({s['service']: s['cost'] for s in high_cost})}
+    "budget_variance": {variance},
+    "is_over_budget": {over_budget},
+    "service_costs": {service_costs},
+    "high_cost_services": {high_cost_services}
   }},
   "recommendations": [
     {{
@@ -196,25 +516,62 @@ Rules:
 - Include both AWS and cloud-agnostic recommendations
 - Return ONLY the JSON object, no other text
 """
+        
+        # Large inputs are summarized (top-k + "Other", percentiles) to stay under the stage budget
+        return fit_prompt(
+            "recommendations",
+            template,
+            name=str(name),
+            budget=str(budget),
+            total_cost=str(metrics['total_cost']),
+            variance=str(metrics['total_cost'] - budget),
+            over_budget=str(metrics['total_cost'] > budget).lower(),
+            tech_stack=renderings(tech_stack, json.dumps, [compact_mapping, lambda t: compact_mapping(t, 15)]),
+            high_cost_line=", ".join([f"{s['service']} (₹{s['cost']})" for s in high_cost[:3]]),
+            cost_profile=self._cost_profile(billing_data, metrics),
+            service_costs=renderings(
+                metrics['cost_per_service'],
+                json.dumps,
+                [lambda c: top_k_with_other(c, 15), lambda c: top_k_with_other(c, 5)]
+            ),
+            high_cost_services=json.dumps({s['service']: s['cost'] for s in high_cost})
+        )
     
-    def _parse_response(self, response_text: str) -> Dict[str, Any]:
+    def _cost_profile(self, billing_data: Any, metrics: Dict[str, Any]) -> List[str]:
         
-        # Try direct parsing
-        try:
-            return json.loads(response_text)
-        except json.JSONDecodeError:
-            pass
+        # Only worth the tokens once service_costs is too long to list every service by name
+        service_costs = list(metrics['cost_per_service'].values())
+        if len(service_costs) <= 15:
+            return [""]
         
-        # Try to extract JSON object from text
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}')
+        spread = percentiles(service_costs)
+        line = (
+            f"\n- Cost Distribution: {len(service_costs)} services, per-service "
+            + ", ".join(f"{k} ₹{v}" for k, v in spread.items())
+        )
         
-        if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-            try:
-                json_str = response_text[start_idx:end_idx + 1]
-                return json.loads(json_str)
-            except json.JSONDecodeError:
-                pass
+        by_region = {}
+        if isinstance(billing_data, BillingFrame):
+            by_region = billing_data.groupby_sum("region")
+        elif billing_data:
+            by_region = BillingFrame.from_records(billing_data).groupby_sum("region")
+        if len(by_region) > 1:
+            regions = ", ".join(f"{k} ₹{v}" for k, v in top_k_with_other(by_region, 4).items())
+            return [f"{line}\n- Cost by Region: {regions}", line, ""]
+        return [line, ""]
+    
+    def _is_usable(self, response_text: str) -> bool:
+        
+        # Lets a hedged request race skip a response that would fail validation; output closed
+        # after truncation may validate but is incomplete, so it is never preferred or cached
+        try:
+            parsed = self._parse_response(response_text)
+        except json.JSONDecodeError:
+            return False
+        return not is_repaired(parsed) and validate_recommendations(parsed)[0]
+    
+    def _parse_response(self, response_text: str) -> Dict[str, Any]:
         
-        raise json.JSONDecodeError("Could not extract valid JSON", response_text, 0)
+        # One bracket- and string-aware pass; repairs fences, trailing commas and truncation
+        return extract_json(response_text, prefer=dict)
 
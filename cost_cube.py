@@ -0,0 +1,172 @@
+
+import heapq
+from itertools import combinations, product
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from billing_frame import BillingFrame
+
+CUBE_DIMENSIONS = ("month", "service", "region", "usage_type", "resource_id")
+CUBE_MEASURES = ("cost_inr", "usage_quantity", "record_count")
+
+
+def _group_rows(keys: np.ndarray, sizes: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Unique rows of an (n, d) code matrix and the inverse mapping."""
+    if keys.shape[1] == 0:
+        return np.zeros((1 if len(keys) else 0, 0), dtype=np.int64), np.zeros(len(keys), dtype=np.int64)
+
+    # Pack the codes into one int64 when the key space fits, which is much faster than unique(axis=0)
+    if float(np.prod([max(s, 1) for s in sizes], dtype=np.float64)) < 2 ** 62:
+        flat = np.ravel_multi_index(tuple(keys.T), tuple(max(s, 1) for s in sizes))
+        unique_flat, inverse = np.unique(flat, return_inverse=True)
+        unique_rows = np.stack(np.unravel_index(unique_flat, tuple(max(s, 1) for s in sizes)), axis=1)
+        return unique_rows, inverse.reshape(-1)
+
+    unique_rows, inverse = np.unique(keys, axis=0, return_inverse=True)
+    return unique_rows, inverse.reshape(-1)
+
+
+class _Cuboid:
+    """Aggregates for one subset of dimensions, with lazily built lookup indexes."""
+
+    def __init__(self, dims: Tuple[str, ...], keys: np.ndarray, values: Dict[str, np.ndarray]):
+
+        self.dims = dims
+        self.keys = keys
+        self.values = values
+        self._indexes = {}
+
+    def index(self, fixed: Tuple[str, ...]) -> Dict[Tuple[int, ...], np.ndarray]:
+        """Map of fixed-dimension codes -> cuboid rows; built once per query shape."""
+        if fixed not in self._indexes:
+            positions = [self.dims.index(d) for d in fixed]
+            sub_keys = self.keys[:, positions]
+            index = {}
+            if len(sub_keys):
+                order = np.lexsort(sub_keys.T[::-1]) if positions else np.arange(len(sub_keys))
+                sorted_keys = sub_keys[order]
+                if positions:
+                    boundaries = np.flatnonzero(np.any(sorted_keys[1:] != sorted_keys[:-1], axis=1)) + 1
+                else:
+                    boundaries = np.array([], dtype=np.int64)
+                for rows in np.split(order, boundaries):
+                    index[tuple(sub_keys[rows[0]].tolist())] = rows
+            self._indexes[fixed] = index
+        return self._indexes[fixed]
+
+
+class CostCube:
+    """Precomputed month x service x region x usage_type x resource_id cost cube.
+
+    Every subset of dimensions (32 cuboids) is aggregated once from the billing
+    load; rollups, slices and top-k queries are answered from those partial
+    aggregates and never rescan the raw records.
+    """
+
+    def __init__(self, frame: BillingFrame, dimensions: Sequence[str] = CUBE_DIMENSIONS):
+
+        self.dimensions = tuple(dimensions)
+        self.categories = {dim: frame.categories[dim] for dim in self.dimensions}
+        self._codes = {
+            dim: {value: code for code, value in enumerate(values)}
+            for dim, values in self.categories.items()
+        }
+        self.record_count = len(frame)
+        self.cuboids = self._build(frame)
+
+    @classmethod
+    def from_records(cls, billing_data: Union[List[Dict[str, Any]], Dict[str, Any]]) -> "CostCube":
+
+        return cls(BillingFrame.from_records(billing_data))
+
+    def _build(self, frame: BillingFrame) -> Dict[Tuple[str, ...], _Cuboid]:
+
+        sizes = [len(self.categories[dim]) for dim in self.dimensions]
+
+        # Base cuboid: one row per distinct combination of all dimensions
+        if len(frame):
+            keys = np.stack([frame.codes[dim].astype(np.int64) for dim in self.dimensions], axis=1)
+        else:
+            keys = np.zeros((0, len(self.dimensions)), dtype=np.int64)
+        base_keys, inverse = _group_rows(keys, sizes)
+        base_values = {
+            "cost_inr": np.bincount(inverse, weights=frame.measures["cost_inr"], minlength=len(base_keys)),
+            "usage_quantity": np.bincount(inverse, weights=frame.measures["usage_quantity"], minlength=len(base_keys)),
+            "record_count": np.bincount(inverse, minlength=len(base_keys)).astype(np.float64)
+        }
+
+        # Every coarser cuboid is rolled up from the base cuboid, not from the records
+        cuboids = {}
+        for size in range(len(self.dimensions) + 1):
+            for dims in combinations(self.dimensions, size):
+                positions = [self.dimensions.index(d) for d in dims]
+                sub_keys, sub_inverse = _group_rows(base_keys[:, positions], [sizes[p] for p in positions])
+                values = {
+                    measure: np.bincount(sub_inverse, weights=base_values[measure], minlength=len(sub_keys))
+                    for measure in CUBE_MEASURES
+                }
+                cuboids[dims] = _Cuboid(dims, sub_keys, values)
+        return cuboids
+
+    def _canonical(self, dims) -> Tuple[str, ...]:
+
+        unknown = [d for d in dims if d not in self.dimensions]
+        if unknown:
+            raise ValueError(f"Unknown cube dimension(s): {', '.join(unknown)}")
+        return tuple(d for d in self.dimensions if d in dims)
+
+    def rollup(
+        self,
+        group_by: Union[str, Sequence[str]] = (),
+        measure: str = "cost_inr",
+        **filters: Union[str, Sequence[str]]
+    ) -> Dict[Any, float]:
+        """Aggregate measure by group_by dims within a slice.
+
+        rollup("usage_type", service="Compute", region="ap-south-1", month="2025-12")
+        Keys are plain values for a single group dimension and tuples otherwise.
+        """
+        if measure not in CUBE_MEASURES:
+            raise ValueError(f"Unknown measure: {measure}")
+
+        group_by = (group_by,) if isinstance(group_by, str) else tuple(group_by)
+        fixed = self._canonical(filters.keys())
+        cuboid = self.cuboids[self._canonical(set(group_by) | set(fixed))]
+        group_positions = [cuboid.dims.index(d) for d in group_by]
+
+        # Translate filter values to codes; a value missing from the billing yields an empty slice
+        wanted = []
+        for dim in fixed:
+            values = filters[dim]
+            values = [values] if isinstance(values, str) else list(values)
+            wanted.append([self._codes[dim][v] for v in values if v in self._codes[dim]])
+
+        index = cuboid.index(fixed)
+        values = cuboid.values[measure]
+        result = {}
+        for fixed_key in product(*wanted):
+            rows = index.get(tuple(fixed_key))
+            if rows is None:
+                continue
+            for row in rows.tolist():
+                codes = cuboid.keys[row]
+                labels = tuple(self.categories[d][codes[p]] for d, p in zip(group_by, group_positions))
+                key = labels[0] if len(labels) == 1 else labels
+                result[key] = result.get(key, 0.0) + float(values[row])
+        return result
+
+    def total(self, measure: str = "cost_inr", **filters: Union[str, Sequence[str]]) -> float:
+
+        return sum(self.rollup((), measure, **filters).values(), 0.0)
+
+    def top_k(
+        self,
+        dim: str,
+        k: int = 5,
+        measure: str = "cost_inr",
+        **filters: Union[str, Sequence[str]]
+    ) -> List[Tuple[str, float]]:
+
+        totals = self.rollup(dim, measure, **filters)
+        return heapq.nlargest(k, totals.items(), key=lambda item: item[1])
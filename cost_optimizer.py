@@ -1,20 +1,26 @@
 
+import argparse
+import io
 import json
 import os
 import sys
 from typing import Dict, Any
 
-from profile_extractor import ProfileExtractor
-from billing_generator import BillingGenerator
-from cost_analyzer import CostAnalyzer
 from utils import (
     save_json, 
     load_json, 
     save_text, 
     load_text,
-    load_env_file,
+    load_config,
     create_project_structure
 )
+from instrumentation import export_run, stage_summary, start_run
+from report_writers import breakdown_tables, write_html_report, write_portfolio_html
+from run_history import RunHistory, history_enabled
+from stage_cache import STAGES, StageCache, stage_cache_enabled
+
+# The LLM stages (and huggingface_hub behind them) are imported inside the menu
+# options that need them, so viewing or exporting a saved report starts fast.
 
 
 class CloudCostOptimizer:
@@ -26,17 +32,25 @@ class CloudCostOptimizer:
         self.billing_data = None
         self.cost_report = None
         self.budget_threshold = 5000
+        self.report_page_size = 50
         
         # Load environment
         self._load_env()
         
         # Create project structure
         create_project_structure()
+        
+        # Every analysis is also appended to the run history
+        self.history = RunHistory() if history_enabled() else None
+        
+        # Stage outputs are memoized by a hash of their inputs
+        self.stage_cache = StageCache() if stage_cache_enabled() else None
     
     def _load_env(self):
         """Load environment configuration."""
-        env_vars = load_env_file(".env")
+        env_vars = load_config()
         self.budget_threshold = float(env_vars.get("BUDGET_THRESHOLD", 5000))
+        self.report_page_size = int(os.getenv("REPORT_PAGE_SIZE", 50))
     
     def run(self):
         """Run the main CLI menu."""
@@ -99,13 +113,10 @@ class CloudCostOptimizer:
         print(f"\n✓ Description saved ({len(self.project_description)} characters)")
         
         # Extract profile
-        print("\nExtracting project profile using LLM...")
+        print("\nExtracting project profile...")
         try:
-            extractor = ProfileExtractor()
-            self.project_profile = extractor.extract(self.project_description)
-            
-            save_json(self.project_profile, "sample_outputs/project_profile.json")
-            print("✓ Profile extracted and saved")
+            cached = self._extract_profile()
+            print("✓ Description unchanged, reused saved profile" if cached else "✓ Profile extracted and saved")
             
             print(f"\nProject Profile:")
             print(f"  Name: {self.project_profile.get('name')}")
@@ -122,6 +133,17 @@ class CloudCostOptimizer:
         print("Run Complete Cost Analysis")
         print("-"*60)
         
+        start_run()
+        try:
+            self._run_analysis()
+        finally:
+            if stage_summary():
+                _, trace_path = export_run()
+                self._display_stage_metrics()
+                print(f"✓ Trace saved to {trace_path}")
+    
+    def _run_analysis(self):
+        
         # Check prerequisites
         if not self.project_description:
             print("\n✗ Please enter a project description first (Option 1)")
@@ -134,9 +156,7 @@ class CloudCostOptimizer:
             
             print("Extracting profile...")
             try:
-                extractor = ProfileExtractor()
-                self.project_profile = extractor.extract(self.project_description)
-                save_json(self.project_profile, "sample_outputs/project_profile.json")
+                self._extract_profile()
             except Exception as e:
                 print(f"✗ Error: {str(e)}")
                 return
@@ -144,11 +164,22 @@ class CloudCostOptimizer:
         # Generate billing data
         print("\nGenerating synthetic billing data (12-20 records)...")
         try:
-            generator = BillingGenerator()
-            billing_array = generator.generate(self.project_profile)
+            from billing_generator import create_billing_generator
+            from validators import validate_billing
+            
+            generator = create_billing_generator()
+            billing_array, cached = self._run_stage(
+                "billing",
+                {"profile": self.project_profile, "settings": generator.fingerprint()},
+                lambda: generator.generate(self.project_profile),
+                accept=lambda billing: validate_billing(billing)[0]
+            )
             self.billing_data = billing_array  # Store as list directly
             save_json(billing_array, "sample_outputs/mock_billing.json")
-            print(f"✓ Generated {len(billing_array)} billing records")
+            if cached:
+                print(f"✓ Profile unchanged, reused {len(billing_array)} billing records")
+            else:
+                print(f"✓ Generated {len(billing_array)} billing records")
         except Exception as e:
             print(f"✗ Error generating billing: {str(e)}")
             return
@@ -156,10 +187,23 @@ class CloudCostOptimizer:
         # Analyze costs
         print("\nAnalyzing costs and generating recommendations...")
         try:
+            from cost_analyzer import CostAnalyzer
+            from validators import validate_recommendations
+            
             analyzer = CostAnalyzer(budget_threshold=self.budget_threshold)
-            self.cost_report = analyzer.analyze(self.project_profile, billing_array)
+            self.cost_report, cached = self._run_stage(
+                "analysis",
+                {"profile": self.project_profile, "billing": billing_array, "settings": analyzer.fingerprint()},
+                lambda: analyzer.analyze(self.project_profile, billing_array),
+                accept=lambda report: validate_recommendations(report)[0]
+            )
             save_json(self.cost_report, "sample_outputs/cost_optimization_report.json")
-            print("✓ Cost analysis complete")
+            if cached:
+                # Already in the history from the run that computed it; recording it again would skew trends
+                print("✓ Inputs unchanged, reused cost analysis")
+            else:
+                print("✓ Cost analysis complete")
+                self._record_history(billing_array)
         except Exception as e:
             print(f"✗ Error analyzing costs: {str(e)}")
             return
@@ -174,8 +218,10 @@ class CloudCostOptimizer:
         print("-"*60)
         
         if not self.cost_report:
-            # Try to load from file
+            # Try to load from file, then from the run history
             self.cost_report = load_json("sample_outputs/cost_optimization_report.json")
+            if not self.cost_report and self.history:
+                self.cost_report = self.history.load_report()
             if not self.cost_report:
                 print("\n✗ No cost analysis available. Run analysis first (Option 2)")
                 return
@@ -194,17 +240,67 @@ class CloudCostOptimizer:
                 print("\n✗ No report available. Run analysis first (Option 2)")
                 return
         
-        # Generate HTML report
-        html_content = self._generate_html_report()
+        if not self.billing_data:
+            self.billing_data = load_json("sample_outputs/mock_billing.json") or None
         
+        # Stream the HTML report straight to disk
         html_path = "sample_outputs/cost_optimization_report.html"
-        save_text(html_content, html_path)
+        try:
+            with open(html_path, "w", encoding="utf-8") as f:
+                write_html_report(
+                    self.cost_report,
+                    f,
+                    page_size=self.report_page_size,
+                    extra_tables=self._breakdown_tables()
+                )
+        except Exception as e:
+            print(f"\n✗ Error exporting report: {str(e)}")
+            return
         print(f"\n✓ Report exported to {html_path}")
         
         # Also show JSON path
         json_path = "sample_outputs/cost_optimization_report.json"
         print(f"✓ JSON report available at {json_path}")
     
+    def _breakdown_tables(self):
+        """Resource, usage type and region breakdowns of the current billing for the HTML report."""
+        from cost_cube import CostCube
+        
+        if not self.billing_data:
+            return []
+        return breakdown_tables(CostCube.from_records(self.billing_data))
+    
+    def _run_stage(self, stage, inputs, compute, accept=None):
+        """Stage output for these inputs, memoized when the stage cache is on; returns (value, cached)."""
+        if not self.stage_cache:
+            return compute(), False
+        return self.stage_cache.run(stage, inputs, compute, accept=accept)
+    
+    def _extract_profile(self) -> bool:
+        """Extract (or reuse) the profile for the current description and save it; returns True if reused."""
+        from profile_extractor import ProfileExtractor
+        from validators import validate_profile
+        
+        extractor = ProfileExtractor()
+        self.project_profile, cached = self._run_stage(
+            "profile",
+            {"description": self.project_description, "settings": extractor.fingerprint()},
+            lambda: extractor.extract(self.project_description),
+            accept=lambda profile: validate_profile(profile)[0]
+        )
+        save_json(self.project_profile, "sample_outputs/project_profile.json")
+        return cached
+    
+    def _record_history(self, billing_array):
+        """Append the current profile, billing and report to the run history."""
+        if not self.history:
+            return
+        try:
+            run_id = self.history.record_run(self.project_profile, self.cost_report, billing_array)
+            print(f"✓ Run #{run_id} added to history")
+        except Exception as e:
+            print(f"⚠️  Could not record run history: {str(e)}")
+    
     def _display_cost_summary(self):
         """Display cost analysis summary."""
         if not self.cost_report:
@@ -229,6 +325,22 @@ class CloudCostOptimizer:
         print(f"Savings Percentage: {summary.get('savings_percentage', 0):.1f}%")
         print(f"Number of Recommendations: {summary.get('recommendations_count', 0)}")
     
+    def _display_stage_metrics(self):
+        """Display per-stage timings, LLM attempts, retries and tokens for the last run."""
+        stages = stage_summary()
+        
+        print("\n" + "-"*40)
+        print("STAGE METRICS")
+        print("-"*40)
+        print(f"{'stage':<16}{'seconds':>9}{'calls':>7}{'retries':>9}{'invalid':>9}{'tokens':>9}{'cache':>8}")
+        for name, entry in stages.items():
+            tokens = entry.get("prompt_tokens", 0) + entry.get("completion_tokens", 0)
+            cache = f"{entry.get('cache_hits', 0)}/{entry.get('cache_hits', 0) + entry.get('cache_misses', 0)}"
+            print(
+                f"{name:<16}{entry['total_seconds']:>9.2f}{entry.get('attempts', 0):>7}{entry.get('retries', 0):>9}"
+                f"{entry.get('validation_failures', 0):>9}{tokens:>9}{cache:>8}"
+            )
+    
     def _display_recommendations(self):
         """Display cost optimization recommendations."""
         recommendations = self.cost_report.get("recommendations", [])
@@ -259,119 +371,254 @@ class CloudCostOptimizer:
         if not self.cost_report:
             return ""
         
-        analysis = self.cost_report.get("analysis", {})
-        recommendations = self.cost_report.get("recommendations", [])
-        summary = self.cost_report.get("summary", {})
-        
-        html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>Cloud Cost Optimization Report</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; background: #f5f5f5; }}
-        .container {{ max-width: 1000px; margin: 0 auto; background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-        h1 {{ color: #333; border-bottom: 2px solid #007bff; padding-bottom: 10px; }}
-        h2 {{ color: #555; margin-top: 30px; }}
-        .metric {{ display: inline-block; margin: 10px 20px 10px 0; padding: 15px; background: #f9f9f9; border-left: 4px solid #007bff; border-radius: 4px; }}
-        .metric-value {{ font-size: 24px; font-weight: bold; color: #007bff; }}
-        .metric-label {{ font-size: 12px; color: #666; text-transform: uppercase; }}
-        .over-budget {{ border-left-color: #dc3545; }}
-        .over-budget .metric-value {{ color: #dc3545; }}
-        .within-budget {{ border-left-color: #28a745; }}
-        .within-budget .metric-value {{ color: #28a745; }}
-        table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-        th {{ background: #007bff; color: white; padding: 12px; text-align: left; }}
-        td {{ padding: 12px; border-bottom: 1px solid #ddd; }}
-        tr:hover {{ background: #f5f5f5; }}
-        .footer {{ margin-top: 30px; color: #666; font-size: 12px; text-align: center; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Cloud Cost Optimization Report</h1>
-        
-        <h2>Cost Analysis Summary</h2>
-        <div class="metric {'over-budget' if analysis.get('is_over_budget') else 'within-budget'}">
-            <div class="metric-label">Total Monthly Cost</div>
-            <div class="metric-value">₹{analysis.get('total_monthly_cost', 0):,.0f}</div>
-        </div>
-        <div class="metric">
-            <div class="metric-label">Budget</div>
-            <div class="metric-value">₹{analysis.get('budget', 0):,.0f}</div>
-        </div>
-        <div class="metric">
-            <div class="metric-label">Budget Variance</div>
-            <div class="metric-value">₹{analysis.get('budget_variance', 0):,.0f}</div>
-        </div>
-        <div class="metric">
-            <div class="metric-label">Total Potential Savings</div>
-            <div class="metric-value">₹{summary.get('total_potential_savings', 0):,.0f}</div>
-        </div>
-        
-        <h2>High-Cost Services</h2>
-        <table>
-            <tr>
-                <th>Service</th>
-                <th>Monthly Cost (INR)</th>
-            </tr>
-"""
-        
-        for service, cost in analysis.get("high_cost_services", {}).items():
-            html += f"""            <tr>
-                <td>{service}</td>
-                <td>₹{cost:,.2f}</td>
-            </tr>
-"""
-        
-        html += """        </table>
-        
-        <h2>Cost Optimization Recommendations</h2>
-        <table>
-            <tr>
-                <th>Recommendation</th>
-                <th>Service</th>
-                <th>Potential Savings</th>
-                <th>Type</th>
-                <th>Effort</th>
-                <th>Risk</th>
-            </tr>
-"""
-        
-        for rec in recommendations[:10]:
-            html += f"""            <tr>
-                <td><strong>{rec.get('title', 'Unknown')}</strong></td>
-                <td>{rec.get('service', 'Unknown')}</td>
-                <td>₹{rec.get('potential_savings', 0):,.0f}</td>
-                <td>{rec.get('recommendation_type', 'Unknown')}</td>
-                <td>{rec.get('implementation_effort', 'Unknown')}</td>
-                <td>{rec.get('risk_level', 'Unknown')}</td>
-            </tr>
-"""
-        
-        html += f"""        </table>
-        
-        <h2>Summary</h2>
-        <ul>
-            <li><strong>Total Potential Savings:</strong> ₹{summary.get('total_potential_savings', 0):,.0f}</li>
-            <li><strong>Savings Percentage:</strong> {summary.get('savings_percentage', 0):.1f}%</li>
-            <li><strong>Total Recommendations:</strong> {summary.get('recommendations_count', 0)}</li>
-            <li><strong>High-Impact Recommendations:</strong> {summary.get('high_impact_recommendations', 0)}</li>
-        </ul>
-        
-        <div class="footer">
-            <p>Generated by AI-Powered Cloud Cost Optimizer</p>
-            <p>For more details, see the JSON report files</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
-        return html
+        buffer = io.StringIO()
+        write_html_report(self.cost_report, buffer, page_size=self.report_page_size, extra_tables=self._breakdown_tables())
+        return buffer.getvalue()
+
+def _parse_args(argv=None):
+    
+    parser = argparse.ArgumentParser(description="AI-Powered Cloud Cost Optimizer")
+    parser.add_argument(
+        "--batch",
+        metavar="PATH",
+        help="Run non-interactively over a directory of .txt/.md descriptions or a JSONL file"
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Parallel workers for batch mode (default: 4)")
+    parser.add_argument("--output-dir", default="batch_outputs", help="Per-project output directory for batch mode")
+    parser.add_argument(
+        "--billing-generator",
+        choices=["llm", "synthetic"],
+        help="Billing source: LLM (default) or the seeded local synthetic generator"
+    )
+    parser.add_argument(
+        "--billing-file",
+        metavar="PATH",
+        help="Analyze a real billing export (.csv/.jsonl, optionally .gz) instead of synthetic billing"
+    )
+    parser.add_argument(
+        "--profile",
+        default="sample_outputs/project_profile.json",
+        help="Project profile JSON used with --billing-file"
+    )
+    parser.add_argument(
+        "--cost-multiplier",
+        type=float,
+        default=1.0,
+        help="Factor converting the export's cost column to INR (e.g. the USD rate for AWS CUR)"
+    )
+    parser.add_argument(
+        "--metrics-state",
+        metavar="PATH",
+        help="Fold --billing-file into this persisted metrics state (re-folding the same file replaces it)"
+    )
+    parser.add_argument(
+        "--portfolio",
+        metavar="PATH",
+        help="Roll up many projects: a batch output directory or a JSONL file of {id, profile, billing}"
+    )
+    parser.add_argument(
+        "--invalidate-cache",
+        nargs="?",
+        const="all",
+        choices=("all",) + STAGES,
+        metavar="STAGE",
+        help="Drop memoized stage outputs: all, or profile/billing/analysis and the stages after it"
+    )
+    parser.add_argument(
+        "--history",
+        nargs="?",
+        const="",
+        metavar="PROJECT",
+        help="Show past runs from the run history, or the savings trend of one project"
+    )
+    parser.add_argument(
+        "--history-recommendations",
+        metavar="SERVICE",
+        help="List high-impact recommendations for a service across projects' latest runs"
+    )
+    return parser.parse_args(argv)
+
+
+def run_batch(source: str, workers: int = 4, output_dir: str = "batch_outputs") -> int:
+    """Analyze every project in source; returns a process exit code."""
+    from batch_runner import BatchRunner, load_descriptions
+    
+    env_vars = load_config()
+    projects = load_descriptions(source)
+    if not projects:
+        print(f"✗ No project descriptions found in {source}")
+        return 1
+    
+    runner = BatchRunner(
+        output_dir=output_dir,
+        workers=workers,
+        budget_threshold=float(env_vars.get("BUDGET_THRESHOLD", 5000))
+    )
+    summary = runner.run(projects)
+    return 0 if summary["failed"] == 0 else 2
+
+
+def run_billing_file(
+    billing_path: str,
+    profile_path: str,
+    cost_multiplier: float = 1.0,
+    state_path: str = None
+) -> int:
+    """Stream a billing export through the analyzer; returns a process exit code."""
+    from billing_ingest import IngestStats, iter_billing_chunks
+    from cost_analyzer import CostAnalyzer
+    from incremental_metrics import MetricsState
+    
+    profile = load_json(profile_path)
+    if not profile:
+        print(f"✗ Project profile not found: {profile_path}")
+        return 1
+    
+    env_vars = load_config()
+    analyzer = CostAnalyzer(budget_threshold=float(env_vars.get("BUDGET_THRESHOLD", 5000)))
+    
+    stats = IngestStats()
+    chunks = iter_billing_chunks(billing_path, cost_multiplier=cost_multiplier, stats=stats)
+    
+    if state_path:
+        # Only the new file is read; earlier files contribute through the saved state
+        print(f"\nFolding {billing_path} into {state_path}...")
+        state = MetricsState.load(state_path)
+        state.fold_chunks(chunks, source_id=os.path.basename(billing_path))
+        state.save(state_path)
+        print(f"✓ State covers {len(state.sources)} billing file(s), {state.totals['record_count']} records")
+        report = analyzer.analyze_state(profile, state)
+    else:
+        print(f"\nAnalyzing billing export {billing_path}...")
+        report = analyzer.analyze_stream(profile, chunks)
+    
+    if stats.rejected:
+        # Skipped rows would otherwise understate spend without a trace
+        print(f"⚠️  Skipped {stats.rejected} of {stats.rows} rows with an unparseable cost or quantity")
+        for example in stats.examples:
+            print(f"   - {example}")
+        report["ingest"] = stats.to_dict()
+    
+    report_path = "sample_outputs/cost_optimization_report.json"
+    save_json(report, report_path)
+    print(f"✓ Report saved to {report_path}")
+    
+    if history_enabled():
+        # The export was streamed, so only the report and its recommendations are kept
+        run_id = RunHistory().record_run(profile, report)
+        print(f"✓ Run #{run_id} added to history")
+    return 0
+
+
+def run_portfolio(source: str) -> int:
+    """Analyze many (profile, billing) pairs in one pass; returns a process exit code."""
+    from portfolio import PortfolioAnalyzer, load_portfolio
+    
+    projects = load_portfolio(source)
+    if not projects:
+        print(f"✗ No projects with a profile and billing found in {source}")
+        return 1
+    
+    print(f"\nAnalyzing portfolio of {len(projects)} projects...")
+    report = PortfolioAnalyzer().analyze(projects)
+    portfolio = report["portfolio"]
+    
+    print(f"Total Monthly Cost:      ₹{portfolio['total_monthly_cost']:,.2f}")
+    print(f"Total Budget:            ₹{portfolio['total_budget']:,.2f}")
+    print(f"Budget Variance:         ₹{portfolio['budget_variance']:,.2f}")
+    print(f"Over-Budget Projects:    {portfolio['over_budget_count']}")
+    print(f"Total Potential Savings: ₹{portfolio['total_potential_savings']:,.2f} ({portfolio['savings_percentage']:.1f}%)")
+    
+    projects_by_id = {p["id"]: p for p in report["projects"]}
+    print("\nLargest overspend:")
+    for project_id in report["rankings"]["by_variance"][:5]:
+        project = projects_by_id[project_id]
+        print(f"  {project_id:<28} ₹{project['budget_variance']:>14,.0f} ({project['budget_variance_pct']:+.1f}%)")
+    print("\nLargest savings:")
+    for project_id in report["rankings"]["by_savings"][:5]:
+        print(f"  {project_id:<28} ₹{projects_by_id[project_id]['potential_savings']:>14,.0f}")
+    
+    json_path = "sample_outputs/portfolio_report.json"
+    html_path = "sample_outputs/portfolio_report.html"
+    save_json(report, json_path)
+    with open(html_path, "w", encoding="utf-8") as f:
+        write_portfolio_html(report, f, page_size=int(os.getenv("REPORT_PAGE_SIZE", 50)))
+    print(f"\n✓ Portfolio report saved to {json_path} and {html_path}")
+    return 0
+
+
+def invalidate_stage_cache(stage: str = "all") -> int:
+    """Drop memoized outputs of stage and everything downstream; returns a process exit code."""
+    removed = StageCache().invalidate(None if stage == "all" else stage)
+    scope = "all stages" if stage == "all" else f"{stage} and downstream stages"
+    print(f"✓ Removed {removed} memoized output(s) for {scope}")
+    return 0
+
+
+def show_history(project: str = None, service: str = None) -> int:
+    """Print runs, a project's savings trend or cross-project recommendations; returns an exit code."""
+    from datetime import datetime
+    
+    history = RunHistory()
+    
+    def timestamp(value):
+        return datetime.fromtimestamp(value).strftime("%Y-%m-%d %H:%M")
+    
+    if service:
+        recommendations = history.recommendations(service=service, high_impact_only=True, latest_only=True)
+        print(f"\nHigh-impact {service} recommendations ({len(recommendations)}):")
+        for rec in recommendations:
+            print(f"  {rec['project']:<28} ₹{rec.get('potential_savings', 0):>12,.0f}  {rec.get('title', 'Unknown')}")
+        return 0
+    
+    if project:
+        trend = history.savings_trend(project)
+        if not trend:
+            print(f"\n✗ No runs recorded for {project}")
+            return 1
+        print(f"\nSavings trend for {project}:")
+        print(f"{'run':>6}  {'time':<17}{'month':<9}{'cost':>14}{'savings':>14}{'%':>7}")
+        for run in trend:
+            print(
+                f"{run['run_id']:>6}  {timestamp(run['created_at']):<17}{run['billing_month'] or '-':<9}"
+                f"{run['total_monthly_cost'] or 0:>14,.0f}{run['total_potential_savings'] or 0:>14,.0f}"
+                f"{run['savings_percentage'] or 0:>7.1f}"
+            )
+        return 0
+    
+    projects = history.projects()
+    if not projects:
+        print("\nNo runs recorded yet.")
+        return 0
+    print(f"\n{'project':<32}{'runs':>6}  last run")
+    for entry in projects:
+        print(f"{entry['project']:<32}{entry['runs']:>6}  {timestamp(entry['last_run_at'])}")
+    return 0
 
 
 def main():
     """Main entry point."""
+    args = _parse_args()
+    if args.billing_generator:
+        os.environ["BILLING_GENERATOR"] = args.billing_generator
+    
     try:
+        if args.portfolio:
+            sys.exit(run_portfolio(args.portfolio))
+        if args.invalidate_cache:
+            sys.exit(invalidate_stage_cache(args.invalidate_cache))
+        if args.history is not None or args.history_recommendations:
+            sys.exit(show_history(args.history, args.history_recommendations))
+        if args.batch:
+            sys.exit(run_batch(args.batch, workers=args.workers, output_dir=args.output_dir))
+        if args.billing_file:
+            sys.exit(run_billing_file(
+                args.billing_file,
+                args.profile,
+                cost_multiplier=args.cost_multiplier,
+                state_path=args.metrics_state
+            ))
+        
         optimizer = CloudCostOptimizer()
         optimizer.run()
     except KeyboardInterrupt:
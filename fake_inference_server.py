@@ -0,0 +1,473 @@
+
+"""Offline stand-in for the HuggingFace chat-completions endpoint.
+
+Point HUGGINGFACE_MODEL (or a stage's model argument) at FakeInferenceServer.url
+and the real HFInferenceClient talks to it over HTTP, streaming included.
+Responses are scripted per pipeline stage (profile, billing, recommendations,
+narrative) and the server can inject latency, 429/503 errors, malformed JSON
+and JSON that parses but fails validation.
+
+    python fake_inference_server.py --port 8089 --latency lognormal:0.4,0.5 --overload 0.05
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List
+
+STAGES = ("profile", "billing", "recommendations", "narrative", "unknown")
+
+# First line of each stage's prompt template
+STAGE_MARKERS = (
+    ("profile", "Extract project information from the description"),
+    ("billing", "Generate realistic synthetic cloud billing records"),
+    ("recommendations", "Generate cost optimization recommendations"),
+    ("narrative", "Write a short executive summary")
+)
+
+TECH_KEYWORDS = {
+    "frontend": ["React", "Angular", "Vue", "Next.js", "Flutter", "React Native"],
+    "backend": ["Node.js", "Django", "Flask", "FastAPI", "Spring Boot", "Go", "Rails"],
+    "database": ["PostgreSQL", "MySQL", "MongoDB", "Redis", "DynamoDB"],
+    "proxy": ["Nginx", "HAProxy", "Envoy", "Traefik"],
+    "hosting": ["AWS", "Azure", "GCP", "DigitalOcean", "Kubernetes"]
+}
+NFR_PHRASES = ["high availability", "low latency", "scalability", "security", "compliance", "disaster recovery"]
+
+# (service, resource_id, usage_type, unit, share of the monthly budget)
+BILLING_LINES = [
+    ("Compute", "instance-001", "On-Demand", "hours", 0.22),
+    ("Compute", "instance-002", "On-Demand", "hours", 0.14),
+    ("Database", "db-primary", "On-Demand", "hours", 0.18),
+    ("Database", "db-replica", "On-Demand", "hours", 0.08),
+    ("Storage", "bucket-assets", "Standard", "GB", 0.07),
+    ("CDN", "cdn-main", "Data Transfer", "GB-transfer", 0.08),
+    ("Networking", "lb-main", "On-Demand", "hours", 0.09),
+    ("Monitoring", "monitoring", "Standard", "requests", 0.04)
+]
+
+RECOMMENDATION_TYPES = [
+    ("Reserved Instances", "Compute", 0.30, "low", "low"),
+    ("Right-sizing", "Compute", 0.20, "medium", "low"),
+    ("Auto-scaling", "Compute", 0.15, "medium", "medium"),
+    ("Reserved Instances", "Database", 0.25, "low", "low"),
+    ("Caching", "Database", 0.10, "medium", "low"),
+    ("Storage Tiering", "Storage", 0.35, "low", "low"),
+    ("CDN Optimization", "CDN", 0.20, "low", "low"),
+    ("Open-source Alternatives", "Monitoring", 0.50, "high", "medium")
+]
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Latency sampler from "fixed:S", "uniform:A,B", "normal:MEAN,SD", "lognormal:MEDIAN,SIGMA" or "exponential:MEAN"."""
+    kind, _, args = (spec or "fixed:0").partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()] if args else []
+
+    if kind == "fixed":
+        seconds = values[0] if values else 0.0
+        return lambda rng: seconds
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal" and len(values) == 2:
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal" and len(values) == 2 and values[0] > 0:
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    if kind == "exponential" and len(values) == 1 and values[0] > 0:
+        return lambda rng: rng.expovariate(1.0 / values[0])
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+def classify_prompt(prompt: str) -> str:
+
+    for stage, marker in STAGE_MARKERS:
+        if marker in prompt:
+            return stage
+    return "unknown"
+
+
+def _number(pattern: str, text: str, default: float) -> float:
+
+    match = re.search(pattern, text)
+    if not match:
+        return default
+    return float(match.group(1).replace(",", ""))
+
+
+def _keywords(text: str, words: List[str]) -> List[str]:
+
+    return [word for word in words if re.search(r"(?<!\w)" + re.escape(word) + r"(?!\w)", text, re.IGNORECASE)]
+
+
+class ScriptedResponder:
+    """Valid (and deliberately invalid) completions for each stage's prompt."""
+
+    def __init__(self, rng: random.Random):
+
+        self.rng = rng
+
+    def valid(self, stage: str, prompt: str) -> str:
+
+        if stage == "profile":
+            return json.dumps(self._profile(prompt), indent=2)
+        if stage == "billing":
+            return json.dumps(self._billing(prompt), indent=2)
+        if stage == "recommendations":
+            return json.dumps(self._report(prompt), indent=2)
+        if stage == "narrative":
+            return (
+                "Compute and the primary database account for most of the monthly spend. "
+                "Committing to reserved capacity for the steady baseline is the quickest win. "
+                "Right-sizing the busiest instances comes next, followed by moving cold storage to a cheaper tier. "
+                "Together these keep the project comfortably within budget."
+            )
+        return '{"message": "fake inference server"}'
+
+    def invalid(self, stage: str, prompt: str) -> str:
+        """JSON that parses but fails the stage's validator."""
+        if stage == "profile":
+            profile = self._profile(prompt)
+            del profile["tech_stack"]
+            return json.dumps(profile)
+        if stage == "billing":
+            records = self._billing(prompt)
+            for record in records:
+                record["cost_inr"] = str(record["cost_inr"])
+            return json.dumps(records)
+        if stage == "recommendations":
+            report = self._report(prompt)
+            for rec in report["recommendations"]:
+                rec["risk_level"] = "extreme"
+            return json.dumps(report)
+        return self.valid(stage, prompt)
+
+    def malformed(self, content: str) -> str:
+        """Output no JSON repair can fix: truncated before the first element, or single-quoted."""
+        if self.rng.random() < 0.5:
+            return "Sure! Here is the JSON you asked for:\n" + content[:self.rng.randint(1, 20)]
+        return content.replace('"', "'")
+
+    def _profile(self, prompt: str) -> Dict[str, Any]:
+
+        match = re.search(r"Project Description:\n(.*?)\n\nRules:", prompt, re.DOTALL)
+        description = match.group(1).strip() if match else prompt
+        budget = int(_number(r"(?:₹|INR|Rs\.?)\s*([\d,]+)", description, 50000))
+        words = re.findall(r"[A-Za-z]+", description)
+        tech = {slot: (_keywords(description, words_)[:1] or [None])[0] for slot, words_ in TECH_KEYWORDS.items()}
+
+        return {
+            "name": " ".join(words[:3]).title() or "Fake Project",
+            "budget_inr_per_month": budget,
+            "description": description[:200],
+            "tech_stack": tech,
+            "non_functional_requirements": _keywords(description, NFR_PHRASES)
+        }
+
+    def _billing(self, prompt: str) -> List[Dict[str, Any]]:
+
+        budget = _number(r"Budget: ₹([\d,.]+)", prompt, 50000)
+        records = []
+        for month, scale in (("2025-11", 0.95), ("2025-12", 1.0)):
+            for service, resource_id, usage_type, unit, share in BILLING_LINES:
+                cost = round(budget * share * scale * self.rng.uniform(0.9, 1.1), 2)
+                records.append({
+                    "month": month,
+                    "service": service,
+                    "resource_id": resource_id,
+                    "region": "ap-south-1",
+                    "usage_type": usage_type,
+                    "usage_quantity": round(cost / 4.5, 2) if unit == "hours" else round(cost * 1.7, 2),
+                    "unit": unit,
+                    "cost_inr": cost,
+                    "desc": f"{service} {resource_id} for {month}"
+                })
+        return records
+
+    def _report(self, prompt: str) -> Dict[str, Any]:
+
+        budget = _number(r"Budget: ₹([\d,.]+)", prompt, 50000)
+        total = _number(r"Current Monthly Cost: ₹([\d,.]+)", prompt, budget)
+        count = self.rng.randint(6, len(RECOMMENDATION_TYPES))
+        recommendations = []
+        for rec_type, service, share, effort, risk in RECOMMENDATION_TYPES[:count]:
+            current = round(total * 0.2, 2)
+            recommendations.append({
+                "title": f"{rec_type} for {service}",
+                "service": service,
+                "current_cost": current,
+                "potential_savings": round(current * share, 2),
+                "recommendation_type": rec_type,
+                "description": f"Apply {rec_type.lower()} to {service.lower()} resources.",
+                "implementation_effort": effort,
+                "risk_level": risk,
+                "steps": ["Review usage", "Apply the change", "Monitor costs"],
+                "cloud_providers": ["AWS", "Azure", "GCP"]
+            })
+        savings = round(sum(r["potential_savings"] for r in recommendations), 2)
+
+        return {
+            "analysis": {
+                "total_monthly_cost": total,
+                "budget": budget,
+                "budget_variance": round(total - budget, 2),
+                "is_over_budget": total > budget,
+                "service_costs": {},
+                "high_cost_services": {}
+            },
+            "recommendations": recommendations,
+            "summary": {
+                "total_potential_savings": savings,
+                "savings_percentage": round(savings / total * 100, 2) if total else 0.0,
+                "recommendations_count": len(recommendations),
+                "high_impact_recommendations": sum(1 for r in recommendations if r["potential_savings"] > total * 0.05)
+            }
+        }
+
+
+class FakeInferenceServer:
+    """Chat-completions server on a background thread; use as a context manager."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: str = "fixed:0",
+        stage_latency: Dict[str, str] = None,
+        token_delay: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        overload_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        invalid_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: int = 42
+    ):
+
+        self.host = host
+        self.port = port
+        self.latency = parse_latency(latency)
+        self.stage_latency = {stage: parse_latency(spec) for stage, spec in (stage_latency or {}).items()}
+        self.token_delay = token_delay
+        self.rate_limit_rate = rate_limit_rate
+        self.overload_rate = overload_rate
+        self.malformed_rate = malformed_rate
+        self.invalid_rate = invalid_rate
+        self.retry_after = retry_after
+
+        self.rng = random.Random(seed)
+        self.responder = ScriptedResponder(self.rng)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self._stats = {"connections": 0, "requests": {stage: 0 for stage in STAGES}}
+        for outcome in ("ok", "rate_limited", "overloaded", "malformed", "invalid"):
+            self._stats[outcome] = 0
+
+    @property
+    def url(self) -> str:
+
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "FakeInferenceServer":
+
+        fake = self
+
+        class Handler(_ChatCompletionsHandler):
+            server_fake = fake
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_port
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-inference", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeInferenceServer":
+
+        return self.start()
+
+    def __exit__(self, *exc_info):
+
+        self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+
+        with self._lock:
+            stats = dict(self._stats)
+            stats["requests"] = dict(self._stats["requests"])
+        return stats
+
+    def _count(self, key: str):
+
+        with self._lock:
+            self._stats[key] += 1
+
+    def plan(self, prompt: str):
+        """(stage, outcome, latency_seconds, content) for one request."""
+        stage = classify_prompt(prompt)
+        with self._lock:
+            roll = self.rng.random()
+            latency = self.stage_latency.get(stage, self.latency)(self.rng)
+            content_roll = self.rng.random()
+
+        if roll < self.rate_limit_rate:
+            outcome = "rate_limited"
+        elif roll < self.rate_limit_rate + self.overload_rate:
+            outcome = "overloaded"
+        elif stage not in ("narrative", "unknown") and content_roll < self.malformed_rate:
+            outcome = "malformed"
+        elif stage not in ("narrative", "unknown") and content_roll < self.malformed_rate + self.invalid_rate:
+            outcome = "invalid"
+        else:
+            outcome = "ok"
+
+        with self._lock:
+            if outcome == "invalid":
+                content = self.responder.invalid(stage, prompt)
+            elif outcome in ("ok", "malformed"):
+                content = self.responder.valid(stage, prompt)
+                if outcome == "malformed":
+                    content = self.responder.malformed(content)
+            else:
+                content = None
+            self._stats["requests"][stage] += 1
+            self._stats[outcome] += 1
+        return stage, outcome, latency, content
+
+
+class _ChatCompletionsHandler(BaseHTTPRequestHandler):
+
+    # HTTP/1.1 so clients can keep connections alive between requests
+    protocol_version = "HTTP/1.1"
+    server_fake: FakeInferenceServer = None
+
+    def setup(self):
+
+        super().setup()
+        self.server_fake._count("connections")
+
+    def log_message(self, format, *args):
+
+        pass
+
+    def do_POST(self):
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "Request body is not JSON"})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+            return
+
+        messages = body.get("messages") or [{}]
+        prompt = messages[-1].get("content", "")
+        stage, outcome, latency, content = self.server_fake.plan(prompt)
+        time.sleep(latency)
+
+        if outcome == "rate_limited":
+            self._send_json(429, {"error": "Rate limit reached, please retry later"}, {"Retry-After": str(self.server_fake.retry_after)})
+        elif outcome == "overloaded":
+            self._send_json(503, {"error": "Model is overloaded, please try again later"})
+        elif body.get("stream"):
+            self._send_stream(body.get("model", "fake"), content)
+        else:
+            self._send_json(200, {
+                "id": f"fake-{stage}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4, "total_tokens": (len(prompt) + len(content)) // 4}
+            })
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None):
+
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, model: str, content: str):
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        try:
+            for start in range(0, len(content), 16):
+                chunk = {
+                    "id": "fake-stream",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"role": "assistant", "content": content[start:start + 16]}, "finish_reason": None}]
+                }
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+                if self.server_fake.token_delay:
+                    time.sleep(self.server_fake.token_delay)
+            self._write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client aborted the stream early (e.g. StreamAbort on an invalid record)
+            self.close_connection = True
+
+    def _write_chunk(self, text: str):
+
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Offline fake HuggingFace chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="fixed:0", help='e.g. "lognormal:0.4,0.5" (median seconds, sigma)')
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--overload", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--malformed", type=float, default=0.0, help="Fraction of completions with unparseable JSON")
+    parser.add_argument("--invalid", type=float, default=0.0, help="Fraction of completions failing validation")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    server = FakeInferenceServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        rate_limit_rate=args.rate_limit,
+        overload_rate=args.overload,
+        malformed_rate=args.malformed,
+        invalid_rate=args.invalid,
+        seed=args.seed
+    ).start()
+    print(f"Fake inference server listening on {server.url}")
+    print(f"Use HUGGINGFACE_MODEL={server.url} and any HUGGINGFACE_API_KEY")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+        print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+
+import os
+from typing import Any, Dict, Iterable, List, Union
+
+import numpy as np
+
+from billing_frame import BillingFrame
+from utils import load_json, save_json
+
+STATE_DIMENSIONS = ("service", "month", "region", "usage_type")
+UNATTRIBUTED = ""
+
+BillingInput = Union[BillingFrame, List[Dict[str, Any]], Dict[str, Any]]
+
+
+def _empty_partial(dimensions) -> Dict[str, Any]:
+
+    return {"total_cost": 0.0, "record_count": 0, "by": {dim: {} for dim in dimensions}}
+
+
+def _frame_partial(frame: BillingFrame, dimensions) -> Dict[str, Any]:
+    """Sums, counts and per-key [cost, count] partials for one billing frame."""
+    partial = _empty_partial(dimensions)
+    partial["total_cost"] = frame.total()
+    partial["record_count"] = len(frame)
+    for dim in dimensions:
+        sums = frame.group_sums(dim).tolist()
+        counts = np.bincount(frame.codes[dim], minlength=len(frame.categories[dim])).tolist()
+        partial["by"][dim] = {
+            key: [cost, count]
+            for key, cost, count in zip(frame.categories[dim], sums, counts)
+            if count
+        }
+    return partial
+
+
+def _apply(target: Dict[str, Any], partial: Dict[str, Any], sign: int):
+
+    target["total_cost"] += sign * partial["total_cost"]
+    target["record_count"] += sign * partial["record_count"]
+    for dim, entries in partial["by"].items():
+        bucket = target["by"].setdefault(dim, {})
+        for key, (cost, count) in entries.items():
+            current = bucket.get(key, [0.0, 0])
+            current = [current[0] + sign * cost, current[1] + sign * count]
+            if current[1] <= 0:
+                bucket.pop(key, None)
+            else:
+                bucket[key] = current
+
+    # Guard against float residue once everything has been retracted
+    if target["record_count"] <= 0:
+        target["total_cost"] = 0.0
+        target["record_count"] = 0
+
+
+class MetricsState:
+    """Persisted, mergeable billing aggregates that grow by folding in new data.
+
+    Each fold is attributed to a source id (e.g. a monthly billing file), so a
+    corrected file can retract and replace its earlier contribution. Updating
+    costs time proportional to the new data, never to the full history.
+    """
+
+    def __init__(self, dimensions=STATE_DIMENSIONS):
+
+        self.dimensions = tuple(dimensions)
+        self.totals = _empty_partial(self.dimensions)
+        self.sources = {}
+
+    def fold(self, billing_data: BillingInput, source_id: str = UNATTRIBUTED) -> "MetricsState":
+        """Add billing records; an existing source id is replaced rather than double-counted."""
+        frame = billing_data if isinstance(billing_data, BillingFrame) else BillingFrame.from_records(billing_data)
+        return self._fold_partial(_frame_partial(frame, self.dimensions), source_id)
+
+    def fold_chunks(self, billing_chunks: Iterable[BillingInput], source_id: str = UNATTRIBUTED) -> "MetricsState":
+
+        partial = _empty_partial(self.dimensions)
+        for chunk in billing_chunks:
+            frame = chunk if isinstance(chunk, BillingFrame) else BillingFrame.from_records(chunk)
+            _apply(partial, _frame_partial(frame, self.dimensions), 1)
+        return self._fold_partial(partial, source_id)
+
+    def _fold_partial(self, partial: Dict[str, Any], source_id: str) -> "MetricsState":
+
+        if source_id != UNATTRIBUTED and source_id in self.sources:
+            self.retract(source_id)
+
+        existing = self.sources.setdefault(source_id, _empty_partial(self.dimensions))
+        _apply(existing, partial, 1)
+        _apply(self.totals, partial, 1)
+        return self
+
+    def retract(self, source_id: str) -> bool:
+
+        partial = self.sources.pop(source_id, None)
+        if partial is None:
+            return False
+        _apply(self.totals, partial, -1)
+        return True
+
+    def merge(self, other: "MetricsState") -> "MetricsState":
+        """Fold another state in source by source (same-id sources are replaced)."""
+        for source_id, partial in other.sources.items():
+            self._fold_partial(partial, source_id)
+        return self
+
+    def metrics(self, top_n: int = 5) -> Dict[str, Any]:
+        """Metrics in the same shape as CostAnalyzer._calculate_metrics."""
+        cost_per_service = {k: v[0] for k, v in self.totals["by"].get("service", {}).items()}
+        high_cost_services = sorted(
+            cost_per_service.items(),
+            key=lambda x: x[1],
+            reverse=True
+        )[:top_n]
+
+        return {
+            "total_cost": round(self.totals["total_cost"], 2),
+            "record_count": self.totals["record_count"],
+            "cost_per_service": {k: round(v, 2) for k, v in cost_per_service.items()},
+            "high_cost_services": [
+                {"service": service, "cost": round(cost, 2)}
+                for service, cost in high_cost_services
+            ]
+        }
+
+    def breakdown(self, dim: str) -> Dict[str, float]:
+
+        return {k: round(v[0], 2) for k, v in self.totals["by"].get(dim, {}).items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+
+        return {"dimensions": list(self.dimensions), "totals": self.totals, "sources": self.sources}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MetricsState":
+
+        state = cls(data.get("dimensions", STATE_DIMENSIONS))
+        if data.get("totals"):
+            state.totals = data["totals"]
+        state.sources = data.get("sources", {})
+        return state
+
+    def save(self, filepath: str) -> bool:
+
+        return save_json(self.to_dict(), filepath)
+
+    @classmethod
+    def load(cls, filepath: str) -> "MetricsState":
+        """Load a saved state, or start an empty one if the file does not exist."""
+        if not os.path.exists(filepath):
+            return cls()
+        return cls.from_dict(load_json(filepath))
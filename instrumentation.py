@@ -0,0 +1,312 @@
+
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# name -> (type, help); label sets are whatever the call sites pass
+METRICS = {
+    "cco_stage_duration_seconds": ("histogram", "Wall time of pipeline stages."),
+    "cco_stage_runs_total": ("counter", "Pipeline stage executions by outcome."),
+    "cco_llm_attempts_total": ("counter", "LLM requests sent (every attempt, hedges included)."),
+    "cco_llm_request_seconds": ("histogram", "Latency of individual LLM requests."),
+    "cco_llm_retries_total": ("counter", "Retries by reason (transport errors, invalid JSON, failed validation)."),
+    "cco_cache_lookups_total": ("counter", "Response cache lookups by result."),
+    "cco_tokens_total": ("counter", "Estimated prompt and completion tokens."),
+    "cco_validation_failures_total": ("counter", "LLM responses rejected by JSON parsing or schema validation.")
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_current = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed unit of work (a stage, a project) with counters and events recorded inside it."""
+
+    def __init__(self, name: str, span_id: int, parent_id: Optional[int], attributes: Dict[str, Any]):
+
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.counters: Dict[str, int] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration = None
+        self.status = "ok"
+        self.error = None
+
+    def to_dict(self) -> Dict[str, Any]:
+
+        return {
+            "id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "started_at": round(self.started_at, 6),
+            "duration_seconds": round(self.duration, 6) if self.duration is not None else None,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+            "counters": self.counters,
+            "events": self.events
+        }
+
+
+class Tracer:
+    """Spans for the current run plus process-wide Prometheus counters and histograms."""
+
+    def __init__(self):
+
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._spans: List[Span] = []
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        self.run_id = None
+        self.run_started_at = None
+        self.start_run()
+
+    def start_run(self, run_id: str = None) -> str:
+        """Begin a new trace; metrics keep accumulating for the life of the process."""
+        with self._lock:
+            self._spans = []
+            self.run_started_at = time.time()
+            self.run_id = run_id or datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+            return self.run_id
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any):
+
+        parent = _current.get()
+        span = Span(name, next(self._ids), parent.span_id if parent else None, attributes)
+        with self._lock:
+            self._spans.append(span)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = str(e)[:500] or type(e).__name__
+            raise
+        finally:
+            _current.reset(token)
+            span.duration = time.perf_counter() - span.start
+            self.count("cco_stage_runs_total", stage=name, status=span.status)
+            self.observe("cco_stage_duration_seconds", span.duration, stage=name)
+
+    def add(self, counter: str, amount: int = 1, event: Dict[str, Any] = None):
+        """Bump a counter on the current span (and optionally log an event there)."""
+        span = _current.get()
+        if span is None:
+            return
+        with self._lock:
+            span.counters[counter] = span.counters.get(counter, 0) + amount
+            if event is not None:
+                span.events.append({"at": round(time.perf_counter() - span.start, 6), **event})
+
+    def count(self, metric: str, amount: float = 1, **labels: Any):
+
+        key = (metric, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, metric: str, value: float, **labels: Any):
+
+        key = (metric, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            # Per-bucket counts (non-cumulative), then sum and count
+            state = self._histograms.setdefault(key, [0] * (len(DURATION_BUCKETS) + 1) + [0.0, 0])
+            index = next((i for i, bound in enumerate(DURATION_BUCKETS) if value <= bound), len(DURATION_BUCKETS))
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def spans(self) -> List[Span]:
+
+        with self._lock:
+            return list(self._spans)
+
+    def prometheus_text(self) -> str:
+
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(state) for key, state in self._histograms.items()}
+
+        lines = []
+        for metric, (kind, help_text) in METRICS.items():
+            series = counters if kind == "counter" else histograms
+            keys = sorted(key for key in series if key[0] == metric)
+            if not keys:
+                continue
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for key in keys:
+                labels = key[1]
+                if kind == "counter":
+                    lines.append(f"{metric}{_format_labels(labels)} {_format_value(series[key])}")
+                    continue
+                state = series[key]
+                cumulative = 0
+                for bound, bucket in zip(list(DURATION_BUCKETS) + ["+Inf"], state[:-2]):
+                    cumulative += bucket
+                    lines.append(f"{metric}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {_format_value(state[-2])}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {state[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def trace(self) -> Dict[str, Any]:
+
+        spans = self.spans()
+        return {
+            "run_id": self.run_id,
+            "started_at": datetime.fromtimestamp(self.run_started_at).isoformat(timespec="seconds"),
+            "duration_seconds": round(time.time() - self.run_started_at, 6),
+            "spans": [span.to_dict() for span in spans]
+        }
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per span name: runs, errors, total/max seconds and the summed span counters."""
+        summary = {}
+        for span in self.spans():
+            if span.duration is None:
+                continue
+            entry = summary.setdefault(span.name, {"runs": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            entry["runs"] += 1
+            entry["errors"] += span.status != "ok"
+            entry["total_seconds"] = round(entry["total_seconds"] + span.duration, 6)
+            entry["max_seconds"] = round(max(entry["max_seconds"], span.duration), 6)
+            for counter, value in span.counters.items():
+                entry[counter] = entry.get(counter, 0) + value
+        return summary
+
+
+def _format_labels(labels: Labels) -> str:
+
+    if not labels:
+        return ""
+    escaped = (
+        f'{key}="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+tracer = Tracer()
+
+
+def _stage() -> str:
+
+    span = _current.get()
+    return span.name if span is not None else "none"
+
+
+def span(name: str, **attributes: Any):
+
+    return tracer.span(name, **attributes)
+
+
+def traced(name: str):
+    """Decorator running a (sync or async) function inside span(name)."""
+    def decorate(func):
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+
+                with tracer.span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def start_run(run_id: str = None) -> str:
+
+    return tracer.start_run(run_id)
+
+
+def record_attempt(model: str):
+
+    tracer.add("attempts")
+    tracer.count("cco_llm_attempts_total", stage=_stage(), model=model)
+
+
+def record_request(model: str, seconds: float, ok: bool):
+
+    tracer.observe("cco_llm_request_seconds", seconds, stage=_stage(), model=model, outcome="ok" if ok else "error")
+
+
+def record_retry(reason: str):
+
+    tracer.add("retries", event={"event": "retry", "reason": reason})
+    tracer.add(f"retries_{reason}")
+    tracer.count("cco_llm_retries_total", stage=_stage(), reason=reason)
+
+
+def record_cache(hit: bool):
+
+    tracer.add("cache_hits" if hit else "cache_misses")
+    tracer.count("cco_cache_lookups_total", stage=_stage(), result="hit" if hit else "miss")
+
+
+def record_tokens(prompt: int = 0, completion: int = 0):
+
+    stage = _stage()
+    if prompt:
+        tracer.add("prompt_tokens", prompt)
+        tracer.count("cco_tokens_total", prompt, stage=stage, kind="prompt")
+    if completion:
+        tracer.add("completion_tokens", completion)
+        tracer.count("cco_tokens_total", completion, stage=stage, kind="completion")
+
+
+def record_validation_failure(kind: str, message: str = ""):
+    """kind is "json" (unparseable) or "schema" (parsed but invalid)."""
+    tracer.add("validation_failures", event={"event": "validation_failure", "kind": kind, "message": message[:200]})
+    tracer.count("cco_validation_failures_total", stage=_stage(), kind=kind)
+
+
+def stage_summary() -> Dict[str, Dict[str, Any]]:
+
+    return tracer.summary()
+
+
+def export_run(directory: str = None) -> Tuple[str, str]:
+    """Write metrics.prom (process totals, textfile-collector format) and trace_<run_id>.json."""
+    directory = directory or os.getenv("METRICS_DIR", "sample_outputs/metrics")
+    os.makedirs(directory, exist_ok=True)
+
+    prom_path = os.path.join(directory, "metrics.prom")
+    # Written to a temp file and renamed, so a collector never reads a half-written file
+    with open(prom_path + ".tmp", "w") as f:
+        f.write(tracer.prometheus_text())
+    os.replace(prom_path + ".tmp", prom_path)
+
+    trace = tracer.trace()
+    trace_path = os.path.join(directory, f"trace_{trace['run_id']}.json")
+    with open(trace_path, "w") as f:
+        json.dump(trace, f, indent=2)
+    return prom_path, trace_path
@@ -0,0 +1,231 @@
+
+import json
+import re
+from typing import Any, List, Optional, Tuple, Union
+
+FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)```", re.DOTALL)
+CLOSERS = {"{": "}", "[": "]"}
+
+
+class JSONExtractionError(json.JSONDecodeError):
+    """No usable JSON in an LLM response; reasons lists why each candidate was rejected."""
+
+    def __init__(self, reasons: List[str], doc: str):
+
+        self.reasons = reasons
+        shown = "; ".join(reasons[:3]) + (f"; +{len(reasons) - 3} more" if len(reasons) > 3 else "")
+        super().__init__(f"Could not extract valid JSON ({shown})", doc, 0)
+        # The position suffix JSONDecodeError adds is meaningless for a whole response
+        self.args = (self.msg,)
+
+    def __reduce__(self):
+
+        return self.__class__, (self.reasons, self.doc)
+
+
+class RepairedDict(dict):
+    """A JSON object closed after truncation; elements after the cut are missing."""
+
+
+class RepairedList(list):
+    """A JSON array closed after truncation; elements after the cut are missing."""
+
+
+def is_repaired(value: Any) -> bool:
+    """True for values extract_json rebuilt from a truncated response."""
+    return isinstance(value, (RepairedDict, RepairedList))
+
+
+def mark_repaired(value: Any) -> Any:
+
+    if isinstance(value, dict):
+        return RepairedDict(value)
+    if isinstance(value, list):
+        return RepairedList(value)
+    return value
+
+
+class _Span:
+    """A bracketed region found by the scanner; truncated spans keep a cut point for repair."""
+
+    def __init__(self, start: int, end: int, truncated: bool = False, cut: Tuple[int, List[str]] = None):
+
+        self.start = start
+        self.end = end
+        self.truncated = truncated
+        self.cut = cut
+
+
+def _scan(text: str, offset: int = 0, rescans: int = 2) -> List[_Span]:
+    """One linear, string-aware pass collecting every top-level {...} / [...] span."""
+    spans = []
+    stack = []
+    start = -1
+    in_string = False
+    escaped = False
+    cut = None
+
+    for pos in range(offset, len(text)):
+        char = text[pos]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if not stack:
+            if char in "{[":
+                stack.append(char)
+                start = pos
+                cut = None
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append(char)
+        elif char in "}]":
+            if CLOSERS[stack[-1]] != char:
+                # Mismatched bracket: this was prose, not JSON; keep scanning after it
+                stack = []
+                continue
+            stack.pop()
+            if not stack:
+                spans.append(_Span(start, pos + 1))
+            else:
+                cut = (pos + 1, list(stack))
+        elif char == ",":
+            cut = (pos, list(stack))
+
+    if stack:
+        # The response stopped mid-value (e.g. max_tokens); remember the last complete element.
+        # An unclosed bracket in prose would also swallow a later JSON value, so look inside once more.
+        spans.append(_Span(start, len(text), truncated=True, cut=cut))
+        if rescans:
+            spans.extend(_scan(text, start + 1, rescans - 1))
+    return spans
+
+
+def _strip_trailing_commas(text: str) -> str:
+    """Drop commas directly before a closing bracket, outside of strings."""
+    out = []
+    in_string = False
+    escaped = False
+    pending_comma = -1
+
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == ",":
+            pending_comma = len(out)
+        elif char in "}]" and pending_comma >= 0:
+            del out[pending_comma]
+            pending_comma = -1
+        elif not char.isspace():
+            pending_comma = -1
+            if char == '"':
+                in_string = True
+        out.append(char)
+    return "".join(out)
+
+
+def _close_truncated(text: str, span: _Span) -> Optional[str]:
+
+    if span.cut is None:
+        return None
+    cut_pos, open_brackets = span.cut
+    return text[span.start:cut_pos] + "".join(CLOSERS[b] for b in reversed(open_brackets))
+
+
+def _candidates(text: str) -> List[Tuple[str, str, bool]]:
+    """(label, text, repaired) candidates in the order they are tried."""
+    spans = []
+    for span in _scan(text):
+        if not span.truncated:
+            spans.append((f"span at offset {span.start}", text[span.start:span.end], False))
+        else:
+            repaired = _close_truncated(text, span)
+            if repaired:
+                spans.append((f"truncated span at offset {span.start}", repaired, True))
+
+    # Explicit code fences first, then the largest spans: the real payload dwarfs stray {...} in prose
+    fenced = [("fenced block", block, False) for block in FENCE_PATTERN.findall(text)]
+    return fenced + sorted(spans, key=lambda item: len(item[1]), reverse=True)
+
+
+def extract_json(text: str, prefer: Union[type, Tuple[type, ...]] = None) -> Any:
+    """Parse the JSON value in an LLM response.
+
+    Tries the whole text, code-fenced blocks, then every span found by a
+    single string-aware scan (longest first), repairing trailing commas and
+    closing truncated output after its last complete element. prefer is a
+    type or a tuple of types in order of preference: the first type wins over
+    the others, and values of no listed type are never returned (None when
+    nothing else parsed). Values closed after truncation come back as
+    RepairedDict / RepairedList (see is_repaired). Raises JSONExtractionError
+    listing why each candidate failed.
+    """
+    if not isinstance(text, str):
+        raise JSONExtractionError(["response is not text"], str(text))
+
+    types = prefer if isinstance(prefer, tuple) else (prefer,) if prefer is not None else None
+    fallback = None
+    found_other = False
+    try:
+        value = json.loads(text)
+        if types is None or isinstance(value, types[0]):
+            return value
+        if isinstance(value, types):
+            fallback = value
+        else:
+            found_other = True
+    except json.JSONDecodeError:
+        pass
+
+    reasons = []
+    seen = set()
+    for label, candidate, repaired in _candidates(text):
+        candidate = candidate.strip()
+        if candidate in seen:
+            continue
+        seen.add(candidate)
+
+        value = None
+        for attempt in (candidate, _strip_trailing_commas(candidate)):
+            try:
+                value = json.loads(attempt)
+                break
+            except json.JSONDecodeError as e:
+                error = e
+        if value is None:
+            reasons.append(f"{label}: {error.msg} at char {error.pos}")
+            continue
+
+        if repaired:
+            value = mark_repaired(value)
+        if types is None or isinstance(value, types[0]):
+            return value
+        if fallback is None and isinstance(value, types):
+            fallback = value
+        elif not isinstance(value, types):
+            found_other = True
+            reasons.append(f"{label}: parsed a {type(value).__name__}, expected {types[0].__name__}")
+
+    if fallback is not None:
+        return fallback
+    if found_other:
+        return None
+    if not reasons:
+        reasons.append("no JSON object or array found")
+    raise JSONExtractionError(reasons, text)
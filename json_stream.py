@@ -0,0 +1,114 @@
+
+import json
+from typing import Any, Dict, List, Tuple
+
+# (path of object keys from the root to the enclosing array, index in that array, element)
+StreamItem = Tuple[Tuple[str, ...], int, Dict[str, Any]]
+
+
+class StreamAbort(Exception):
+    """Raised to stop a streamed completion as soon as the output is known to be unusable."""
+
+
+class JsonStreamParser:
+    """Incremental JSON scanner for LLM output arriving token by token.
+
+    Every object that is an element of an array is parsed and returned as soon
+    as its closing brace arrives, together with its index and the key path of
+    that array: () for a root array, ("recommendations",) for
+    {"recommendations": [...]}.
+    Text before the first bracket (e.g. "Here is the JSON:") and after the
+    root value is ignored; mismatched brackets or an element that does not
+    parse raise StreamAbort immediately.
+    """
+
+    def __init__(self):
+
+        self.text = ""
+        self.pos = 0
+        self.stack = []
+        self.started = False
+        self.done = False
+        self.in_string = False
+        self.escaped = False
+        self.key_start = -1
+
+    def feed(self, chunk: str) -> List[StreamItem]:
+
+        if self.done or not chunk:
+            return []
+
+        self.text += chunk
+        items = []
+        text = self.text
+        end = len(text)
+        pos = self.pos
+
+        while pos < end and not self.done:
+            char = text[pos]
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.key_start >= 0:
+                        frame = self.stack[-1]
+                        frame["key"] = json.loads(text[self.key_start:pos + 1])
+                        frame["expect_key"] = False
+                        self.key_start = -1
+                pos += 1
+                continue
+
+            if not self.started:
+                # Skip any prose the model writes before the JSON value
+                if char in "{[":
+                    self.started = True
+                else:
+                    pos += 1
+                    continue
+
+            if char == '"':
+                self.in_string = True
+                if self.stack and self.stack[-1]["type"] == "{" and self.stack[-1]["expect_key"]:
+                    self.key_start = pos
+            elif char in "{[":
+                self.stack.append({
+                    "type": char,
+                    "start": pos,
+                    "path": self._child_path(),
+                    "key": None,
+                    "expect_key": char == "{",
+                    "count": 0
+                })
+            elif char in "}]":
+                if not self.stack or self.stack[-1]["type"] != ("{" if char == "}" else "["):
+                    raise StreamAbort(f"Malformed JSON: unexpected '{char}' at offset {pos}")
+                frame = self.stack.pop()
+                if char == "}" and self.stack and self.stack[-1]["type"] == "[":
+                    try:
+                        element = json.loads(text[frame["start"]:pos + 1])
+                    except json.JSONDecodeError as e:
+                        raise StreamAbort(f"Malformed JSON element at offset {frame['start']}: {str(e)}")
+                    parent = self.stack[-1]
+                    items.append((parent["path"], parent["count"], element))
+                    parent["count"] += 1
+                if not self.stack:
+                    self.done = True
+            elif char == "," and self.stack and self.stack[-1]["type"] == "{":
+                self.stack[-1]["expect_key"] = True
+            pos += 1
+
+        self.pos = pos
+        return items
+
+    def _child_path(self) -> Tuple[str, ...]:
+
+        if not self.stack:
+            return ()
+        parent = self.stack[-1]
+        if parent["type"] == "{" and parent["key"] is not None:
+            return parent["path"] + (parent["key"],)
+        return parent["path"]
@@ -1,24 +1,176 @@
 
+import asyncio
+import contextvars
+import itertools
 import json
 import os
-from typing import Dict, Any
-from dotenv import load_dotenv
-from huggingface_hub import InferenceClient
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Callable, Dict, Any, Iterator, List
 
-from utils import parse_json_response
+from client_pool import client_pool
+from instrumentation import record_attempt, record_cache, record_request, record_retry
+from json_extract import is_repaired
+from json_stream import JsonStreamParser, StreamAbort
+from utils import load_config, parse_json_response
+from resilience import (
+    CircuitOpenError,
+    Deadline,
+    InferenceAbort,
+    backoff_delay,
+    circuit_breaker,
+    is_retryable,
+    retry_after_seconds,
+    status_code
+)
+from response_cache import ResponseCache, make_cache_key
 
-# Load environment variables from .env file
-load_dotenv()
+DEFAULT_MODEL = "meta-llama/Meta-Llama-3-8B-Instruct"
+
+
+def resolve_model(model: str = None) -> str:
+    
+    # The model a client built with this argument would use (HUGGINGFACE_MODEL, then the default)
+    load_config()
+    return model or os.getenv("HUGGINGFACE_MODEL", DEFAULT_MODEL)
+
+
+def streaming_enabled(stream: bool = None) -> bool:
+    
+    # Stages stream their completions when asked to, or when LLM_STREAMING=1
+    if stream is not None:
+        return stream
+    return os.getenv("LLM_STREAMING", "").lower() in ("1", "true", "yes")
+
+
+def _describe_error(error: Exception) -> str:
+    
+    error_str = str(error).lower()
+    status = status_code(error)
+    
+    # Check for specific error types
+    if isinstance(error, CircuitOpenError):
+        return str(error)
+    if status == 503 or "model is overloaded" in error_str or "overloaded" in error_str:
+        return "Model overloaded"
+    if "not found" in error_str or "404" in error_str:
+        return "Model not found"
+    if isinstance(error, asyncio.TimeoutError) or "timeout" in error_str or "timed out" in error_str:
+        return "Request timeout"
+    if status == 429 or "rate limit" in error_str or "rate_limit" in error_str:
+        return "Rate limited"
+    return f"Error: {str(error)}"
+
+
+def _retry_reason(error: Exception) -> str:
+    
+    # Low-cardinality label for metrics; _describe_error stays the human-readable form
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    return {
+        "Model overloaded": "overloaded",
+        "Model not found": "not_found",
+        "Request timeout": "timeout",
+        "Rate limited": "rate_limited"
+    }.get(_describe_error(error), "error")
+
+
+def _accepts(accept: Callable[[str], bool], text: str) -> bool:
+    
+    try:
+        return bool(accept(text))
+    except Exception:
+        return False
+
+
+def _is_complete_json(text: str) -> bool:
+    
+    # query_json's accept: a JSON object that was not rebuilt from a truncated response
+    parsed = parse_json_response(text)
+    return bool(parsed) and not is_repaired(parsed)
+
+
+def _replay(text: str, on_item: Callable = None):
+    
+    # Cached responses go through the same item callbacks as a live stream
+    parser = JsonStreamParser()
+    for path, index, item in parser.feed(text):
+        if on_item is not None:
+            on_item(path, index, item)
+
+
+def _extract_text(response: Any) -> str:
+    
+    # Extract the response text
+    if hasattr(response, 'choices') and len(response.choices) > 0:
+        message = response.choices[0].message
+        if hasattr(message, 'content'):
+            return message.content
+        return str(message)
+    return str(response)
+
+
+def _extract_delta(chunk: Any) -> str:
+    
+    # Streamed chunks carry the new tokens in choices[0].delta.content
+    choices = getattr(chunk, 'choices', None)
+    if choices:
+        delta = getattr(choices[0], 'delta', None)
+        return getattr(delta, 'content', None) or ""
+    return ""
+
+
+class LatencyTracker:
+    """Rolling window of primary-model latencies; the hedge delay is a percentile of it."""
+    
+    def __init__(self, percentile: float = 95.0, window: int = 200, initial_delay: float = 10.0, min_samples: int = 20):
+        
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float):
+        
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def delay(self) -> float:
+        
+        with self._lock:
+            samples = sorted(self._samples)
+        
+        # Until enough samples exist, fall back to the configured delay
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        rank = min(len(samples) - 1, int(round(self.percentile / 100.0 * (len(samples) - 1))))
+        return samples[rank]
 
 
 class HFInferenceClient:
     """Client for HuggingFace Inference API."""
     
-    def __init__(self, api_key: str = None, model: str = None):
+    SYSTEM_PROMPT = "You are a helpful assistant that provides structured JSON responses."
+    MAX_TOKENS = 2000
+    TOP_P = 0.9
+    
+    def __init__(
+        self,
+        api_key: str = None,
+        model: str = None,
+        cache: ResponseCache = None,
+        use_cache: bool = None,
+        hedge_models: List[str] = None,
+        hedge_percentile: float = None
+    ):
         
-        # Load from environment if not provided
+        # Load from environment (.env is read once per process) if not provided
+        load_config()
         api_key = api_key or os.getenv("HUGGINGFACE_API_KEY")
-        model = model or os.getenv("HUGGINGFACE_MODEL", "meta-llama/Meta-Llama-3-8B-Instruct")
+        model = resolve_model(model)
         
         if not api_key:
             raise ValueError(
@@ -28,72 +180,632 @@ class HFInferenceClient:
         
         self.api_key = api_key
         self.model = model
-        self.client = InferenceClient(api_key=api_key)
+        self.client = self._create_client(api_key)
+        
+        # Response cache (disable with LLM_CACHE_DISABLED=1 or use_cache=False)
+        if use_cache is None:
+            use_cache = os.getenv("LLM_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+        self.use_cache = use_cache
+        self.cache = cache if cache is not None else (ResponseCache() if use_cache else None)
+        
+        # Hedging: if the primary model is slower than its recent p95, race a secondary model
+        if hedge_models is None:
+            hedge_models = [m.strip() for m in os.getenv("HUGGINGFACE_HEDGE_MODELS", "").split(",") if m.strip()]
+        self.hedge_models = [m for m in hedge_models if m != model]
+        self.latency = LatencyTracker(
+            percentile=float(hedge_percentile or os.getenv("LLM_HEDGE_PERCENTILE", 95)),
+            initial_delay=float(os.getenv("LLM_HEDGE_DELAY", 10))
+        )
+        self._hedge_cycle = itertools.cycle(self.hedge_models) if self.hedge_models else None
+        self._hedge_executor = None
+        self._hedge_lock = threading.Lock()
+        self._hedge_stats = {"requests": 0, "hedged": 0, "primary_wins": 0, "hedge_wins": 0, "failed": 0}
     
-    def query(self, prompt: str, max_retries: int = 3, temperature: float = 0.7) -> str:
+    @classmethod
+    def shared(cls, api_key: str = None, model: str = None) -> "HFInferenceClient":
+        """Pooled client for (api_key, model), reused by every stage and run in the process."""
+        load_config()
+        api_key = api_key or os.getenv("HUGGINGFACE_API_KEY")
+        model = resolve_model(model)
+        return client_pool().get((cls.__name__, api_key, model), lambda: cls(api_key=api_key, model=model))
+    
+    def _create_client(self, api_key: str):
+        
+        # huggingface_hub (and its HTTP stack) is only imported once a client is built
+        from huggingface_hub import InferenceClient
+        
+        return InferenceClient(api_key=api_key)
+    
+    def _build_messages(self, prompt: str):
+        
+        # Use conversational API with system and user messages
+        return [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        
+        if self.cache is None:
+            return {}
+        return self.cache.stats()
+    
+    def hedge_stats(self) -> Dict[str, Any]:
+        
+        with self._hedge_lock:
+            stats = dict(self._hedge_stats)
+        requests = stats["requests"]
+        stats["hedge_rate"] = round(stats["hedged"] / requests, 4) if requests else 0.0
+        stats["hedge_win_rate"] = round(stats["hedge_wins"] / stats["hedged"], 4) if stats["hedged"] else 0.0
+        stats["hedge_delay_seconds"] = round(self.latency.delay(), 3)
+        return stats
+    
+    def _count(self, *keys: str):
+        
+        with self._hedge_lock:
+            for key in keys:
+                self._hedge_stats[key] += 1
+    
+    def _next_hedge_model(self) -> str:
+        
+        with self._hedge_lock:
+            return next(self._hedge_cycle)
+    
+    def _cache_key(self, messages, temperature: float, use_cache: bool):
+        
+        if not (use_cache and self.use_cache and self.cache is not None):
+            return None
+        return make_cache_key(
+            self.model,
+            messages,
+            temperature=temperature,
+            max_tokens=self.MAX_TOKENS,
+            top_p=self.TOP_P
+        )
+    
+    def query(
+        self,
+        prompt: str,
+        max_retries: int = 3,
+        temperature: float = 0.7,
+        use_cache: bool = True,
+        accept: Callable[[str], bool] = None,
+        deadline: Deadline = None
+    ) -> str:
+        """accept(text) tells a hedged race whether a response is usable (e.g. parses and validates)."""
+        messages = self._build_messages(prompt)
+        deadline = deadline or Deadline()
+        
+        cache_key = self._cache_key(messages, temperature, use_cache)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            record_cache(cached is not None)
+            if cached is not None:
+                if accept is None or _accepts(accept, cached):
+                    return cached
+                # A cached response that no longer passes accept is regenerated, not served forever
+                self.cache.invalidate(cache_key)
         
         for attempt in range(max_retries):
+            if deadline.expired():
+                raise InferenceAbort("HuggingFace API Error: stage deadline exceeded")
             try:
-                # Use conversational API with system and user messages
-                messages = [
-                    {"role": "system", "content": "You are a helpful assistant that provides structured JSON responses."},
-                    {"role": "user", "content": prompt}
-                ]
-                
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=2000,
-                    top_p=0.9
-                )
+                text = self._complete(messages, temperature, accept)
+                if cache_key is not None and text and (accept is None or _accepts(accept, text)):
+                    self.cache.put(cache_key, text)
                 
-                # Extract the response text
-                if hasattr(response, 'choices') and len(response.choices) > 0:
-                    message = response.choices[0].message
-                    if hasattr(message, 'content'):
-                        return message.content
-                    else:
-                        return str(message)
-                
-                return str(response)
+                return text
             
             except Exception as e:
-                error_str = str(e).lower()
-                
-                # Check for specific error types
-                if "model is overloaded" in error_str or "overloaded" in error_str:
-                    if attempt < max_retries - 1:
-                        print(f"Model overloaded, retrying... (attempt {attempt + 1}/{max_retries})")
-                        continue
-                
-                elif "not found" in error_str or "404" in error_str:
-                    if attempt < max_retries - 1:
-                        print(f"Model not found, retrying... (attempt {attempt + 1}/{max_retries})")
-                        continue
-                
-                elif "timeout" in error_str or "timed out" in error_str:
-                    if attempt < max_retries - 1:
-                        print(f"Request timeout, retrying... (attempt {attempt + 1}/{max_retries})")
-                        continue
+                time.sleep(self._retry_delay(e, attempt, max_retries, deadline))
+        
+        raise Exception("Max retries exceeded")
+    
+    def _retry_delay(self, error: Exception, attempt: int, max_retries: int, deadline: Deadline) -> float:
+        """Backoff before the next attempt; raises when the error is fatal or no attempt is left."""
+        message = f"HuggingFace API Error: {str(error) or _describe_error(error)}"
+        if not is_retryable(error):
+            raise InferenceAbort(message) from error
+        if attempt >= max_retries - 1:
+            # Final attempt failed
+            raise Exception(message) from error
+        
+        delay = backoff_delay(attempt, retry_after_seconds(error))
+        if delay >= deadline.remaining():
+            raise InferenceAbort(f"HuggingFace API Error: stage deadline exceeded ({_describe_error(error)})") from error
+        
+        record_retry(_retry_reason(error))
+        print(f"{_describe_error(error)}, retrying in {delay:.1f}s... (attempt {attempt + 1}/{max_retries})")
+        return delay
+    
+    def _check_breaker(self, model: str):
+        
+        breaker = circuit_breaker(model)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {model}, retry in {breaker.retry_in():.0f}s")
+        return breaker
+    
+    def _create(self, model: str, messages, temperature: float) -> str:
+        
+        breaker = self._check_breaker(model)
+        record_attempt(model)
+        start = time.perf_counter()
+        try:
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=self.MAX_TOKENS,
+                top_p=self.TOP_P
+            )
+        except Exception as e:
+            # Only server-side trouble counts against the model; a 4xx still proves it is reachable
+            if is_retryable(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            record_request(model, time.perf_counter() - start, ok=False)
+            raise
+        
+        breaker.record_success()
+        elapsed = time.perf_counter() - start
+        record_request(model, elapsed, ok=True)
+        if model == self.model:
+            self.latency.record(elapsed)
+        return _extract_text(response)
+    
+    def _complete(self, messages, temperature: float, accept: Callable[[str], bool] = None) -> str:
+        
+        if not self.hedge_models:
+            return self._create(self.model, messages, temperature)
+        
+        if self._hedge_executor is None:
+            with self._hedge_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+        
+        self._count("requests")
+        start = time.perf_counter()
+        delay = self.latency.delay()
+        # Each request runs in a copy of the caller's context so its metrics land on the caller's span
+        pending = {
+            self._hedge_executor.submit(contextvars.copy_context().run, self._create, self.model, messages, temperature): self.model
+        }
+        hedged = False
+        fallback = None
+        error = None
+        
+        while pending:
+            timeout = None if hedged else max(0.0, delay - (time.perf_counter() - start))
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                model = pending.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    error = e
+                    continue
                 
-                elif "rate limit" in error_str or "rate_limit" in error_str:
-                    if attempt < max_retries - 1:
-                        print(f"Rate limited, retrying... (attempt {attempt + 1}/{max_retries})")
-                        continue
+                if accept is None or _accepts(accept, text):
+                    # A synchronous HTTP call cannot be interrupted; the loser is cancelled if
+                    # it has not started and otherwise finishes in the background
+                    for other in pending:
+                        other.cancel()
+                    self._count("primary_wins" if model == self.model else "hedge_wins")
+                    return text
+                if fallback is None:
+                    fallback = text
+            
+            # Hedge when the primary is slower than usual, or has already failed
+            if not hedged and (not done or not pending):
+                hedged = True
+                self._count("hedged")
+                hedge_model = self._next_hedge_model()
+                pending[self._hedge_executor.submit(
+                    contextvars.copy_context().run, self._create, hedge_model, messages, temperature
+                )] = hedge_model
+        
+        if fallback is not None:
+            return fallback
+        self._count("failed")
+        raise error
+    
+    def query_stream(
+        self,
+        prompt: str,
+        on_item: Callable[[tuple, int, Dict[str, Any]], None] = None,
+        max_retries: int = 3,
+        temperature: float = 0.7,
+        use_cache: bool = True,
+        accept: Callable[[str], bool] = None,
+        deadline: Deadline = None
+    ) -> str:
+        """Stream the completion and pass each JSON array element to on_item(path, index, item) as it closes.
+        
+        on_item may raise StreamAbort to stop generation at once; malformed JSON aborts too.
+        Returns the full text like query(). A transport retry replays items from index 0.
+        accept(text) decides, as in query(), whether the full text may be cached.
+        """
+        messages = self._build_messages(prompt)
+        deadline = deadline or Deadline()
+        
+        cache_key = self._cache_key(messages, temperature, use_cache)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            record_cache(cached is not None)
+            if cached is not None:
+                try:
+                    if accept is None or _accepts(accept, cached):
+                        _replay(cached, on_item)
+                        return cached
+                except StreamAbort:
+                    pass
+                # A cached response that fails item checks or accept is regenerated, not served forever
+                self.cache.invalidate(cache_key)
+        
+        for attempt in range(max_retries):
+            if deadline.expired():
+                raise InferenceAbort("HuggingFace API Error: stage deadline exceeded")
+            
+            parser = JsonStreamParser()
+            parts = []
+            deltas = self._stream(self.model, messages, temperature)
+            try:
+                for delta in deltas:
+                    parts.append(delta)
+                    for path, index, item in parser.feed(delta):
+                        if on_item is not None:
+                            on_item(path, index, item)
+            except StreamAbort:
+                raise
+            except Exception as e:
+                time.sleep(self._retry_delay(e, attempt, max_retries, deadline))
+                continue
+            finally:
+                # Closing the generator drops the HTTP stream, so an abort stops generation
+                deltas.close()
+            
+            text = "".join(parts)
+            if cache_key is not None and text and (accept is None or _accepts(accept, text)):
+                self.cache.put(cache_key, text)
+            return text
+        
+        raise Exception("Max retries exceeded")
+    
+    def _stream(self, model: str, messages, temperature: float) -> Iterator[str]:
+        
+        breaker = self._check_breaker(model)
+        record_attempt(model)
+        stream = None
+        try:
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=self.MAX_TOKENS,
+                top_p=self.TOP_P,
+                stream=True
+            )
+            breaker.record_success()
+            for chunk in stream:
+                delta = _extract_delta(chunk)
+                if delta:
+                    yield delta
+        except Exception as e:
+            if is_retryable(e):
+                breaker.record_failure()
+            raise
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+    
+    def query_json(self, prompt: str, max_retries: int = 3, use_cache: bool = True) -> Dict[str, Any]:
+       
+        response_text = self.query(
+            prompt,
+            max_retries=max_retries,
+            temperature=0.3,
+            use_cache=use_cache,
+            accept=_is_complete_json
+        )
+        return parse_json_response(response_text)
+
+
+class AsyncHFInferenceClient(HFInferenceClient):
+    """Asyncio client for HuggingFace Inference API with bounded concurrency."""
+    
+    def __init__(
+        self,
+        api_key: str = None,
+        model: str = None,
+        cache: ResponseCache = None,
+        use_cache: bool = None,
+        max_concurrency: int = None,
+        timeout: float = None,
+        hedge_models: List[str] = None,
+        hedge_percentile: float = None
+    ):
+        
+        super().__init__(
+            api_key=api_key,
+            model=model,
+            cache=cache,
+            use_cache=use_cache,
+            hedge_models=hedge_models,
+            hedge_percentile=hedge_percentile
+        )
+        
+        self.max_concurrency = int(max_concurrency or os.getenv("LLM_MAX_CONCURRENCY", 8))
+        self.timeout = float(timeout or os.getenv("LLM_REQUEST_TIMEOUT", 60))
+        self._semaphore = None
+    
+    @classmethod
+    def shared(cls, api_key: str = None, model: str = None) -> "AsyncHFInferenceClient":
+        """Pooled async client for (api_key, model) in the running event loop, sharing the sync client's cache."""
+        load_config()
+        api_key = api_key or os.getenv("HUGGINGFACE_API_KEY")
+        model = resolve_model(model)
+        
+        # Async connections and the semaphore belong to one event loop, so each loop gets its own client
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        
+        def build():
+            
+            sibling = HFInferenceClient.shared(api_key=api_key, model=model)
+            return cls(api_key=api_key, model=model, cache=sibling.cache, use_cache=sibling.use_cache)
+        
+        return client_pool().get((cls.__name__, api_key, model, loop), build)
+    
+    def _create_client(self, api_key: str):
+        
+        from huggingface_hub import AsyncInferenceClient
+        
+        return AsyncInferenceClient(api_key=api_key)
+    
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        
+        # Created lazily so the client can be built outside a running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+    
+    async def query(
+        self,
+        prompt: str,
+        max_retries: int = 3,
+        temperature: float = 0.7,
+        use_cache: bool = True,
+        timeout: float = None,
+        accept: Callable[[str], bool] = None,
+        deadline: Deadline = None
+    ) -> str:
+        
+        messages = self._build_messages(prompt)
+        timeout = timeout or self.timeout
+        deadline = deadline or Deadline()
+        
+        cache_key = self._cache_key(messages, temperature, use_cache)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            record_cache(cached is not None)
+            if cached is not None:
+                if accept is None or _accepts(accept, cached):
+                    return cached
+                # A cached response that no longer passes accept is regenerated, not served forever
+                self.cache.invalidate(cache_key)
+        
+        for attempt in range(max_retries):
+            if deadline.expired():
+                raise InferenceAbort("HuggingFace API Error: stage deadline exceeded")
+            try:
+                attempt_timeout = min(timeout, deadline.remaining())
+                text = await self._complete(messages, temperature, attempt_timeout, accept)
+                if cache_key is not None and text and (accept is None or _accepts(accept, text)):
+                    self.cache.put(cache_key, text)
                 
+                return text
+            
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(e, attempt, max_retries, deadline))
+        
+        raise Exception("Max retries exceeded")
+    
+    async def _create(self, model: str, messages, temperature: float, timeout: float) -> str:
+        
+        breaker = self._check_breaker(model)
+        async with self.semaphore:
+            record_attempt(model)
+            start = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=self.MAX_TOKENS,
+                        top_p=self.TOP_P
+                    ),
+                    timeout=timeout
+                )
+            except Exception as e:
+                if is_retryable(e):
+                    breaker.record_failure()
                 else:
-                    if attempt < max_retries - 1:
-                        print(f"Error: {str(e)}, retrying... (attempt {attempt + 1}/{max_retries})")
+                    breaker.record_success()
+                record_request(model, time.perf_counter() - start, ok=False)
+                raise
+            
+            breaker.record_success()
+            elapsed = time.perf_counter() - start
+            record_request(model, elapsed, ok=True)
+            if model == self.model:
+                self.latency.record(elapsed)
+        return _extract_text(response)
+    
+    async def _complete(self, messages, temperature: float, timeout: float, accept: Callable[[str], bool] = None) -> str:
+        
+        if not self.hedge_models:
+            return await self._create(self.model, messages, temperature, timeout)
+        
+        self._count("requests")
+        start = time.perf_counter()
+        delay = self.latency.delay()
+        primary = asyncio.ensure_future(self._create(self.model, messages, temperature, timeout))
+        pending = {primary: self.model}
+        hedged = False
+        fallback = None
+        error = None
+        
+        try:
+            while pending:
+                wait_for = None if hedged else max(0.0, delay - (time.perf_counter() - start))
+                done, _ = await asyncio.wait(pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in done:
+                    model = pending.pop(task)
+                    try:
+                        text = task.result()
+                    except Exception as e:
+                        error = e
                         continue
+                    
+                    if accept is None or _accepts(accept, text):
+                        self._count("primary_wins" if model == self.model else "hedge_wins")
+                        return text
+                    if fallback is None:
+                        fallback = text
                 
-                # Final attempt failed
-                raise Exception(f"HuggingFace API Error: {str(e)}")
+                # Hedge when the primary is slower than usual, or has already failed
+                if not hedged and (not done or not pending):
+                    hedged = True
+                    self._count("hedged")
+                    hedge_model = self._next_hedge_model()
+                    hedge = asyncio.ensure_future(self._create(hedge_model, messages, temperature, timeout))
+                    pending[hedge] = hedge_model
+        finally:
+            # Cancel the losing request
+            for task in pending:
+                task.cancel()
+        
+        if fallback is not None:
+            return fallback
+        self._count("failed")
+        raise error
+    
+    async def query_stream(
+        self,
+        prompt: str,
+        on_item: Callable[[tuple, int, Dict[str, Any]], None] = None,
+        max_retries: int = 3,
+        temperature: float = 0.7,
+        use_cache: bool = True,
+        accept: Callable[[str], bool] = None,
+        deadline: Deadline = None,
+        timeout: float = None
+    ) -> str:
+        """Async query_stream; timeout bounds the wait for each streamed chunk."""
+        messages = self._build_messages(prompt)
+        timeout = timeout or self.timeout
+        deadline = deadline or Deadline()
+        
+        cache_key = self._cache_key(messages, temperature, use_cache)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            record_cache(cached is not None)
+            if cached is not None:
+                try:
+                    if accept is None or _accepts(accept, cached):
+                        _replay(cached, on_item)
+                        return cached
+                except StreamAbort:
+                    pass
+                self.cache.invalidate(cache_key)
+        
+        for attempt in range(max_retries):
+            if deadline.expired():
+                raise InferenceAbort("HuggingFace API Error: stage deadline exceeded")
+            
+            parser = JsonStreamParser()
+            parts = []
+            deltas = self._stream(self.model, messages, temperature, min(timeout, deadline.remaining()))
+            try:
+                async for delta in deltas:
+                    parts.append(delta)
+                    for path, index, item in parser.feed(delta):
+                        if on_item is not None:
+                            on_item(path, index, item)
+            except StreamAbort:
+                raise
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(e, attempt, max_retries, deadline))
+                continue
+            finally:
+                await deltas.aclose()
+            
+            text = "".join(parts)
+            if cache_key is not None and text and (accept is None or _accepts(accept, text)):
+                self.cache.put(cache_key, text)
+            return text
         
         raise Exception("Max retries exceeded")
     
-    def query_json(self, prompt: str, max_retries: int = 3) -> Dict[str, Any]:
-       
-        response_text = self.query(prompt, max_retries=max_retries, temperature=0.3)
+    async def _stream(self, model: str, messages, temperature: float, timeout: float) -> AsyncIterator[str]:
+        
+        breaker = self._check_breaker(model)
+        async with self.semaphore:
+            record_attempt(model)
+            stream = None
+            try:
+                stream = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=self.MAX_TOKENS,
+                        top_p=self.TOP_P,
+                        stream=True
+                    ),
+                    timeout=timeout
+                )
+                breaker.record_success()
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=timeout)
+                    except StopAsyncIteration:
+                        break
+                    delta = _extract_delta(chunk)
+                    if delta:
+                        yield delta
+            except Exception as e:
+                if is_retryable(e):
+                    breaker.record_failure()
+                raise
+            finally:
+                close = getattr(stream, "aclose", None)
+                if close is not None:
+                    await close()
+    
+    async def query_json(
+        self,
+        prompt: str,
+        max_retries: int = 3,
+        use_cache: bool = True,
+        timeout: float = None
+    ) -> Dict[str, Any]:
+        
+        response_text = await self.query(
+            prompt,
+            max_retries=max_retries,
+            temperature=0.3,
+            use_cache=use_cache,
+            timeout=timeout,
+            accept=_is_complete_json
+        )
         return parse_json_response(response_text)
-
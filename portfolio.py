@@ -0,0 +1,212 @@
+
+import json
+import os
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from billing_frame import BillingFrame
+from recommendation_rules import HIGH_IMPACT_SHARE, RuleBasedRecommender
+
+DEFAULT_BUDGET = 50000
+
+
+def load_portfolio(source: str) -> List[Dict[str, Any]]:
+    """Load (profile, billing) pairs from a batch output directory or a JSONL file.
+
+    Directory: every subdirectory holding project_profile.json and
+    mock_billing.json is one project, named after the subdirectory (the layout
+    written by batch mode). JSONL: one object per line with "profile",
+    "billing" and an optional "id".
+    """
+    projects = []
+
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            profile_path = os.path.join(source, name, "project_profile.json")
+            billing_path = os.path.join(source, name, "mock_billing.json")
+            if not (os.path.isfile(profile_path) and os.path.isfile(billing_path)):
+                continue
+            with open(profile_path, "r", encoding="utf-8") as f:
+                profile = json.load(f)
+            with open(billing_path, "r", encoding="utf-8") as f:
+                billing = json.load(f)
+            projects.append({"id": name, "profile": profile, "billing": billing})
+
+    elif os.path.isfile(source):
+        with open(source, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                projects.append({
+                    "id": str(entry.get("id") or f"project-{line_no}"),
+                    "profile": entry.get("profile") or {},
+                    "billing": entry.get("billing") or []
+                })
+
+    else:
+        raise ValueError(f"Portfolio input not found: {source}")
+
+    return projects
+
+
+class PortfolioAnalyzer:
+    """Cross-project cost rollups for many (profile, billing) pairs at once.
+
+    All billing is concatenated into one BillingFrame with a project code per
+    row; per-project totals and the project x service cost matrix come from a
+    single bincount each, and budget variance, over-budget flags, top services
+    and rankings are array operations over the projects. Only those rollups are
+    vectorized: savings come from running the rule engine once per project (a
+    Python loop, but no LLM calls); with_recommendations=False skips it.
+    """
+
+    def __init__(self, top_services: int = 5, with_recommendations: bool = True, top_recommendations: int = 20):
+
+        self.top_services = top_services
+        self.with_recommendations = with_recommendations
+        self.top_recommendations = top_recommendations
+        self.recommender = RuleBasedRecommender()
+
+    def analyze(self, projects: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """projects: dicts with "profile", "billing" (records or a BillingFrame) and an optional "id"."""
+        ids = [str(p.get("id") or (p.get("profile") or {}).get("name") or f"project-{i + 1}") for i, p in enumerate(projects)]
+        profiles = [p.get("profile") or {} for p in projects]
+        frames = [
+            p["billing"] if isinstance(p.get("billing"), BillingFrame) else BillingFrame.from_records(p.get("billing") or [])
+            for p in projects
+        ]
+        project_count = len(projects)
+
+        combined = BillingFrame.concat(frames)
+        record_counts = np.array([len(frame) for frame in frames], dtype=np.int64)
+        # Row order of concat; projects without billing contribute no rows
+        project_codes = np.repeat(np.arange(project_count, dtype=np.int64), record_counts)
+
+        # Project x service cost matrix in one pass
+        services = combined.categories["service"]
+        service_count = max(len(services), 1)
+        flat = project_codes * service_count + combined.codes["service"]
+        size = project_count * service_count
+        matrix = np.bincount(flat, weights=combined.measures["cost_inr"], minlength=size).reshape(project_count, service_count)
+        present = np.bincount(flat, minlength=size).reshape(project_count, service_count) > 0
+
+        totals = matrix.sum(axis=1)
+        budgets = np.array([_as_budget(profile) for profile in profiles], dtype=np.float64)
+        variance = totals - budgets
+        over_budget = totals > budgets
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance_pct = np.where(budgets > 0, variance / budgets * 100, 0.0)
+
+        # Top services per project: absent services sort last, ties keep first-appearance order
+        ranked_services = np.argsort(np.where(present, -matrix, np.inf), axis=1, kind="stable")[:, :self.top_services]
+
+        savings = np.zeros(project_count)
+        summaries = [{} for _ in range(project_count)]
+        recommendations = []
+        if self.with_recommendations:
+            for i in range(project_count):
+                metrics = self._metrics(matrix[i], present[i], services, ranked_services[i], int(record_counts[i]))
+                result = self.recommender.recommend(profiles[i], frames[i], metrics)
+                summaries[i] = result["summary"]
+                savings[i] = summaries[i].get("total_potential_savings", 0.0)
+                recommendations.extend(
+                    dict(rec, project=ids[i])
+                    for rec in result["recommendations"]
+                    if totals[i] > 0 and rec["potential_savings"] >= HIGH_IMPACT_SHARE * totals[i]
+                )
+
+        # Rank 1 = largest overspend / largest savings
+        variance_order = np.argsort(-variance, kind="stable")
+        savings_order = np.argsort(-savings, kind="stable")
+        variance_rank = np.empty(project_count, dtype=np.int64)
+        variance_rank[variance_order] = np.arange(1, project_count + 1)
+        savings_rank = np.empty(project_count, dtype=np.int64)
+        savings_rank[savings_order] = np.arange(1, project_count + 1)
+
+        project_rows = []
+        for i in range(project_count):
+            summary = summaries[i]
+            project_rows.append({
+                "id": ids[i],
+                "name": profiles[i].get("name", ids[i]),
+                "total_monthly_cost": round(float(totals[i]), 2),
+                "budget": float(budgets[i]),
+                "budget_variance": round(float(variance[i]), 2),
+                "budget_variance_pct": round(float(variance_pct[i]), 1),
+                "is_over_budget": bool(over_budget[i]),
+                "record_count": int(record_counts[i]),
+                "high_cost_services": {
+                    services[j]: round(float(matrix[i, j]), 2)
+                    for j in ranked_services[i].tolist() if present[i, j]
+                },
+                "potential_savings": round(float(savings[i]), 2),
+                "savings_percentage": summary.get("savings_percentage", 0.0),
+                "recommendations_count": summary.get("recommendations_count", 0),
+                "high_impact_recommendations": summary.get("high_impact_recommendations", 0),
+                "variance_rank": int(variance_rank[i]),
+                "savings_rank": int(savings_rank[i])
+            })
+
+        service_totals = matrix.sum(axis=0)[:len(services)]
+        service_order = np.argsort(-service_totals, kind="stable")
+        total_cost = float(totals.sum())
+        total_savings = float(savings.sum())
+        recommendations.sort(key=lambda r: r["potential_savings"], reverse=True)
+
+        return {
+            "portfolio": {
+                "project_count": project_count,
+                "total_monthly_cost": round(total_cost, 2),
+                "total_budget": round(float(budgets.sum()), 2),
+                "budget_variance": round(float(variance.sum()), 2),
+                "over_budget_count": int(over_budget.sum()),
+                "over_budget_amount": round(float(variance[over_budget].sum()), 2),
+                "service_costs": {services[j]: round(float(service_totals[j]), 2) for j in service_order.tolist()},
+                "high_cost_services": {
+                    services[j]: round(float(service_totals[j]), 2) for j in service_order[:self.top_services].tolist()
+                },
+                "total_potential_savings": round(total_savings, 2),
+                "savings_percentage": round(total_savings / total_cost * 100, 1) if total_cost > 0 else 0.0
+            },
+            "projects": project_rows,
+            "rankings": {
+                "by_variance": [ids[i] for i in variance_order.tolist()],
+                "by_savings": [ids[i] for i in savings_order.tolist()]
+            },
+            "top_recommendations": recommendations[:self.top_recommendations]
+        }
+
+    def _metrics(
+        self,
+        costs: np.ndarray,
+        present: np.ndarray,
+        services: List[str],
+        top: np.ndarray,
+        record_count: int
+    ) -> Dict[str, Any]:
+
+        # The same shape CostAnalyzer._calculate_metrics returns, read off one matrix row
+        return {
+            "total_cost": round(float(costs.sum()), 2),
+            "record_count": record_count,
+            "cost_per_service": {
+                service: round(float(cost), 2)
+                for service, cost, keep in zip(services, costs.tolist(), present.tolist()) if keep
+            },
+            "high_cost_services": [
+                {"service": services[j], "cost": round(float(costs[j]), 2)}
+                for j in top.tolist() if present[j]
+            ]
+        }
+
+
+def _as_budget(profile: Dict[str, Any]) -> float:
+
+    # Same default as CostAnalyzer._build_report when a profile has no budget
+    try:
+        return float(profile.get("budget_inr_per_month", DEFAULT_BUDGET))
+    except (TypeError, ValueError):
+        return float(DEFAULT_BUDGET)
@@ -1,26 +1,97 @@
 
 import json
+import os
 from typing import Dict, Any
 
-from llm_client import HFInferenceClient
+from json_extract import extract_json, is_repaired
+from instrumentation import record_retry, record_validation_failure, traced
+from llm_client import AsyncHFInferenceClient, HFInferenceClient, resolve_model, streaming_enabled
+from profile_rules import RuleBasedProfileExtractor
+from prompt_budget import fit_prompt, record_completion, truncate_text
+from resilience import Deadline, InferenceAbort
 from validators import validate_profile
 
 
 class ProfileExtractor:
     """Extract project profile from description using LLM."""
     
-    def __init__(self, api_key: str = None, model: str = None):
+    # auto: local rules, LLM only below the confidence threshold; rules: local only; llm: always the LLM
+    EXTRACTION_MODES = ("auto", "rules", "llm")
+    
+    # Bump when the prompt or the local rules change, so memoized profiles are rebuilt
+    PROMPT_VERSION = 1
+    
+    def __init__(
+        self,
+        api_key: str = None,
+        model: str = None,
+        async_client: AsyncHFInferenceClient = None,
+        stream: bool = None,
+        extraction_mode: str = None,
+        confidence_threshold: float = None
+    ):
+        
+        self.api_key = api_key
+        self.model = model
+        self._client = None
+        self._async_client = async_client
+        self.rules = RuleBasedProfileExtractor()
         
-        self.client = HFInferenceClient(api_key=api_key, model=model)
+        # Streaming aborts as soon as the response stops being well-formed JSON
+        self.stream = streaming_enabled(stream)
+        
+        self.extraction_mode = (extraction_mode or os.getenv("PROFILE_EXTRACTION_MODE", "auto")).strip().lower()
+        if self.extraction_mode not in self.EXTRACTION_MODES:
+            raise ValueError(
+                f"Unknown profile extraction mode: {self.extraction_mode} "
+                f"(expected one of {', '.join(self.EXTRACTION_MODES)})"
+            )
+        self.confidence_threshold = float(
+            confidence_threshold if confidence_threshold is not None
+            else os.getenv("PROFILE_CONFIDENCE_THRESHOLD", 0.6)
+        )
     
-    def extract(self, project_description: str, max_retries: int = 3) -> Dict[str, Any]:
+    @property
+    def client(self) -> HFInferenceClient:
+        
+        # Descriptions handled by the local extractor never need (or fail on) the inference client
+        if self._client is None:
+            self._client = HFInferenceClient.shared(api_key=self.api_key, model=self.model)
+        return self._client
+    
+    @property
+    def async_client(self) -> AsyncHFInferenceClient:
+        
+        # Pooled per event loop and sharing the sync client's response cache, unless one was passed in
+        if self._async_client is not None:
+            return self._async_client
+        return AsyncHFInferenceClient.shared(api_key=self.client.api_key, model=self.client.model)
+    
+    def fingerprint(self) -> Dict[str, Any]:
+        """Settings the extracted profile depends on, besides the description."""
+        fingerprint = {
+            "prompt_version": self.PROMPT_VERSION,
+            "extraction_mode": self.extraction_mode,
+            "confidence_threshold": self.confidence_threshold
+        }
+        if self.extraction_mode != "rules":
+            fingerprint["model"] = resolve_model(self.model)
+        return fingerprint
     
+    @traced("profile")
+    def extract(self, project_description: str, max_retries: int = 3) -> Dict[str, Any]:
+        
+        local_profile = self._extract_local(project_description)
+        if local_profile is not None:
+            return local_profile
+        
         prompt = self._build_prompt(project_description)
         
+        deadline = Deadline.for_stage()
         for attempt in range(max_retries):
             try:
                 # Query LLM
-                response = self.client.query(prompt, max_retries=2, temperature=0.3)
+                response = self._request(prompt, deadline)
                 
                 # Try to parse JSON
                 profile = self._parse_response(response)
@@ -31,9 +102,11 @@ class ProfileExtractor:
                     return profile
                 
                 # If validation failed, retry
+                record_validation_failure("schema", error_msg)
                 if attempt < max_retries - 1:
                     print(f"Profile validation failed: {error_msg}")
                     print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("validation")
                     continue
                 
                 # Last attempt failed, return best effort
@@ -41,24 +114,91 @@ class ProfileExtractor:
                 return profile if isinstance(profile, dict) else {}
             
             except json.JSONDecodeError as e:
+                record_validation_failure("json", str(e))
                 if attempt < max_retries - 1:
                     print(f"JSON parsing failed: {str(e)}")
                     print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("json_parse")
                     continue
                 raise
             
+            except InferenceAbort:
+                raise
+            
             except Exception as e:
                 if attempt < max_retries - 1:
                     print(f"Error extracting profile: {str(e)}")
                     print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("error")
                     continue
                 raise
         
         raise Exception("Failed to extract profile after max retries")
     
+    @traced("profile")
+    async def extract_async(self, project_description: str, max_retries: int = 3) -> Dict[str, Any]:
+        
+        local_profile = self._extract_local(project_description)
+        if local_profile is not None:
+            return local_profile
+        
+        prompt = self._build_prompt(project_description)
+        
+        deadline = Deadline.for_stage()
+        for attempt in range(max_retries):
+            try:
+                response = await self._request_async(prompt, deadline)
+                profile = self._parse_response(response)
+                
+                is_valid, error_msg = validate_profile(profile)
+                if is_valid:
+                    return profile
+                
+                record_validation_failure("schema", error_msg)
+                if attempt < max_retries - 1:
+                    print(f"Profile validation failed: {error_msg}")
+                    print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("validation")
+                    continue
+                
+                print(f"Final attempt: {error_msg}")
+                return profile if isinstance(profile, dict) else {}
+            
+            except json.JSONDecodeError as e:
+                record_validation_failure("json", str(e))
+                if attempt < max_retries - 1:
+                    print(f"JSON parsing failed: {str(e)}")
+                    print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("json_parse")
+                    continue
+                raise
+            
+            except InferenceAbort:
+                raise
+            
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    print(f"Error extracting profile: {str(e)}")
+                    print(f"Retrying... (attempt {attempt + 1}/{max_retries})")
+                    record_retry("error")
+                    continue
+                raise
+        
+        raise Exception("Failed to extract profile after max retries")
+    
+    def _extract_local(self, project_description: str) -> Dict[str, Any]:
+        
+        # The local profile is returned when the mode allows it and it is confident enough; None means ask the LLM
+        if self.extraction_mode == "llm":
+            return None
+        profile = self.rules.extract(project_description)
+        if self.extraction_mode == "rules" or profile["confidence"] >= self.confidence_threshold:
+            return profile
+        return None
+    
     def _build_prompt(self, project_description: str) -> str:
         
-        return f"""Extract project information from the description and return ONLY valid JSON matching this schema:
+        template = """Extract project information from the description and return ONLY valid JSON matching this schema:
 {{
   "name": string,
   "budget_inr_per_month": integer (monthly budget in INR),
@@ -83,25 +223,67 @@ Rules:
 - non_functional_requirements should be an empty array if none are mentioned
 - Return ONLY the JSON object, no other text
 """
+        
+        # Very long descriptions are cut to stay under the stage budget
+        return fit_prompt(
+            "profile",
+            template,
+            project_description=[
+                project_description,
+                truncate_text(project_description, 6000),
+                truncate_text(project_description, 3000),
+                truncate_text(project_description, 1500)
+            ]
+        )
     
-    def _parse_response(self, response_text: str) -> Dict[str, Any]:
+    def _request(self, prompt: str, deadline: Deadline) -> str:
         
-        # Try direct parsing
-        try:
-            return json.loads(response_text)
-        except json.JSONDecodeError:
-            pass
+        if self.stream:
+            response = self.client.query_stream(
+                prompt,
+                max_retries=2,
+                temperature=0.3,
+                accept=self._is_usable,
+                deadline=deadline
+            )
+        else:
+            response = self.client.query(prompt, max_retries=2, temperature=0.3, accept=self._is_usable, deadline=deadline)
+        record_completion("profile", response)
+        return response
+    
+    async def _request_async(self, prompt: str, deadline: Deadline) -> str:
         
-        # Try to extract JSON from text
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}')
+        if self.stream:
+            response = await self.async_client.query_stream(
+                prompt,
+                max_retries=2,
+                temperature=0.3,
+                accept=self._is_usable,
+                deadline=deadline
+            )
+        else:
+            response = await self.async_client.query(
+                prompt,
+                max_retries=2,
+                temperature=0.3,
+                accept=self._is_usable,
+                deadline=deadline
+            )
+        record_completion("profile", response)
+        return response
+    
+    def _is_usable(self, response_text: str) -> bool:
         
-        if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-            try:
-                json_str = response_text[start_idx:end_idx + 1]
-                return json.loads(json_str)
-            except json.JSONDecodeError:
-                pass
+        # Lets a hedged request race skip a response that would fail validation; output closed
+        # after truncation may validate but is incomplete, so it is never preferred or cached
+        try:
+            parsed = self._parse_response(response_text)
+        except json.JSONDecodeError:
+            return False
+        return not is_repaired(parsed) and validate_profile(parsed)[0]
+    
+    def _parse_response(self, response_text: str) -> Dict[str, Any]:
         
-        raise json.JSONDecodeError("Could not extract valid JSON", response_text, 0)
+        # One bracket- and string-aware pass; repairs fences, trailing commas and truncation
+        return extract_json(response_text, prefer=dict)
 
@@ -0,0 +1,284 @@
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Rough conversion rates for budgets quoted in other currencies
+FX_TO_INR = {"INR": 1.0, "USD": 83.0, "EUR": 90.0, "GBP": 105.0}
+
+CURRENCY_ALIASES = {
+    "₹": "INR", "rs": "INR", "rs.": "INR", "inr": "INR", "rupee": "INR", "rupees": "INR",
+    "$": "USD", "us$": "USD", "usd": "USD", "dollar": "USD", "dollars": "USD",
+    "€": "EUR", "eur": "EUR", "euro": "EUR", "euros": "EUR",
+    "£": "GBP", "gbp": "GBP", "pound": "GBP", "pounds": "GBP"
+}
+
+MULTIPLIERS = {
+    "k": 1e3, "thousand": 1e3,
+    "lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "lacs": 1e5,
+    "crore": 1e7, "crores": 1e7, "cr": 1e7,
+    "million": 1e6, "mn": 1e6, "m": 1e6
+}
+
+# slot -> (canonical name, aliases); aliases are matched case-insensitively on word boundaries
+TECH_LEXICON = {
+    "frontend": [
+        ("React Native", ["react native"]),
+        ("React", ["react", "react.js", "reactjs"]),
+        ("Next.js", ["next.js", "nextjs"]),
+        ("Angular", ["angular", "angularjs"]),
+        ("Vue.js", ["vue", "vue.js", "vuejs"]),
+        ("Nuxt", ["nuxt", "nuxt.js"]),
+        ("Svelte", ["svelte", "sveltekit"]),
+        ("Flutter", ["flutter"]),
+        ("Swift", ["swiftui"]),
+        ("jQuery", ["jquery"])
+    ],
+    "backend": [
+        ("Node.js", ["node.js", "nodejs", "node", "express.js", "expressjs", "nestjs"]),
+        ("Django", ["django"]),
+        ("Flask", ["flask"]),
+        ("FastAPI", ["fastapi"]),
+        ("Spring Boot", ["spring boot", "springboot", "spring"]),
+        ("Ruby on Rails", ["ruby on rails", "rails"]),
+        ("Laravel", ["laravel"]),
+        ("PHP", ["php"]),
+        ("Go", ["golang"]),
+        (".NET", [".net", "asp.net", "dotnet", "c#"]),
+        ("Java", ["java"]),
+        ("Python", ["python"])
+    ],
+    "database": [
+        ("PostgreSQL", ["postgresql", "postgres", "psql"]),
+        ("MySQL", ["mysql"]),
+        ("MariaDB", ["mariadb"]),
+        ("MongoDB", ["mongodb", "mongo"]),
+        ("DynamoDB", ["dynamodb"]),
+        ("Aurora", ["aurora"]),
+        ("Cassandra", ["cassandra"]),
+        ("SQL Server", ["sql server", "mssql"]),
+        ("Oracle", ["oracle db", "oracle database"]),
+        ("Firestore", ["firestore", "firebase"]),
+        ("Elasticsearch", ["elasticsearch"]),
+        ("Redis", ["redis", "elasticache"])
+    ],
+    "proxy": [
+        ("Nginx", ["nginx"]),
+        ("HAProxy", ["haproxy"]),
+        ("Envoy", ["envoy"]),
+        ("Traefik", ["traefik"]),
+        ("Caddy", ["caddy"]),
+        ("Kong", ["kong"]),
+        ("API Gateway", ["api gateway"]),
+        ("Apache", ["apache httpd", "apache http server", "apache web server"])
+    ],
+    "hosting": [
+        ("AWS", ["aws", "amazon web services", "ec2", "rds", "s3", "cloudfront", "lambda", "eks", "ecs"]),
+        ("Azure", ["azure", "aks"]),
+        ("GCP", ["gcp", "google cloud", "gke", "cloud run", "app engine"]),
+        ("DigitalOcean", ["digitalocean", "digital ocean"]),
+        ("Heroku", ["heroku"]),
+        ("Vercel", ["vercel"]),
+        ("Netlify", ["netlify"]),
+        ("Linode", ["linode"]),
+        ("Kubernetes", ["kubernetes", "k8s"]),
+        ("On-premise", ["on-premise", "on-prem", "on premise", "self-hosted"])
+    ]
+}
+
+# canonical requirement -> regex
+NFR_PATTERNS = [
+    ("high availability", r"high(?:ly)?[ -]availab\w*|99\.9+\s*%|multi-az|failover|zero downtime"),
+    ("low latency", r"low[ -]latency|real[ -]?time|fast response"),
+    ("scalability", r"scalab\w*|auto-?scal\w*|scale (?:up|out|to)|traffic spikes|peak traffic"),
+    ("security", r"secur\w*|encrypt\w*"),
+    ("compliance", r"complian\w*|gdpr|hipaa|pci[ -]?dss|soc ?2|iso 27001|data residency"),
+    ("disaster recovery", r"disaster recovery|backups?\b|\brpo\b|\brto\b"),
+    ("cost efficiency", r"cost[ -]effective\w*|cost[ -]efficien\w*|reduce (?:our )?(?:cloud )?(?:costs?|spend)|"
+                        r"optimi[sz]e (?:our )?(?:cloud )?(?:costs?|spend)|cut costs|within budget"),
+    ("uptime monitoring", r"uptime|monitoring|alerting"),
+    ("observability", r"observability|logging|tracing"),
+    ("performance", r"performance|throughput|fast page loads?"),
+    ("global distribution", r"global(?:ly)? (?:users|audience|distribution|distributed)|multi-region|worldwide")
+]
+
+_ALIASES = {alias: (slot, canonical) for slot, entries in TECH_LEXICON.items() for canonical, aliases in entries for alias in aliases}
+# Longest alias first so "react native" wins over "react"
+_TECH_RE = re.compile(
+    r"(?<![\w.])(" + "|".join(re.escape(alias) for alias in sorted(_ALIASES, key=len, reverse=True)) + r")(?![\w#]|\.\w)",
+    re.IGNORECASE
+)
+_NFR_RES = [(name, re.compile(pattern, re.IGNORECASE)) for name, pattern in NFR_PATTERNS]
+
+_NUMBER = r"(\d{1,3}(?:,\d{2,3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+_MULTIPLIER = r"(?:\s*(k|thousand|lakhs?|lacs?|crores?|cr|million|mn|m)\b)?"
+_AMOUNT_RES = [
+    # ₹50,000 / Rs. 1.5 lakh / $8.5k
+    re.compile(r"(₹|rs\.?|inr|us\$|\$|usd|€|eur|£|gbp)\s*" + _NUMBER + _MULTIPLIER, re.IGNORECASE),
+    # 50,000 INR / 2 lakh rupees
+    re.compile(_NUMBER + _MULTIPLIER + r"\s*(inr|rupees?|rs\b|usd|dollars?|eur|euros?|gbp|pounds?)", re.IGNORECASE),
+    # budget of 50000 (no currency: taken as INR)
+    re.compile(r"budget(?:\s*:|\s+(?:of|is|around|about|approx\.?|~))*\s*" + _NUMBER + _MULTIPLIER, re.IGNORECASE),
+    # 6 lakh annual budget
+    re.compile(_NUMBER + _MULTIPLIER + r"\s+(?:(?:monthly|annual|yearly|quarterly)\s+)?budget", re.IGNORECASE)
+]
+# "budget" just before or after a currency amount, with no other number or sentence break in between
+_BUDGET_BEFORE = re.compile(r"budget(?:[^\d.!?;\n]|approx\.|\.(?=\S))*$", re.IGNORECASE)
+_BUDGET_AFTER = re.compile(
+    r"(?:\s*(?:per|a|/)\s*(?:month|year|annum|quarter)|\s+(?:monthly|annual|yearly|quarterly))?\s+budget",
+    re.IGNORECASE
+)
+_SPEND_WORD = re.compile(r"spend|spending|cost|costs|bill|billing|pay|paying", re.IGNORECASE)
+_YEARLY = re.compile(r"per (?:year|annum)|/\s*(?:year|yr)|yearly|annual(?:ly)?|a year|p\.a\.", re.IGNORECASE)
+_QUARTERLY = re.compile(r"per quarter|/\s*quarter|quarterly|a quarter", re.IGNORECASE)
+_WEEKLY = re.compile(r"per week|/\s*week|weekly|a week", re.IGNORECASE)
+_DAILY = re.compile(r"per day|/\s*day|daily|a day", re.IGNORECASE)
+_MONTHLY = re.compile(r"\s*(?:per month|/\s*(?:month|mo)\b|monthly|a month|pm\b)", re.IGNORECASE)
+_PERIOD_BEFORE = re.compile(r"(annual|yearly|quarterly)\s+(?:budget|spend|cost)", re.IGNORECASE)
+
+_NAMED_RE = re.compile(
+    r"\b(?:called|named|project(?: name)?\s*:)\s*[\"'“]?([A-Z][\w&.'-]*(?:\s+[A-Z0-9][\w&.'-]*){0,4})"
+)
+_PRODUCT_RE = re.compile(
+    r"\b(?:an?|the|our)\s+((?:[A-Za-z][\w-]*\s+){0,3}"
+    r"(?:app|application|platform|service|website|site|system|portal|marketplace|store|saas|api|dashboard|game))\b",
+    re.IGNORECASE
+)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _amount(number: str, multiplier: Optional[str]) -> float:
+
+    value = float(number.replace(",", ""))
+    return value * MULTIPLIERS.get((multiplier or "").lower(), 1.0)
+
+
+def _period_factor(text: str, start: int, end: int) -> float:
+
+    # "₹6 lakh per year", "6 lakh annual budget", "annual budget of $60k"
+    after = text[end:end + 30]
+    if _MONTHLY.match(after):
+        return 1.0
+    for pattern, factor in ((_YEARLY, 1 / 12), (_QUARTERLY, 1 / 3), (_WEEKLY, 52 / 12), (_DAILY, 30.0)):
+        if pattern.search(after):
+            return factor
+    match = _PERIOD_BEFORE.search(text[max(0, start - 30):end])
+    if match:
+        return 1 / 3 if match.group(1).lower() == "quarterly" else 1 / 12
+    return 1.0
+
+
+def parse_budget(text: str) -> Tuple[Optional[int], float]:
+    """Monthly budget in INR and how sure the match is (0 when no amount is found).
+
+    Currency amounts next to "budget" beat bare numbers next to "budget", which
+    beat amounts near "spend"/"cost", which beat bare currency amounts; the
+    first of equally good matches wins.
+    """
+    best = None
+    for kind, pattern in enumerate(_AMOUNT_RES):
+        for match in pattern.finditer(text):
+            if kind == 0:
+                currency, number, multiplier = match.groups()
+            elif kind == 1:
+                number, multiplier, currency = match.groups()
+            else:
+                number, multiplier = match.groups()
+                currency = "inr"
+
+            context = text[max(0, match.start() - 60):match.end() + 30]
+            if kind >= 2:
+                score = 0.9
+            elif _BUDGET_BEFORE.search(text[max(0, match.start() - 60):match.start()]) or \
+                    _BUDGET_AFTER.match(text, match.end()):
+                score = 1.0
+            elif _SPEND_WORD.search(context):
+                score = 0.8
+            else:
+                score = 0.5
+
+            if best is None or score > best[0] or (score == best[0] and match.start() < best[1]):
+                rate = FX_TO_INR[CURRENCY_ALIASES.get(currency.lower(), "INR")]
+                monthly = _amount(number, multiplier) * rate * _period_factor(text, match.start(), match.end())
+                best = (score, match.start(), monthly)
+
+    if best is None or best[2] <= 0:
+        return None, 0.0
+    return int(round(best[2])), best[0]
+
+
+def match_tech_stack(text: str) -> Dict[str, Optional[str]]:
+    """Tech stack slots from the lexicon; several hits in one slot are joined in order of mention."""
+    found: Dict[str, List[str]] = {slot: [] for slot in TECH_LEXICON}
+    for match in _TECH_RE.finditer(text):
+        slot, canonical = _ALIASES[match.group(1).lower()]
+        if canonical not in found[slot]:
+            found[slot].append(canonical)
+    return {slot: ", ".join(names) if names else None for slot, names in found.items()}
+
+
+def match_requirements(text: str) -> List[str]:
+    """Non-functional requirements mentioned in the text, in order of first mention."""
+    hits = []
+    for name, pattern in _NFR_RES:
+        match = pattern.search(text)
+        if match:
+            hits.append((match.start(), name))
+    return [name for _, name in sorted(hits)]
+
+
+def guess_name(text: str) -> Tuple[str, float]:
+
+    match = _NAMED_RE.search(text)
+    if match:
+        return match.group(1).strip().rstrip(".,"), 1.0
+    match = _PRODUCT_RE.search(text)
+    if match:
+        return match.group(1).strip().title(), 0.5
+    words = re.findall(r"[A-Za-z]+", text)
+    return " ".join(words[:3]).title() or "Unnamed Project", 0.0
+
+
+def summarize(text: str, max_sentences: int = 2, max_chars: int = 300) -> str:
+
+    sentences = _SENTENCE_RE.split(" ".join(text.split()))
+    summary = " ".join(sentences[:max_sentences])
+    if len(summary) > max_chars:
+        summary = summary[:max_chars].rsplit(" ", 1)[0].rstrip(",;:") + "..."
+    return summary
+
+
+class RuleBasedProfileExtractor:
+    """Deterministic, LLM-free project profile extraction.
+
+    Output matches the schema checked by validate_profile, plus a
+    "confidence" score in [0, 1]. The budget carries most of the weight:
+    without one the score stays below the default LLM fallback threshold.
+    """
+
+    # Share of the confidence score carried by each part of the profile
+    WEIGHTS = {"budget": 0.45, "tech_stack": 0.35, "requirements": 0.1, "name": 0.1}
+
+    def extract(self, project_description: str) -> Dict[str, Any]:
+
+        text = project_description or ""
+        budget, budget_score = parse_budget(text)
+        tech_stack = match_tech_stack(text)
+        requirements = match_requirements(text)
+        name, name_score = guess_name(text)
+
+        slots_found = sum(1 for value in tech_stack.values() if value)
+        confidence = (
+            self.WEIGHTS["budget"] * budget_score
+            + self.WEIGHTS["tech_stack"] * min(1.0, slots_found / 2)
+            + self.WEIGHTS["requirements"] * (1.0 if requirements else 0.0)
+            + self.WEIGHTS["name"] * name_score
+        )
+
+        return {
+            "name": name,
+            "budget_inr_per_month": budget if budget is not None else 0,
+            "description": summarize(text),
+            "tech_stack": tech_stack,
+            "non_functional_requirements": requirements,
+            "confidence": round(confidence, 3)
+        }
@@ -0,0 +1,149 @@
+
+import os
+import re
+import threading
+from typing import Any, Dict, List, Sequence, Union
+
+from instrumentation import record_tokens
+
+# Per-stage prompt budgets in (estimated) tokens, overridable with PROMPT_BUDGET_<STAGE>
+DEFAULT_BUDGETS = {"profile": 2000, "billing": 1000, "recommendations": 1500}
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+_usage: Dict[str, Dict[str, int]] = {}
+_usage_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough BPE-style count: one token per punctuation mark, about one per 4 word characters."""
+    if not text:
+        return 0
+    return sum(1 + (len(piece) - 1) // 4 for piece in TOKEN_PATTERN.findall(text))
+
+
+def stage_budget(stage: str) -> int:
+
+    return int(os.getenv(f"PROMPT_BUDGET_{stage.upper()}", DEFAULT_BUDGETS.get(stage, 1500)))
+
+
+def _record(stage: str, **counts: int):
+
+    with _usage_lock:
+        usage = _usage.setdefault(stage, {
+            "calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "max_prompt_tokens": 0,
+            "compressed_calls": 0,
+            "over_budget_calls": 0
+        })
+        for key, value in counts.items():
+            if key == "max_prompt_tokens":
+                usage[key] = max(usage[key], value)
+            else:
+                usage[key] += value
+
+
+def record_completion(stage: str, response_text: str):
+
+    tokens = estimate_tokens(response_text)
+    _record(stage, completion_tokens=tokens)
+    record_tokens(completion=tokens)
+
+
+def token_usage() -> Dict[str, Dict[str, int]]:
+    """Estimated prompt/completion tokens per stage since start (or the last reset)."""
+    with _usage_lock:
+        return {stage: dict(usage) for stage, usage in _usage.items()}
+
+
+def reset_token_usage():
+
+    with _usage_lock:
+        _usage.clear()
+
+
+def fit_prompt(stage: str, template: str, max_tokens: int = None, **fields: Union[str, Sequence[str]]) -> str:
+    """Fill template placeholders, compressing fields until the prompt fits the stage budget.
+
+    Each field is a string or a list of renderings from most detailed to most
+    compact. While the prompt is over budget, the largest field that still has
+    a more compact rendering is stepped down one level.
+    """
+    budget = max_tokens or stage_budget(stage)
+    options = {name: [value] if isinstance(value, str) else list(value) for name, value in fields.items()}
+    levels = {name: 0 for name in options}
+
+    while True:
+        chosen = {name: options[name][level] for name, level in levels.items()}
+        prompt = template.format(**chosen)
+        tokens = estimate_tokens(prompt)
+        if tokens <= budget:
+            break
+
+        compressible = [name for name in options if levels[name] < len(options[name]) - 1]
+        if not compressible:
+            break
+        largest = max(compressible, key=lambda name: estimate_tokens(chosen[name]))
+        levels[largest] += 1
+
+    _record(
+        stage,
+        calls=1,
+        prompt_tokens=tokens,
+        max_prompt_tokens=tokens,
+        compressed_calls=int(any(levels.values())),
+        over_budget_calls=int(tokens > budget)
+    )
+    record_tokens(prompt=tokens)
+    return prompt
+
+
+def top_k_with_other(values: Dict[str, float], k: int) -> Dict[str, float]:
+    """The k largest entries plus a single 'Other (n)' bucket for the rest."""
+    ranked = sorted(values.items(), key=lambda item: item[1], reverse=True)
+    if len(ranked) <= k:
+        return {key: round(value, 2) for key, value in ranked}
+
+    summary = {key: round(value, 2) for key, value in ranked[:k]}
+    rest = ranked[k:]
+    summary[f"Other ({len(rest)})"] = round(sum(value for _, value in rest), 2)
+    return summary
+
+
+def percentiles(values: Sequence[float], points: Sequence[int] = (50, 90, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles of values, e.g. {"p50": ..., "p90": ..., "p99": ...}."""
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    return {
+        f"p{point}": round(ordered[min(len(ordered) - 1, int(round(point / 100.0 * (len(ordered) - 1))))], 2)
+        for point in points
+    }
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return cut + " ...[truncated]"
+
+
+def compact_mapping(mapping: Dict[str, Any], max_chars: int = 40) -> Dict[str, Any]:
+    """Drop empty values and shorten long strings (e.g. a verbose tech_stack)."""
+    return {
+        key: truncate_text(value, max_chars) if isinstance(value, str) else value
+        for key, value in mapping.items()
+        if value not in (None, "", [], {})
+    }
+
+
+def renderings(value: Any, render, compressions: List[Any]) -> List[str]:
+    """render(value) followed by render(c(value)) for each compression c, without repeats."""
+    out = []
+    for candidate in [value] + [compress(value) for compress in compressions]:
+        text = render(candidate)
+        if not out or text != out[-1]:
+            out.append(text)
+    return out
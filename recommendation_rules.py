@@ -0,0 +1,589 @@
+
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from billing_frame import BillingFrame
+
+COMPUTE_SERVICES = ("Compute", "Database", "Cache")
+HOURS_PER_MONTH = 730
+STEADY_HOURS = 500
+IDLE_HOURS = 200
+INTERRUPTIBLE_PATTERN = re.compile(r"worker|batch|job|encod|etl|queue|cron", re.IGNORECASE)
+HIGH_IMPACT_SHARE = 0.10
+# Advisory practices available to fill a report up to min_recommendations
+ADVISORY_COUNT = 8
+
+
+def _recommendation(
+    title: str,
+    service: str,
+    current_cost: float,
+    savings_rate: float,
+    recommendation_type: str,
+    description: str,
+    effort: str,
+    risk: str,
+    steps: List[str],
+    providers: List[str]
+) -> Dict[str, Any]:
+
+    return {
+        "title": title,
+        "service": service,
+        "current_cost": round(current_cost, 2),
+        "potential_savings": round(current_cost * savings_rate, 2),
+        "recommendation_type": recommendation_type,
+        "description": description,
+        "implementation_effort": effort,
+        "risk_level": risk,
+        "steps": steps,
+        "cloud_providers": providers
+    }
+
+
+class _RuleContext:
+    """Billing columns, masks and a 'claimed' set so rules do not double count savings."""
+
+    def __init__(self, frame: BillingFrame, metrics: Dict[str, Any]):
+
+        self.frame = frame
+        self.metrics = metrics
+        self.total_cost = float(metrics.get("total_cost", frame.total()))
+        self.cost = frame.measures["cost_inr"]
+        self.quantity = frame.measures["usage_quantity"]
+        self.claimed = np.zeros(len(frame), dtype=bool)
+        self._monthly_hours = None
+
+    def label_mask(self, dim: str, predicate: Callable[[str], bool]) -> np.ndarray:
+
+        wanted = [code for code, value in enumerate(self.frame.categories[dim]) if predicate(value)]
+        if not wanted:
+            return np.zeros(len(self.frame), dtype=bool)
+        return np.isin(self.frame.codes[dim], wanted)
+
+    def service_mask(self, *services: str) -> np.ndarray:
+
+        return self.label_mask("service", lambda s: s in services)
+
+    def monthly_hours(self) -> np.ndarray:
+        """Average hours per active month of each row's resource (0 for non-hour units)."""
+        if self._monthly_hours is None:
+            hourly = self.label_mask("unit", lambda u: "hour" in u.lower() or u.lower() in ("hrs", "hr"))
+            resources = self.frame.codes["resource_id"]
+            n_resources = len(self.frame.categories["resource_id"])
+            hours = np.bincount(resources, weights=np.where(hourly, self.quantity, 0.0), minlength=n_resources)
+
+            # Months in which each resource appears at all
+            pairs = np.unique(resources.astype(np.int64) * len(self.frame.categories["month"]) + self.frame.codes["month"])
+            active_months = np.bincount(pairs // len(self.frame.categories["month"]), minlength=n_resources)
+
+            per_month = hours / np.maximum(active_months, 1)
+            self._monthly_hours = np.where(hourly, per_month[resources], 0.0)
+        return self._monthly_hours
+
+    def service_cost(self, service: str) -> float:
+
+        return float(self.cost[self.service_mask(service)].sum())
+
+    def claim(self, mask: np.ndarray) -> float:
+
+        mask = mask & ~self.claimed
+        self.claimed |= mask
+        return float(self.cost[mask].sum())
+
+
+def _rule_reserved_capacity(ctx: _RuleContext) -> List[Dict[str, Any]]:
+
+    steady = (
+        ctx.service_mask(*COMPUTE_SERVICES)
+        & ctx.label_mask("usage_type", lambda u: u.lower() in ("on-demand", "ondemand", "on demand"))
+        & (ctx.monthly_hours() >= STEADY_HOURS)
+    )
+    recommendations = []
+    for service in COMPUTE_SERVICES:
+        cost = ctx.claim(steady & ctx.service_mask(service))
+        if cost <= 0:
+            continue
+        recommendations.append(_recommendation(
+            f"Reserve Steady-State {service} Capacity",
+            service,
+            cost,
+            0.35,
+            "Reserved Instances",
+            f"{service} resources run On-Demand for {STEADY_HOURS}+ hours a month. "
+            "A 1-year reservation or savings plan typically cuts this spend by 30-40%.",
+            "low",
+            "low",
+            [
+                "List On-Demand resources running more than 500 hours per month",
+                "Purchase 1-year no-upfront reservations or a compute savings plan for the baseline",
+                "Review reservation utilization monthly"
+            ],
+            ["AWS", "Azure", "GCP"]
+        ))
+    return recommendations
+
+
+def _rule_idle_resources(ctx: _RuleContext) -> List[Dict[str, Any]]:
+
+    hours = ctx.monthly_hours()
+    idle = ctx.service_mask(*COMPUTE_SERVICES) & (hours > 0) & (hours < IDLE_HOURS)
+    recommendations = []
+    for service in COMPUTE_SERVICES:
+        cost = ctx.claim(idle & ctx.service_mask(service))
+        if cost <= 0:
+            continue
+        recommendations.append(_recommendation(
+            f"Stop or Schedule Idle {service} Resources",
+            service,
+            cost,
+            0.6,
+            "Right-sizing",
+            f"Some {service} resources run fewer than {IDLE_HOURS} hours a month, which suggests dev/test or idle "
+            "capacity. Scheduling them off outside working hours or terminating them removes most of the cost.",
+            "low",
+            "low",
+            [
+                "Identify resources with low monthly hours and low CPU utilization",
+                "Apply start/stop schedules to non-production resources",
+                "Terminate resources with no owner after a grace period"
+            ],
+            ["AWS", "Azure", "GCP", "Open-source"]
+        ))
+    return recommendations
+
+
+def _rule_spot(ctx: _RuleContext) -> List[Dict[str, Any]]:
+
+    interruptible = (
+        ctx.service_mask("Compute")
+        & ctx.label_mask("usage_type", lambda u: u.lower() != "spot")
+        & (
+            ctx.label_mask("resource_id", lambda r: bool(INTERRUPTIBLE_PATTERN.search(r)))
+            | _desc_mask(ctx.frame)
+        )
+    )
+    cost = ctx.claim(interruptible)
+    if cost <= 0:
+        return []
+    return [_recommendation(
+        "Run Batch and Worker Nodes on Spot Capacity",
+        "Compute",
+        cost,
+        0.6,
+        "Spot Instances",
+        "Worker, batch and queue-driven workloads tolerate interruption and can run on spot/preemptible "
+        "capacity at a 60-90% discount.",
+        "medium",
+        "medium",
+        [
+            "Make worker jobs idempotent and checkpoint progress",
+            "Move worker groups to spot/preemptible instances with mixed instance types",
+            "Keep a small On-Demand fallback for the queue backlog"
+        ],
+        ["AWS", "Azure", "GCP"]
+    )]
+
+
+def _desc_mask(frame: BillingFrame) -> np.ndarray:
+
+    if frame.desc is None:
+        return np.zeros(len(frame), dtype=bool)
+
+    # Descriptions repeat heavily, so match each distinct text once
+    matches = {d: bool(INTERRUPTIBLE_PATTERN.search(str(d))) for d in set(frame.desc)}
+    return np.fromiter((matches[d] for d in frame.desc), dtype=bool, count=len(frame))
+
+
+def _rule_storage_tiering(ctx: _RuleContext) -> List[Dict[str, Any]]:
+
+    cost = ctx.claim(ctx.service_mask("Storage"))
+    if cost <= 0:
+        return []
+    return [_recommendation(
+        "Tier Infrequently Accessed Storage",
+        "Storage",
+        cost,
+        0.3,
+        "Storage Tiering",
+        "Objects that are rarely read after the first weeks can move to infrequent-access or archive tiers "
+        "through lifecycle policies.",
+        "low",
+        "low",
+        [
+            "Enable storage access analytics to find cold data",
+            "Add lifecycle rules moving objects to infrequent-access after 30 days and archive after 90",
+            "Expire temporary and duplicate objects"
+        ],
+        ["AWS", "Azure", "GCP"]
+    )]
+
+
+def _rule_egress(ctx: _RuleContext) -> List[Dict[str, Any]]:
+
+    transfer = ctx.service_mask("CDN", "Networking") | ctx.label_mask("unit", lambda u: "transfer" in u.lower())
+    recommendations = []
+    for service in ("CDN", "Networking"):
+        cost = ctx.claim(transfer & ctx.service_mask(service))
+        if cost <= 0:
+            continue
+        recommendations.append(_recommendation(
+            f"Reduce {service} Data Transfer",
+            service,
+            cost,
+            0.2,
+            "Caching & Data Optimization",
+            "Higher cache hit ratios, compression and keeping traffic inside one region or zone lower "
+            "egress charges.",
+            "medium",
+            "low",
+            [
+                "Raise CDN cache TTLs for static assets and enable Brotli/gzip compression",
+                "Serve media through the CDN instead of the origin",
+                "Keep service-to-service traffic within the same availability zone"
+            ],
+            ["AWS", "Azure", "GCP", "Open-source"]
+        ))
+    return recommendations
+
+
+def _rule_autoscaling(ctx: _RuleContext) -> List[Dict[str, Any]]:
+
+    cost = ctx.claim(ctx.service_mask("Compute"))
+    if cost <= 0:
+        return []
+    return [_recommendation(
+        "Auto-scale Application Servers",
+        "Compute",
+        cost,
+        0.15,
+        "Auto-scaling",
+        "Scaling the remaining compute fleet with demand instead of provisioning for peak removes idle "
+        "capacity during off-peak hours.",
+        "medium",
+        "medium",
+        [
+            "Define scaling policies on CPU and request latency",
+            "Set minimum capacity to the off-peak baseline",
+            "Load test scale-out before enabling it in production"
+        ],
+        ["AWS", "Azure", "GCP"]
+    )]
+
+
+def _rule_database(ctx: _RuleContext) -> List[Dict[str, Any]]:
+
+    cost = ctx.claim(ctx.service_mask("Database"))
+    if cost <= 0:
+        return []
+    return [_recommendation(
+        "Right-size Database Instances",
+        "Database",
+        cost,
+        0.2,
+        "Right-sizing",
+        "Database instances are commonly sized for peak load. Downsizing based on observed CPU, memory and "
+        "IOPS, and moving reads to a cache or replica, lowers the bill.",
+        "medium",
+        "medium",
+        [
+            "Review two weeks of CPU, memory and IOPS metrics",
+            "Move to the next smaller instance class or a burstable class",
+            "Cache hot reads or add a small read replica if read load is high"
+        ],
+        ["AWS", "Azure", "GCP", "Open-source"]
+    )]
+
+
+def _rule_monitoring(ctx: _RuleContext) -> List[Dict[str, Any]]:
+
+    cost = ctx.claim(ctx.service_mask("Monitoring"))
+    if cost <= 0:
+        return []
+    return [_recommendation(
+        "Trim Log Retention and Consider Open-source Monitoring",
+        "Monitoring",
+        cost,
+        0.25,
+        "Open-source Alternatives",
+        "Shorter log retention, sampling of debug logs, and self-hosted Prometheus/Grafana for metrics "
+        "reduce managed monitoring charges.",
+        "medium",
+        "low",
+        [
+            "Reduce retention of debug and access logs to 7-14 days",
+            "Sample high-volume logs at the source",
+            "Evaluate Prometheus, Grafana and Loki for metrics and logs"
+        ],
+        ["AWS", "Azure", "GCP", "Open-source"]
+    )]
+
+
+def _rule_other_services(ctx: _RuleContext) -> List[Dict[str, Any]]:
+
+    # Anything still unclaimed: review the largest remaining service
+    remaining = ~ctx.claimed
+    if not remaining.any():
+        return []
+    sums = np.bincount(ctx.frame.codes["service"][remaining], weights=ctx.cost[remaining], minlength=len(ctx.frame.categories["service"]))
+    top = int(np.argmax(sums))
+    if sums[top] <= 0:
+        return []
+    service = ctx.frame.categories["service"][top]
+    cost = ctx.claim(ctx.service_mask(service))
+    return [_recommendation(
+        f"Review {service} Usage and Pricing Model",
+        service,
+        cost,
+        0.15,
+        "Managed Services",
+        f"{service} is not covered by a specific rule. Comparing managed and serverless options and "
+        "committing to steady usage usually yields savings.",
+        "medium",
+        "low",
+        [
+            f"Break down {service} spend by resource",
+            "Compare serverless, managed and self-hosted options for the workload",
+            "Commit to the steady baseline where discounts are available"
+        ],
+        ["AWS", "Azure", "GCP", "Open-source"]
+    )]
+
+
+def _governance_recommendations(ctx: _RuleContext, project_profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Account-wide practices used to fill the report up to the minimum count.
+
+    They overlap the savings already claimed by the billing rules, so they are
+    advisory: current_cost is the real spend they apply to (0 when the service is
+    absent), potential_savings is 0 and they add nothing to the summary totals.
+    There are always ADVISORY_COUNT of them, so any min_recommendations up to
+    that count is met even for empty billing.
+    """
+    top_service = (ctx.metrics.get("high_cost_services") or [{"service": "All Services"}])[0]["service"]
+    top_cost = ctx.total_cost if top_service == "All Services" else ctx.service_cost(top_service)
+    budget = project_profile.get("budget_inr_per_month", 50000)
+
+    recommendations = [
+        _recommendation(
+            "Set Budget Alerts and Anomaly Detection",
+            "All Services",
+            ctx.total_cost,
+            0.0,
+            "Cost Governance",
+            f"Alerts at 80% and 100% of the ₹{budget:,} monthly budget plus anomaly detection catch runaway "
+            "spend within a day instead of at invoice time.",
+            "low",
+            "low",
+            [
+                "Create monthly budgets with 80% and 100% alerts",
+                "Enable cost anomaly detection per service",
+                "Route alerts to the owning team's channel"
+            ],
+            ["AWS", "Azure", "GCP"]
+        ),
+        _recommendation(
+            "Enforce Cost Allocation Tags",
+            "All Services",
+            ctx.total_cost,
+            0.0,
+            "Cost Governance",
+            "Tagging every resource with owner, environment and service makes waste attributable and "
+            "exposes forgotten resources.",
+            "low",
+            "low",
+            [
+                "Define mandatory owner/environment/service tags",
+                "Block untagged resource creation with policy",
+                "Review untagged spend weekly"
+            ],
+            ["AWS", "Azure", "GCP"]
+        ),
+        _recommendation(
+            f"Commit to a Baseline for {top_service}",
+            top_service,
+            top_cost,
+            0.0,
+            "Reserved Instances",
+            f"{top_service} is the largest cost driver. A commitment that covers the steady half of its "
+            "usage adds a discount without limiting elasticity.",
+            "low",
+            "medium",
+            [
+                "Measure the minimum hourly usage over the last 30 days",
+                "Commit to roughly that baseline for 1 year",
+                "Re-evaluate coverage quarterly"
+            ],
+            ["AWS", "Azure", "GCP"]
+        ),
+        _recommendation(
+            "Adopt Serverless for Spiky Workloads",
+            top_service,
+            top_cost,
+            0.0,
+            "Serverless & Managed Services",
+            "Scheduled jobs, webhooks and low-traffic APIs cost less on functions or container-on-demand "
+            "platforms that bill per request.",
+            "medium",
+            "medium",
+            [
+                "List low-traffic endpoints and scheduled jobs",
+                "Port them to functions or scale-to-zero containers",
+                "Compare a month of cost before decommissioning servers"
+            ],
+            ["AWS", "Azure", "GCP", "Open-source"]
+        ),
+        _recommendation(
+            "Right-size from Utilization Data",
+            top_service,
+            top_cost,
+            0.0,
+            "Right-sizing",
+            "Instance sizes chosen at launch are rarely revisited. Matching them to observed utilization "
+            "typically frees 10-20% of capacity.",
+            "medium",
+            "low",
+            [
+                "Enable rightsizing recommendations in the provider console",
+                "Downsize resources averaging under 40% CPU and memory",
+                "Repeat the review every quarter"
+            ],
+            ["AWS", "Azure", "GCP"]
+        ),
+        _recommendation(
+            "Clean Up Unattached Volumes, Snapshots and IPs",
+            "Storage",
+            ctx.service_cost("Storage"),
+            0.0,
+            "Storage Tiering",
+            "Detached disks, old snapshots and idle IP addresses keep billing after the workloads that "
+            "used them are gone.",
+            "low",
+            "low",
+            [
+                "List unattached volumes, snapshots older than 90 days and unused IPs",
+                "Snapshot-then-delete volumes with no owner",
+                "Automate snapshot expiry"
+            ],
+            ["AWS", "Azure", "GCP"]
+        ),
+        _recommendation(
+            "Schedule Non-production Environments",
+            "All Services",
+            ctx.total_cost,
+            0.0,
+            "Cost Governance",
+            "Development, test and staging environments that run around the clock are idle most of the week; "
+            "stopping them outside working hours removes that spend.",
+            "low",
+            "low",
+            [
+                "Tag resources by environment",
+                "Stop non-production resources nights and weekends on a schedule",
+                "Give teams a self-service way to start them on demand"
+            ],
+            ["AWS", "Azure", "GCP", "Open-source"]
+        ),
+        _recommendation(
+            "Review Data Transfer Paths",
+            "Networking",
+            ctx.service_cost("Networking"),
+            0.0,
+            "Caching & Data Optimization",
+            "Cross-region and internet egress is billed per GB and grows quietly with traffic; keeping chatty "
+            "services in one zone and serving static content from a CDN keeps it in check.",
+            "medium",
+            "low",
+            [
+                "Break down transfer charges by source and destination",
+                "Co-locate services that exchange large volumes of data",
+                "Serve static and media content through a CDN"
+            ],
+            ["AWS", "Azure", "GCP"]
+        ),
+    ]
+    return [dict(rec, advisory=True) for rec in recommendations]
+
+
+RULES = [
+    _rule_reserved_capacity,
+    _rule_idle_resources,
+    _rule_spot,
+    _rule_storage_tiering,
+    _rule_egress,
+    _rule_database,
+    _rule_monitoring,
+    _rule_autoscaling,
+    _rule_other_services,
+]
+
+
+class RuleBasedRecommender:
+    """Deterministic, LLM-free recommendations over billing data and computed metrics.
+
+    Output matches the "recommendations" and "summary" shape checked by
+    validate_recommendations.
+    """
+
+    def __init__(self, min_recommendations: int = 6, max_recommendations: int = 10):
+
+        if min_recommendations > ADVISORY_COUNT:
+            raise ValueError(f"min_recommendations can be at most {ADVISORY_COUNT}, got {min_recommendations}")
+        self.min_recommendations = min_recommendations
+        self.max_recommendations = max_recommendations
+
+    def recommend(
+        self,
+        project_profile: Dict[str, Any],
+        billing_data: Optional[Any],
+        metrics: Dict[str, Any]
+    ) -> Dict[str, Any]:
+
+        frame = self._frame(billing_data, metrics)
+        ctx = _RuleContext(frame, metrics)
+
+        recommendations = []
+        for rule in RULES:
+            recommendations.extend(rule(ctx))
+        recommendations = [r for r in recommendations if r["potential_savings"] > 0]
+        recommendations.sort(key=lambda r: r["potential_savings"], reverse=True)
+        recommendations = recommendations[:self.max_recommendations]
+
+        # Fill up with advisory account-wide practices when billing covers only a few services
+        for rec in _governance_recommendations(ctx, project_profile):
+            if len(recommendations) >= self.min_recommendations:
+                break
+            recommendations.append(rec)
+
+        return {
+            "recommendations": recommendations,
+            "summary": self._summary(recommendations, ctx.total_cost)
+        }
+
+    def _frame(self, billing_data: Optional[Any], metrics: Dict[str, Any]) -> BillingFrame:
+
+        if isinstance(billing_data, BillingFrame):
+            return billing_data
+        if billing_data:
+            return BillingFrame.from_records(billing_data)
+
+        # Metrics only (streamed or incremental billing): one pseudo-record per service
+        return BillingFrame.from_records([
+            {"service": service, "cost_inr": cost}
+            for service, cost in metrics.get("cost_per_service", {}).items()
+        ])
+
+    def _summary(self, recommendations: List[Dict[str, Any]], total_cost: float) -> Dict[str, Any]:
+
+        total_savings = round(sum(r["potential_savings"] for r in recommendations), 2)
+        high_impact = sum(
+            1 for r in recommendations
+            if total_cost > 0 and r["potential_savings"] >= HIGH_IMPACT_SHARE * total_cost
+        )
+        return {
+            "total_potential_savings": total_savings,
+            "savings_percentage": round(total_savings / total_cost * 100, 1) if total_cost > 0 else 0.0,
+            "recommendations_count": len(recommendations),
+            "high_impact_recommendations": high_impact
+        }
@@ -0,0 +1,400 @@
+
+import heapq
+import html
+import json
+from collections.abc import Iterator
+from typing import Any, Callable, Dict, IO, Iterable, List, Sequence, Tuple
+
+# Containers with at least this many entries (counting the direct children of
+# nested containers) are written element by element; smaller ones in one call
+LARGE_CONTAINER = 256
+WRITE_BUFFER = 1 << 16
+
+
+def _is_large(value: Any) -> bool:
+
+    if isinstance(value, Iterator):
+        return True
+    size = len(value)
+    if size >= LARGE_CONTAINER:
+        return True
+    children = value.values() if isinstance(value, dict) else value
+    for child in children:
+        if isinstance(child, (dict, list, tuple)):
+            size += len(child)
+            if size >= LARGE_CONTAINER:
+                return True
+        elif isinstance(child, Iterator):
+            return True
+    return False
+
+
+def iter_json(data: Any, compact: bool = False, indent: int = 2) -> Iterator[str]:
+    """Yield data as JSON text in chunks; output matches json.dumps(data, indent=indent).
+
+    compact=True drops the whitespace (separators "," and ":"), which also lets
+    small values go through the C encoder. Lists may be given as iterators
+    (e.g. a generator of billing records) and are consumed lazily.
+    """
+    if compact:
+        indent = None
+        item_separator, key_separator = ",", ":"
+    else:
+        item_separator, key_separator = ",", ": "
+    encoder = json.JSONEncoder(indent=indent, separators=(item_separator, key_separator))
+
+    def encode(value: Any, level: int) -> Iterator[str]:
+
+        is_container = isinstance(value, (dict, list, tuple, Iterator))
+        keyed = isinstance(value, dict)
+        # Non-string keys get json's own coercion (True -> "true" etc.)
+        if not is_container or (keyed and not all(isinstance(key, str) for key in value)) or (level and not _is_large(value)):
+            text = encoder.encode(list(value) if isinstance(value, Iterator) else value)
+            if indent and level:
+                text = text.replace("\n", "\n" + " " * (indent * level))
+            yield text
+            return
+
+        newline = "\n" + " " * (indent * (level + 1)) if indent else ""
+        closing = "\n" + " " * (indent * level) if indent else ""
+        yield "{" if keyed else "["
+        empty = True
+        for item in (value.items() if keyed else value):
+            yield (newline if empty else item_separator + newline)
+            empty = False
+            if keyed:
+                yield encoder.encode(item[0]) + key_separator
+                item = item[1]
+            yield from encode(item, level + 1)
+        yield ("}" if keyed else "]") if empty else closing + ("}" if keyed else "]")
+
+    return encode(data, 0)
+
+
+def _buffered(chunks: Iterable[str]) -> Iterator[str]:
+
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= WRITE_BUFFER:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def write_json(data: Any, f: IO[str], compact: bool = False):
+    """Stream data as JSON to an open text file in ~64KB writes."""
+    for block in _buffered(iter_json(data, compact=compact)):
+        f.write(block)
+
+
+# (column header, value getter, formatter)
+Column = Tuple[str, Callable[[Any], Any], Callable[[Any], str]]
+
+STYLE = """        body { font-family: Arial, sans-serif; margin: 20px; background: #f5f5f5; }
+        .container { max-width: 1000px; margin: 0 auto; background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+        h1 { color: #333; border-bottom: 2px solid #007bff; padding-bottom: 10px; }
+        h2 { color: #555; margin-top: 30px; }
+        .metric { display: inline-block; margin: 10px 20px 10px 0; padding: 15px; background: #f9f9f9; border-left: 4px solid #007bff; border-radius: 4px; }
+        .metric-value { font-size: 24px; font-weight: bold; color: #007bff; }
+        .metric-label { font-size: 12px; color: #666; text-transform: uppercase; }
+        .over-budget { border-left-color: #dc3545; }
+        .over-budget .metric-value { color: #dc3545; }
+        .within-budget { border-left-color: #28a745; }
+        .within-budget .metric-value { color: #28a745; }
+        table { width: 100%; border-collapse: collapse; margin-top: 20px; }
+        th { background: #007bff; color: white; padding: 12px; text-align: left; }
+        td { padding: 12px; border-bottom: 1px solid #ddd; }
+        tr:hover { background: #f5f5f5; }
+        .pager { margin-top: 10px; color: #666; font-size: 13px; }
+        .pager button { margin-right: 6px; }
+        .footer { margin-top: 30px; color: #666; font-size: 12px; text-align: center; }"""
+
+# Shows one <tbody> page per table; without JavaScript only the first page is visible
+PAGER_SCRIPT = """    <script>
+        document.querySelectorAll("table.paged").forEach(function (table) {
+            var pages = table.tBodies, current = 0, pager = document.getElementById(table.id + "-pager");
+            if (pages.length < 2) { return; }
+            function show(index) {
+                pages[current].hidden = true;
+                current = Math.max(0, Math.min(pages.length - 1, index));
+                pages[current].hidden = false;
+                pager.querySelector("span").textContent = "Page " + (current + 1) + " of " + pages.length;
+            }
+            pager.hidden = false;
+            pager.querySelector(".prev").onclick = function () { show(current - 1); };
+            pager.querySelector(".next").onclick = function () { show(current + 1); };
+            show(0);
+        });
+    </script>"""
+
+
+def _text(value: Any) -> str:
+
+    return html.escape(str(value))
+
+
+def inr(value: Any, decimals: int = 0) -> str:
+
+    return f"₹{value or 0:,.{decimals}f}"
+
+
+class HtmlReportWriter:
+    """Writes an HTML report section by section to an open file.
+
+    Tables take any iterable of rows and are written row by row, split into
+    <tbody> pages of page_size rows; a small script pages through them in the
+    browser, so even very long service, resource or recommendation lists stay
+    cheap to write and to render.
+    """
+
+    def __init__(self, f: IO[str], page_size: int = 50):
+
+        self.f = f
+        self.page_size = max(1, page_size)
+        self.tables = 0
+        self._buffer: List[str] = []
+        self._size = 0
+
+    def _write(self, text: str):
+
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= WRITE_BUFFER:
+            self.flush()
+
+    def flush(self):
+
+        if self._buffer:
+            self.f.write("".join(self._buffer))
+            self._buffer = []
+            self._size = 0
+
+    def begin(self, title: str):
+
+        self._write(f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{_text(title)}</title>
+    <style>
+{STYLE}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>{_text(title)}</h1>
+""")
+
+    def heading(self, text: str):
+
+        self._write(f"""
+        <h2>{_text(text)}</h2>
+""")
+
+    def metric(self, label: str, value: str, css_class: str = ""):
+
+        self._write(f"""        <div class="metric{' ' + css_class if css_class else ''}">
+            <div class="metric-label">{_text(label)}</div>
+            <div class="metric-value">{_text(value)}</div>
+        </div>
+""")
+
+    def table(self, columns: Sequence[Column], rows: Iterable[Any]) -> int:
+        """Write rows as a paged table; returns the number of rows written."""
+        self.tables += 1
+        table_id = f"table-{self.tables}"
+        self._write(f'        <table class="paged" id="{table_id}">\n            <thead>\n                <tr>\n')
+        for header, _, _ in columns:
+            self._write(f"                    <th>{_text(header)}</th>\n")
+        self._write("                </tr>\n            </thead>\n")
+
+        count = 0
+        for row in rows:
+            if count % self.page_size == 0:
+                if count:
+                    self._write("            </tbody>\n")
+                self._write("            <tbody>\n" if count == 0 else "            <tbody hidden>\n")
+            cells = "".join(f"<td>{_text(formatter(getter(row)))}</td>" for _, getter, formatter in columns)
+            self._write(f"                <tr>{cells}</tr>\n")
+            count += 1
+        if count:
+            self._write("            </tbody>\n")
+        self._write("        </table>\n")
+        if count > self.page_size:
+            self._write(
+                f'        <div class="pager" id="{table_id}-pager" hidden>'
+                f'<button class="prev">&laquo; Prev</button><button class="next">Next &raquo;</button>'
+                f"<span></span> ({count:,} rows)</div>\n"
+            )
+        return count
+
+    def items(self, entries: Iterable[Tuple[str, str]]):
+
+        self._write("        <ul>\n")
+        for label, value in entries:
+            self._write(f"            <li><strong>{_text(label)}:</strong> {_text(value)}</li>\n")
+        self._write("        </ul>\n")
+
+    def paragraph(self, text: str):
+
+        self._write(f"        <p>{_text(text)}</p>\n")
+
+    def end(self, footer: Sequence[str] = ()):
+
+        self._write('        \n        <div class="footer">\n')
+        for line in footer:
+            self._write(f"            <p>{_text(line)}</p>\n")
+        self._write("        </div>\n    </div>\n")
+        if self.tables:
+            self._write(PAGER_SCRIPT + "\n")
+        self._write("</body>\n</html>\n")
+        self.flush()
+
+
+RECOMMENDATION_COLUMNS: List[Column] = [
+    ("Recommendation", lambda r: r.get("title", "Unknown"), str),
+    ("Service", lambda r: r.get("service", "Unknown"), str),
+    ("Potential Savings", lambda r: r.get("potential_savings", 0), inr),
+    ("Type", lambda r: r.get("recommendation_type", "Unknown"), str),
+    ("Effort", lambda r: r.get("implementation_effort", "Unknown"), str),
+    ("Risk", lambda r: r.get("risk_level", "Unknown"), str)
+]
+
+SERVICE_COLUMNS: List[Column] = [
+    ("Service", lambda item: item[0], str),
+    ("Monthly Cost (INR)", lambda item: item[1], lambda cost: inr(cost, 2))
+]
+
+BREAKDOWN_COLUMNS: Dict[str, List[Column]] = {
+    label: [
+        ("Service", lambda row: row[0], str),
+        (label, lambda row: row[1], str),
+        ("Cost (INR)", lambda row: row[2], lambda cost: inr(cost, 2)),
+        ("Share", lambda row: row[3], lambda share: f"{share:.1f}%")
+    ]
+    for label in ("Resource", "Usage Type", "Region")
+}
+
+
+def breakdown_tables(cube: Any, top: int = 20) -> List[Tuple[str, Sequence[Column], List[Any]]]:
+    """extra_tables for write_html_report: the largest service x resource, usage type and region cells of a CostCube."""
+    total = cube.total()
+    tables = []
+    for heading, dim, label in (
+        ("Top Resources", "resource_id", "Resource"),
+        ("Cost by Usage Type", "usage_type", "Usage Type"),
+        ("Cost by Region", "region", "Region")
+    ):
+        cells = heapq.nlargest(top, cube.rollup(("service", dim)).items(), key=lambda item: item[1])
+        rows = [(service, value, cost, cost / total * 100 if total else 0.0) for (service, value), cost in cells]
+        if rows:
+            tables.append((heading, BREAKDOWN_COLUMNS[label], rows))
+    return tables
+
+
+def write_html_report(
+    report: Dict[str, Any],
+    f: IO[str],
+    page_size: int = 50,
+    extra_tables: Sequence[Tuple[str, Sequence[Column], Iterable[Any]]] = ()
+):
+    """Stream a cost report as HTML.
+
+    extra_tables adds (heading, columns, rows) sections after the
+    recommendations, e.g. a resource-level breakdown from CostCube.
+    """
+    analysis = report.get("analysis", {})
+    summary = report.get("summary", {})
+
+    writer = HtmlReportWriter(f, page_size=page_size)
+    writer.begin("Cloud Cost Optimization Report")
+
+    writer.heading("Cost Analysis Summary")
+    writer.metric(
+        "Total Monthly Cost",
+        inr(analysis.get("total_monthly_cost", 0)),
+        "over-budget" if analysis.get("is_over_budget") else "within-budget"
+    )
+    writer.metric("Budget", inr(analysis.get("budget", 0)))
+    writer.metric("Budget Variance", inr(analysis.get("budget_variance", 0)))
+    writer.metric("Total Potential Savings", inr(summary.get("total_potential_savings", 0)))
+
+    writer.heading("High-Cost Services")
+    writer.table(SERVICE_COLUMNS, analysis.get("high_cost_services", {}).items())
+
+    service_costs = analysis.get("service_costs", {})
+    if len(service_costs) > len(analysis.get("high_cost_services", {})):
+        writer.heading("All Services")
+        writer.table(SERVICE_COLUMNS, sorted(service_costs.items(), key=lambda item: item[1] or 0, reverse=True))
+
+    writer.heading("Cost Optimization Recommendations")
+    writer.table(RECOMMENDATION_COLUMNS, report.get("recommendations", []))
+
+    for heading, columns, rows in extra_tables:
+        writer.heading(heading)
+        writer.table(columns, rows)
+
+    if report.get("narrative"):
+        writer.heading("Narrative")
+        writer.paragraph(report["narrative"])
+
+    writer.heading("Summary")
+    writer.items([
+        ("Total Potential Savings", inr(summary.get("total_potential_savings", 0))),
+        ("Savings Percentage", f"{summary.get('savings_percentage', 0):.1f}%"),
+        ("Total Recommendations", str(summary.get("recommendations_count", 0))),
+        ("High-Impact Recommendations", str(summary.get("high_impact_recommendations", 0)))
+    ])
+    writer.end(["Generated by AI-Powered Cloud Cost Optimizer", "For more details, see the JSON report files"])
+
+
+PORTFOLIO_COLUMNS: List[Column] = [
+    ("Project", lambda p: p.get("name", p.get("id", "Unknown")), str),
+    ("Monthly Cost", lambda p: p.get("total_monthly_cost", 0), inr),
+    ("Budget", lambda p: p.get("budget", 0), inr),
+    ("Variance", lambda p: p.get("budget_variance", 0), inr),
+    ("Variance %", lambda p: p.get("budget_variance_pct", 0), lambda v: f"{v or 0:+.1f}%"),
+    ("Potential Savings", lambda p: p.get("potential_savings", 0), inr),
+    ("Top Service", lambda p: next(iter(p.get("high_cost_services", {})), "-"), str)
+]
+
+PORTFOLIO_RECOMMENDATION_COLUMNS: List[Column] = [("Project", lambda r: r.get("project", "Unknown"), str)] + RECOMMENDATION_COLUMNS
+
+
+def write_portfolio_html(report: Dict[str, Any], f: IO[str], page_size: int = 50):
+    """Stream a PortfolioAnalyzer report as HTML, projects ranked by budget variance."""
+    portfolio = report.get("portfolio", {})
+    projects = report.get("projects", [])
+
+    writer = HtmlReportWriter(f, page_size=page_size)
+    writer.begin("Cloud Cost Portfolio Report")
+
+    writer.heading(f"Portfolio Summary ({portfolio.get('project_count', 0)} projects)")
+    writer.metric(
+        "Total Monthly Cost",
+        inr(portfolio.get("total_monthly_cost", 0)),
+        "over-budget" if portfolio.get("budget_variance", 0) > 0 else "within-budget"
+    )
+    writer.metric("Total Budget", inr(portfolio.get("total_budget", 0)))
+    writer.metric("Over-Budget Projects", str(portfolio.get("over_budget_count", 0)))
+    writer.metric("Total Potential Savings", inr(portfolio.get("total_potential_savings", 0)))
+
+    writer.heading("High-Cost Services")
+    writer.table(SERVICE_COLUMNS, portfolio.get("high_cost_services", {}).items())
+
+    writer.heading("Projects by Budget Variance")
+    writer.table(PORTFOLIO_COLUMNS, sorted(projects, key=lambda p: p.get("variance_rank", 0)))
+
+    writer.heading("Projects by Potential Savings")
+    writer.table(PORTFOLIO_COLUMNS, sorted(projects, key=lambda p: p.get("savings_rank", 0)))
+
+    if report.get("top_recommendations"):
+        writer.heading("Top High-Impact Recommendations")
+        writer.table(PORTFOLIO_RECOMMENDATION_COLUMNS, report["top_recommendations"])
+
+    writer.end(["Generated by AI-Powered Cloud Cost Optimizer", "For per-project details, see the JSON portfolio report"])
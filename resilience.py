@@ -0,0 +1,176 @@
+
+import asyncio
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+RETRYABLE_STATUS = (408, 425, 429, 500, 502, 503, 504)
+FATAL_STATUS = (400, 401, 403, 404, 405, 413, 422)
+RETRYABLE_MARKERS = ("overloaded", "rate limit", "rate_limit", "timeout", "timed out", "temporarily", "unavailable", "connection")
+FATAL_MARKERS = ("unauthorized", "forbidden", "invalid api key", "invalid token", "not found", "bad request")
+
+
+class InferenceAbort(Exception):
+    """Raised when retrying is pointless: fatal error, open circuit or exhausted deadline."""
+
+
+class CircuitOpenError(InferenceAbort):
+    pass
+
+
+def status_code(error: Exception) -> Optional[int]:
+
+    # requests/huggingface_hub errors carry .response.status_code, aiohttp errors carry .status
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) or getattr(error, "status", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+
+    if isinstance(error, InferenceAbort):
+        return False
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+
+    status = status_code(error)
+    if status in RETRYABLE_STATUS:
+        return True
+    if status in FATAL_STATUS:
+        return False
+
+    error_str = str(error).lower()
+    if any(marker in error_str for marker in RETRYABLE_MARKERS):
+        return True
+    if any(marker in error_str for marker in FATAL_MARKERS):
+        return False
+
+    # Unknown errors keep the old behavior of being retried
+    return True
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Retry-After header of an HTTP error, in seconds (delta or HTTP date)."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or getattr(error, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: float = None, base: float = None, cap: float = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    base = float(base if base is not None else os.getenv("LLM_BACKOFF_BASE", 1.0))
+    cap = float(cap if cap is not None else os.getenv("LLM_BACKOFF_CAP", 30.0))
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+class Deadline:
+    """Wall-clock budget shared by every attempt of a stage."""
+
+    def __init__(self, seconds: float = None):
+
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds if seconds else None
+
+    @classmethod
+    def for_stage(cls) -> "Deadline":
+
+        return cls(float(os.getenv("LLM_STAGE_DEADLINE", 300)))
+
+    def remaining(self) -> float:
+
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+
+        return self.remaining() <= 0
+
+
+class CircuitBreaker:
+    """Per-model breaker: opens after consecutive failures, lets one probe through after a cool-down."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None):
+
+        self.failure_threshold = int(failure_threshold or os.getenv("LLM_BREAKER_THRESHOLD", 5))
+        self.reset_timeout = float(reset_timeout or os.getenv("LLM_BREAKER_RESET", 30))
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # One probe request decides whether the model has recovered; a probe that
+                # never reports back (e.g. a cancelled hedge) is replaced after another cool-down
+                self.state = self.HALF_OPEN
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def retry_in(self) -> float:
+
+        with self._lock:
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker(model: str) -> CircuitBreaker:
+    """Process-wide breaker for a model, shared by sync and async clients."""
+    with _breakers_lock:
+        if model not in _breakers:
+            _breakers[model] = CircuitBreaker()
+        return _breakers[model]
+
+
+def breaker_states() -> Dict[str, str]:
+
+    with _breakers_lock:
+        return {model: breaker.state for model, breaker in _breakers.items()}
@@ -0,0 +1,335 @@
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+# Same threshold the rule engine uses for summary["high_impact_recommendations"];
+# kept here so the history store does not import numpy
+HIGH_IMPACT_SHARE = 0.10
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        billing_month TEXT,
+        total_monthly_cost REAL,
+        budget REAL,
+        total_potential_savings REAL,
+        savings_percentage REAL,
+        recommendations_count INTEGER,
+        profile TEXT,
+        report TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS billing_records (
+        run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+        project TEXT NOT NULL,
+        month TEXT,
+        service TEXT,
+        resource_id TEXT,
+        region TEXT,
+        usage_type TEXT,
+        usage_quantity REAL,
+        unit TEXT,
+        cost_inr REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS recommendations (
+        run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+        project TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        service TEXT,
+        title TEXT,
+        recommendation_type TEXT,
+        potential_savings REAL,
+        implementation_effort TEXT,
+        risk_level TEXT,
+        high_impact INTEGER NOT NULL,
+        data TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_runs_project_created ON runs(project, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_created ON runs(created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_billing_run ON billing_records(run_id)",
+    "CREATE INDEX IF NOT EXISTS idx_billing_project_month ON billing_records(project, month)",
+    "CREATE INDEX IF NOT EXISTS idx_billing_service_month ON billing_records(service, month)",
+    "CREATE INDEX IF NOT EXISTS idx_recommendations_run ON recommendations(run_id)",
+    "CREATE INDEX IF NOT EXISTS idx_recommendations_service ON recommendations(service, high_impact, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_recommendations_project ON recommendations(project, created_at)"
+)
+
+BILLING_COLUMNS = ("month", "service", "resource_id", "region", "usage_type", "usage_quantity", "unit", "cost_inr")
+
+
+def history_enabled() -> bool:
+
+    return os.getenv("RUN_HISTORY_DISABLED", "").lower() not in ("1", "true", "yes")
+
+
+def project_key(profile: Optional[Dict[str, Any]], fallback: str = "default") -> str:
+    """Runs are grouped by the profile's project name."""
+    name = (profile or {}).get("name")
+    return str(name).strip() if name and str(name).strip() else fallback
+
+
+class RunHistory:
+    """Embedded SQLite store of past profiles, billing records, reports and recommendations.
+
+    Every analysis is appended as a run; nothing is overwritten. Billing
+    records and recommendations get their own indexed tables so trend and
+    cross-project queries never parse the stored report JSON.
+    """
+
+    def __init__(self, path: str = None):
+
+        self.path = path or os.getenv("RUN_HISTORY_PATH", "temp/run_history.sqlite3")
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+
+    def record_run(
+        self,
+        profile: Optional[Dict[str, Any]],
+        report: Dict[str, Any],
+        billing: Optional[Iterable[Dict[str, Any]]] = None,
+        project: str = None,
+        created_at: float = None
+    ) -> int:
+        """Store one analysis in a single transaction; returns the run id.
+
+        billing may be any iterable of records (it is consumed once) or None
+        when the report was built from a streamed export.
+        """
+        project = project or project_key(profile)
+        created_at = created_at if created_at is not None else time.time()
+        analysis = report.get("analysis", {})
+        summary = report.get("summary", {})
+        total_cost = analysis.get("total_monthly_cost") or 0
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                run_id = self._conn.execute(
+                    """INSERT INTO runs (
+                        project, created_at, total_monthly_cost, budget, total_potential_savings,
+                        savings_percentage, recommendations_count, profile, report
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (
+                        project,
+                        created_at,
+                        analysis.get("total_monthly_cost"),
+                        analysis.get("budget"),
+                        summary.get("total_potential_savings"),
+                        summary.get("savings_percentage"),
+                        summary.get("recommendations_count"),
+                        json.dumps(profile, separators=(",", ":")) if profile is not None else None,
+                        json.dumps(report, separators=(",", ":"))
+                    )
+                ).lastrowid
+
+                if billing is not None:
+                    self._conn.executemany(
+                        f"INSERT INTO billing_records (run_id, project, {', '.join(BILLING_COLUMNS)}) "
+                        f"VALUES (?, ?, {', '.join('?' * len(BILLING_COLUMNS))})",
+                        ((run_id, project, *(record.get(column) for column in BILLING_COLUMNS)) for record in billing)
+                    )
+                    # The latest month billed in this run, for month-keyed run queries
+                    self._conn.execute(
+                        "UPDATE runs SET billing_month = (SELECT MAX(month) FROM billing_records WHERE run_id = ?) WHERE id = ?",
+                        (run_id, run_id)
+                    )
+
+                self._conn.executemany(
+                    """INSERT INTO recommendations (
+                        run_id, project, created_at, service, title, recommendation_type, potential_savings,
+                        implementation_effort, risk_level, high_impact, data
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (
+                        (
+                            run_id,
+                            project,
+                            created_at,
+                            rec.get("service"),
+                            rec.get("title"),
+                            rec.get("recommendation_type"),
+                            rec.get("potential_savings"),
+                            rec.get("implementation_effort"),
+                            rec.get("risk_level"),
+                            int(total_cost > 0 and (rec.get("potential_savings") or 0) >= HIGH_IMPACT_SHARE * total_cost),
+                            json.dumps(rec, separators=(",", ":"))
+                        )
+                        for rec in report.get("recommendations", [])
+                    )
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return run_id
+
+    def projects(self) -> List[Dict[str, Any]]:
+        """Every project with its run count and latest run time."""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT project, COUNT(*) AS runs, MAX(created_at) AS last_run_at
+                FROM runs GROUP BY project ORDER BY last_run_at DESC"""
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def runs(
+        self,
+        project: str = None,
+        since: float = None,
+        until: float = None,
+        limit: int = None
+    ) -> List[Dict[str, Any]]:
+        """Run summaries (without the stored JSON), newest first."""
+        clauses, params = self._time_filter(project, since, until)
+        query = (
+            "SELECT id, project, created_at, billing_month, total_monthly_cost, budget, total_potential_savings, "
+            "savings_percentage, recommendations_count FROM runs"
+            + (" WHERE " + " AND ".join(clauses) if clauses else "")
+            + " ORDER BY created_at DESC, id DESC"
+        )
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def savings_trend(self, project: str, since: float = None, until: float = None) -> List[Dict[str, Any]]:
+        """Cost and potential savings of each run of a project, oldest first."""
+        clauses, params = self._time_filter(project, since, until)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id AS run_id, created_at, billing_month, total_monthly_cost, total_potential_savings, "
+                "savings_percentage, recommendations_count FROM runs WHERE "
+                + " AND ".join(clauses) + " ORDER BY created_at, id",
+                params
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def recommendations(
+        self,
+        service: str = None,
+        project: str = None,
+        high_impact_only: bool = False,
+        latest_only: bool = False,
+        limit: int = None
+    ) -> List[Dict[str, Any]]:
+        """Stored recommendations, highest savings first.
+
+        latest_only keeps each project's most recent run, e.g. "current
+        high-impact Database recommendations across projects".
+        """
+        clauses, params = [], []
+        if service:
+            clauses.append("r.service = ?")
+            params.append(service)
+        if project:
+            clauses.append("r.project = ?")
+            params.append(project)
+        if high_impact_only:
+            clauses.append("r.high_impact = 1")
+        if latest_only:
+            clauses.append("r.run_id = (SELECT id FROM runs WHERE project = r.project ORDER BY created_at DESC, id DESC LIMIT 1)")
+
+        query = (
+            "SELECT r.run_id, r.project, r.created_at, r.high_impact, r.data FROM recommendations r"
+            + (" WHERE " + " AND ".join(clauses) if clauses else "")
+            + " ORDER BY r.potential_savings DESC, r.created_at DESC"
+        )
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        results = []
+        for row in rows:
+            rec = json.loads(row["data"])
+            rec.update(
+                run_id=row["run_id"],
+                project=row["project"],
+                created_at=row["created_at"],
+                high_impact=bool(row["high_impact"])
+            )
+            results.append(rec)
+        return results
+
+    def monthly_costs(self, project: str = None, service: str = None) -> List[Dict[str, Any]]:
+        """Billed cost per month (and service), from each project's latest run covering that month."""
+        clauses, params = [], []
+        if project:
+            clauses.append("b.project = ?")
+            params.append(project)
+        if service:
+            clauses.append("b.service = ?")
+            params.append(service)
+        clauses.append(
+            "b.run_id = (SELECT MAX(run_id) FROM billing_records WHERE project = b.project AND month = b.month)"
+        )
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT b.month, b.service, SUM(b.cost_inr) AS cost_inr, COUNT(*) AS record_count "
+                "FROM billing_records b WHERE " + " AND ".join(clauses)
+                + " GROUP BY b.month, b.service ORDER BY b.month, cost_inr DESC",
+                params
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def load_report(self, run_id: int = None, project: str = None) -> Dict[str, Any]:
+        """A stored report by run id, or the latest one (optionally for a project); {} if none."""
+        if run_id is not None:
+            query, params = "SELECT report FROM runs WHERE id = ?", [run_id]
+        elif project:
+            query, params = "SELECT report FROM runs WHERE project = ? ORDER BY created_at DESC, id DESC LIMIT 1", [project]
+        else:
+            query, params = "SELECT report FROM runs ORDER BY created_at DESC, id DESC LIMIT 1", []
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return json.loads(row["report"]) if row else {}
+
+    def load_profile(self, run_id: int) -> Dict[str, Any]:
+
+        with self._lock:
+            row = self._conn.execute("SELECT profile FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return json.loads(row["profile"]) if row and row["profile"] else {}
+
+    def delete_run(self, run_id: int) -> bool:
+
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+            return cursor.rowcount > 0
+
+    def close(self):
+
+        with self._lock:
+            self._conn.close()
+
+    def _time_filter(self, project: Optional[str], since: Optional[float], until: Optional[float]):
+
+        clauses, params = [], []
+        if project:
+            clauses.append("project = ?")
+            params.append(project)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        return clauses, params
@@ -0,0 +1,148 @@
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+STAGES = ("profile", "billing", "analysis")
+
+
+def stage_cache_enabled() -> bool:
+
+    return os.getenv("STAGE_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+
+def stage_key(stage: str, **inputs: Any) -> str:
+    """Content hash of a stage and everything its output depends on."""
+    payload = {"stage": stage, "inputs": inputs}
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    """Persistent store of pipeline stage outputs (profile, billing, analysis) backed by SQLite.
+
+    Each output is stored under stage_key(stage, **inputs), so a stage is only
+    recomputed when one of its inputs (upstream artifact, model, prompt
+    version, settings) changes; everything downstream of it follows. Entries
+    older than ttl_seconds expire and the least recently used ones are evicted
+    beyond max_entries.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None, ttl_seconds: float = None):
+
+        self.path = path or os.getenv("STAGE_CACHE_PATH", "temp/stage_cache.sqlite3")
+        self.max_entries = int(max_entries or os.getenv("STAGE_CACHE_MAX_ENTRIES", 1000))
+        self.ttl_seconds = float(ttl_seconds or os.getenv("STAGE_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS artifacts (
+                key TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_stage ON artifacts(stage)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_accessed ON artifacts(accessed_at)")
+
+    def get(self, key: str) -> Optional[Any]:
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM artifacts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE artifacts SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, stage: str, value: Any):
+
+        now = time.time()
+        encoded = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (key, stage, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, stage, encoded, now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+
+        # Expired entries first, then least recently used beyond max_entries
+        cursor = self._conn.execute("DELETE FROM artifacts WHERE created_at < ?", (now - self.ttl_seconds,))
+        self.evictions += max(cursor.rowcount, 0)
+
+        count = self._conn.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+        if count > self.max_entries:
+            cursor = self._conn.execute(
+                "DELETE FROM artifacts WHERE key IN (SELECT key FROM artifacts ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+
+    def run(
+        self,
+        stage: str,
+        inputs: Dict[str, Any],
+        compute: Callable[[], Any],
+        accept: Callable[[Any], bool] = None
+    ) -> Tuple[Any, bool]:
+        """Stored output for these inputs, or compute() stored under them; returns (value, cached).
+
+        accept(value) can keep best-effort results (e.g. a profile that never
+        passed validation) out of the store.
+        """
+        key = stage_key(stage, **inputs)
+        value = self.get(key)
+        if value is not None:
+            return value, True
+        value = compute()
+        if accept is None or accept(value):
+            self.put(key, stage, value)
+        return value, False
+
+    def invalidate(self, stage: str = None) -> int:
+        """Drop the outputs of one stage and the stages after it (all of them when stage is None)."""
+        if stage is not None and stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage} (expected one of {', '.join(STAGES)})")
+        stages = STAGES[STAGES.index(stage):] if stage else STAGES
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM artifacts WHERE stage IN ({', '.join('?' * len(stages))})", stages
+            )
+            return max(cursor.rowcount, 0)
+
+    def stats(self) -> Dict[str, Any]:
+
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, COUNT(*) FROM artifacts GROUP BY stage").fetchall()
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": dict(rows)}
+
+    def close(self):
+
+        with self._lock:
+            self._conn.close()
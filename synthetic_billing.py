@@ -0,0 +1,269 @@
+
+import gzip
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from billing_frame import BillingFrame
+from billing_ingest import BILLING_FIELDS
+
+# service -> (unit, INR per unit, log-mean quantity, resource prefix, description)
+SERVICE_CATALOG = {
+    "Compute": ("hours", 12.0, 6.3, "instance", "Application server instance"),
+    "Database": ("hours", 18.0, 6.3, "db", "Managed database instance"),
+    "Storage": ("GB", 2.0, 6.0, "bucket", "Object storage"),
+    "CDN": ("GB-transfer", 1.5, 6.5, "cdn", "CDN edge data transfer"),
+    "Networking": ("GB-transfer", 0.8, 6.2, "lb", "Load balancer and data transfer"),
+    "Monitoring": ("requests", 0.002, 12.0, "monitor", "Metrics, logs and alerting"),
+    "Cache": ("hours", 6.0, 6.3, "cache", "In-memory cache node"),
+    "Serverless": ("requests", 0.0002, 13.0, "fn", "Serverless function invocations"),
+}
+
+DEFAULT_REGIONS = {"ap-south-1": 0.7, "us-east-1": 0.2, "europe-west1": 0.1}
+DEFAULT_USAGE_TYPES = {"On-Demand": 0.6, "Reserved": 0.25, "Spot": 0.1, "Savings Plan": 0.05}
+USAGE_TYPE_DISCOUNT = {"On-Demand": 1.0, "Reserved": 0.6, "Spot": 0.3, "Savings Plan": 0.72}
+REGION_PRICE_FACTOR = {"ap-south-1": 1.0, "us-east-1": 0.95, "europe-west1": 1.08}
+DEFAULT_MONTHS = ("2025-11", "2025-12")
+
+
+def _normalize(weights: Dict[str, float]) -> Dict[str, float]:
+
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Distribution weights must sum to a positive number")
+    return {k: v / total for k, v in weights.items()}
+
+
+def profile_service_weights(project_profile: Dict[str, Any]) -> Dict[str, float]:
+    """Service mix implied by the project's tech stack."""
+    tech_stack = project_profile.get("tech_stack") or {}
+    weights = {"Compute": 4.0, "Storage": 1.5, "Networking": 1.0, "Monitoring": 0.5}
+    if tech_stack.get("database"):
+        weights["Database"] = 3.0
+    if tech_stack.get("frontend"):
+        weights["CDN"] = 1.0
+    if tech_stack.get("proxy"):
+        weights["Networking"] += 1.0
+
+    stack_text = " ".join(str(v) for v in tech_stack.values() if v).lower()
+    if "redis" in stack_text or "memcache" in stack_text:
+        weights["Cache"] = 1.0
+    if "lambda" in stack_text or "serverless" in stack_text or "functions" in stack_text:
+        weights["Serverless"] = 1.0
+    return weights
+
+
+class SyntheticBillingGenerator:
+    """Seeded, vectorized billing generator; an offline drop-in for BillingGenerator."""
+
+    def __init__(
+        self,
+        seed: int = None,
+        service_weights: Optional[Dict[str, float]] = None,
+        region_weights: Optional[Dict[str, float]] = None,
+        usage_type_weights: Optional[Dict[str, float]] = None,
+        months: Sequence[str] = DEFAULT_MONTHS,
+        records_per_month: int = 8,
+        scale_to_budget: bool = True
+    ):
+
+        self.seed = int(seed if seed is not None else os.getenv("SYNTHETIC_BILLING_SEED", 42))
+        self.service_weights = service_weights
+        self.region_weights = _normalize(region_weights or DEFAULT_REGIONS)
+        self.usage_type_weights = _normalize(usage_type_weights or DEFAULT_USAGE_TYPES)
+        self.months = list(months)
+        self.records_per_month = records_per_month
+        self.scale_to_budget = scale_to_budget
+
+        unknown = [s for s in (service_weights or {}) if s not in SERVICE_CATALOG]
+        if unknown:
+            raise ValueError(f"Unknown service(s): {', '.join(unknown)}")
+
+    def fingerprint(self) -> Dict[str, Any]:
+        """Settings the generated billing depends on, besides the profile."""
+        return {
+            "generator": "synthetic",
+            "seed": self.seed,
+            "service_weights": self.service_weights,
+            "region_weights": self.region_weights,
+            "usage_type_weights": self.usage_type_weights,
+            "months": self.months,
+            "records_per_month": self.records_per_month,
+            "scale_to_budget": self.scale_to_budget
+        }
+
+    def generate(self, project_profile: Dict[str, Any], max_retries: int = 3, n_records: int = None) -> List[Dict[str, Any]]:
+        """Same contract as BillingGenerator.generate (12-20 records by default)."""
+        n_records = n_records or self.records_per_month * len(self.months)
+        return self.generate_frame(project_profile, n_records).to_records()
+
+    def generate_frame(
+        self,
+        project_profile: Dict[str, Any],
+        n_records: int,
+        chunk_index: int = 0,
+        total_records: int = None,
+        with_desc: bool = True
+    ) -> BillingFrame:
+
+        rng = np.random.default_rng([self.seed, chunk_index])
+        services = _normalize(self.service_weights or profile_service_weights(project_profile))
+        service_names = list(services)
+        regions = list(self.region_weights)
+        usage_types = list(self.usage_type_weights)
+
+        # Every month gets an equal share; records are drawn independently per dimension
+        month_codes = np.repeat(np.arange(len(self.months), dtype=np.int32), -(-n_records // len(self.months)))[:n_records]
+        service_codes = rng.choice(len(service_names), size=n_records, p=list(services.values())).astype(np.int32)
+        region_codes = rng.choice(len(regions), size=n_records, p=list(self.region_weights.values())).astype(np.int32)
+        usage_codes = rng.choice(len(usage_types), size=n_records, p=list(self.usage_type_weights.values())).astype(np.int32)
+
+        catalog = [SERVICE_CATALOG[s] for s in service_names]
+        unit_names = sorted({entry[0] for entry in catalog})
+        unit_of_service = np.array([unit_names.index(entry[0]) for entry in catalog], dtype=np.int32)
+        unit_price = np.array([entry[1] for entry in catalog])
+        log_mean = np.array([entry[2] for entry in catalog])
+
+        quantity = np.round(np.exp(rng.normal(log_mean[service_codes], 0.5)), 2)
+        price_factor = (
+            np.array([USAGE_TYPE_DISCOUNT.get(u, 1.0) for u in usage_types])[usage_codes]
+            * np.array([REGION_PRICE_FACTOR.get(r, 1.0) for r in regions])[region_codes]
+        )
+        cost = quantity * unit_price[service_codes] * price_factor
+
+        if self.scale_to_budget and n_records:
+            # Each month lands within +-10% of the budget (pro rata for a chunk of a larger run)
+            budget = float(project_profile.get("budget_inr_per_month", 50000))
+            share = n_records / float(total_records or n_records)
+            targets = budget * share * rng.uniform(0.9, 1.1, size=len(self.months))
+            month_totals = np.bincount(month_codes, weights=cost, minlength=len(self.months))
+            factors = np.divide(targets, month_totals, out=np.ones_like(targets), where=month_totals > 0)
+            cost = cost * factors[month_codes]
+        cost = np.round(cost, 2)
+
+        # Resource ids: a pool per service, roughly 50 records per resource
+        pool = int(min(10000, max(2, n_records // max(1, 50 * len(service_names)))))
+        resource_codes = (service_codes * pool + rng.integers(0, pool, size=n_records)).astype(np.int32)
+        resource_names = [f"{entry[3]}-{i + 1:03d}" for entry in catalog for i in range(pool)]
+
+        categories = {
+            "service": service_names,
+            "region": regions,
+            "usage_type": usage_types,
+            "unit": unit_names,
+            "month": self.months,
+            "resource_id": resource_names
+        }
+        codes = {
+            "service": service_codes,
+            "region": region_codes,
+            "usage_type": usage_codes,
+            "unit": unit_of_service[service_codes],
+            "month": month_codes,
+            "resource_id": resource_codes
+        }
+        measures = {"usage_quantity": quantity, "cost_inr": cost}
+
+        desc = None
+        if with_desc:
+            descriptions = [entry[4] for entry in catalog]
+            desc = [descriptions[c] for c in service_codes.tolist()]
+        return BillingFrame(codes, categories, measures, desc)
+
+    def stream_to_file(
+        self,
+        project_profile: Dict[str, Any],
+        filepath: str,
+        n_records: int,
+        chunk_size: int = 1000000
+    ) -> int:
+        """Write n_records as CSV (or JSONL by extension, .gz compressed if requested) chunk by chunk."""
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        lowered = filepath.lower()
+        as_jsonl = lowered.endswith((".jsonl", ".jsonl.gz"))
+        if lowered.endswith(".gz"):
+            handle = gzip.open(filepath, "wt", encoding="utf-8", newline="", compresslevel=5)
+        else:
+            handle = open(filepath, "w", encoding="utf-8", newline="")
+
+        written = 0
+        with handle as f:
+            if not as_jsonl:
+                f.write(",".join(BILLING_FIELDS) + "\n")
+
+            chunk_index = 0
+            while written < n_records:
+                size = min(chunk_size, n_records - written)
+                frame = self.generate_frame(
+                    project_profile,
+                    size,
+                    chunk_index=chunk_index,
+                    total_records=n_records,
+                    with_desc=False
+                )
+                f.write(self._format_chunk(frame, as_jsonl))
+                written += size
+                chunk_index += 1
+
+        return written
+
+    def _format_chunk(self, frame: BillingFrame, as_jsonl: bool) -> str:
+
+        # Columns are rendered to strings with numpy; only the final join runs per record
+        if not len(frame):
+            return ""
+
+        # Labels are escaped once per category, then gathered by code, so quoting costs nothing per record
+        escape = _json_string if as_jsonl else _csv_field
+
+        def labels(dim: str, names: List[str] = None) -> List[str]:
+            escaped = np.asarray([escape(name) for name in (names or frame.categories[dim])], dtype=object)
+            return escaped[frame.codes[dim]].tolist()
+
+        columns = [
+            labels("month"),
+            labels("service"),
+            labels("resource_id"),
+            labels("region"),
+            labels("usage_type"),
+            _format_fixed2(frame.measures["usage_quantity"]),
+            labels("unit"),
+            _format_fixed2(frame.measures["cost_inr"]),
+            labels("service", [SERVICE_CATALOG[s][4] for s in frame.categories["service"]])
+        ]
+
+        if as_jsonl:
+            template = (
+                '{{"month": {}, "service": {}, "resource_id": {}, "region": {}, '
+                '"usage_type": {}, "usage_quantity": {}, "unit": {}, "cost_inr": {}, "desc": {}}}'
+            )
+            rows = map(template.format, *columns)
+        else:
+            rows = map(",".join, zip(*columns))
+        return "\n".join(rows) + "\n"
+
+
+def _csv_field(value: str) -> str:
+    """Quote a CSV field the way csv.writer does (QUOTE_MINIMAL)."""
+    if any(c in value for c in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def _json_string(value: str) -> str:
+
+    return json.dumps(value, ensure_ascii=False)
+
+
+_CENTS = np.asarray([f".{i:02d}" for i in range(100)])
+
+
+def _format_fixed2(values: np.ndarray) -> List[str]:
+    """Fast '%.2f' formatting for non-negative arrays via integer cents."""
+    cents = np.rint(values * 100).astype(np.int64)
+    return np.char.add((cents // 100).astype(str), _CENTS[cents % 100]).tolist()
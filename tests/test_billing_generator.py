@@ -0,0 +1,11 @@
+from billing_generator import BillingGenerator
+
+
+def test_generator_builds_without_credentials(monkeypatch):
+
+    monkeypatch.delenv("HUGGINGFACE_API_KEY", raising=False)
+    generator = BillingGenerator(model="some/model")
+
+    assert generator._client is None
+    assert generator.fingerprint()["model"] == "some/model"
+    assert generator._parse_response('```json\n[{"month": "2025-12"}]\n```') == [{"month": "2025-12"}]
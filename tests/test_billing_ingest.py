@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from billing_ingest import IngestStats, iter_billing_chunks
+
+HEADER = "month,service,resource_id,usage_quantity,unit,cost_inr,desc\n"
+
+
+def _records(path, **kwargs):
+
+    return [record for chunk in iter_billing_chunks(str(path), **kwargs) for record in chunk]
+
+
+@pytest.mark.parametrize("bad_cell", ["n/a", "12.5 INR", "nan", "inf"])
+def test_unparseable_cost_is_rejected_not_zeroed(tmp_path, bad_cell):
+
+    path = tmp_path / "billing.csv"
+    path.write_text(
+        HEADER
+        + "2025-12,Compute,vm-1,720,hours,1000,VM\n"
+        + f"2025-12,Storage,disk-1,100,GB,{bad_cell},Disk\n"
+        + "2025-12,Database,db-1,720,hours,\"2,500\",DB\n"
+    )
+    stats = IngestStats()
+    records = _records(path, stats=stats)
+
+    assert [r["service"] for r in records] == ["Compute", "Database"]
+    assert sum(r["cost_inr"] for r in records) == 3500
+    assert (stats.rows, stats.rejected) == (3, 1)
+    assert stats.examples[0].startswith("row 3: cost_inr")
+
+
+def test_blank_numeric_cells_are_zero(tmp_path):
+
+    path = tmp_path / "billing.csv"
+    path.write_text(HEADER + "2025-12,Compute,vm-1,,hours,,VM\n")
+    stats = IngestStats()
+
+    records = _records(path, stats=stats)
+
+    assert records[0]["cost_inr"] == 0.0 and records[0]["usage_quantity"] == 0.0
+    assert stats.rejected == 0
+
+
+def test_rejected_examples_are_capped(tmp_path):
+
+    path = tmp_path / "billing.csv"
+    path.write_text(HEADER + "2025-12,Compute,vm-1,1,hours,bad,VM\n" * 20)
+    stats = IngestStats()
+
+    assert _records(path, stats=stats) == []
+    assert stats.rejected == 20
+    assert len(stats.examples) == IngestStats.MAX_EXAMPLES
+
+
+def test_jsonl_columns_come_from_all_keys(tmp_path):
+
+    # The first line lacks the region and cost columns; later lines carry them
+    rows = [
+        {"month": "2025-12-01", "service": "Compute"},
+        {"month": "2025-12-01", "service": "Storage", "region": "ap-south-1", "cost_inr": "12.5"},
+        {"month": "2025-12-01", "service": "Database", "region": "ap-south-1", "cost_inr": 30},
+    ]
+    path = tmp_path / "billing.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in rows) + "\n")
+
+    records = _records(path, chunk_size=2)
+
+    assert [r["cost_inr"] for r in records] == [0.0, 12.5, 30.0]
+    assert [r.get("region") for r in records] == ["", "ap-south-1", "ap-south-1"]
+    assert all(r["month"] == "2025-12" for r in records)
@@ -0,0 +1,82 @@
+import pytest
+
+from json_extract import JSONExtractionError, extract_json, is_repaired
+
+
+def test_prefer_dict_never_returns_a_list():
+
+    assert extract_json("[1, 2]", prefer=dict) is None
+    assert extract_json("Here you go: [1, 2] done", prefer=dict) is None
+    assert extract_json('[1, 2] and {"a": 1}', prefer=dict) == {"a": 1}
+
+
+def test_prefer_tuple_orders_types():
+
+    assert extract_json('{"billing_records": []}', prefer=(list, dict)) == {"billing_records": []}
+    assert extract_json('{"note": 1} [{"month": "2025-12"}]', prefer=(list, dict)) == [{"month": "2025-12"}]
+
+
+def test_unparseable_text_still_raises():
+
+    with pytest.raises(JSONExtractionError):
+        extract_json("no json here", prefer=dict)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('[{"id": 1}, {"id": 2}, {"na', [{"id": 1}, {"id": 2}]),
+    # The innermost open value is closed too, so a partial element can survive; it is still marked
+    ('[{"id": 1}, {"id": 2, "na', [{"id": 1}, {"id": 2}]),
+    ('{"items": [1, 2, 3', {"items": [1, 2]}),
+    ('Result:\n{"a": {"b": [1, {"c": 2}], "d": "unfinish', {"a": {"b": [1, {"c": 2}]}}),
+    ('```json\n{"records": [{"id": 1}, {"id": 2}, {', {"records": [{"id": 1}, {"id": 2}]}),
+])
+def test_truncated_output_is_closed_after_the_last_complete_element(text, expected):
+
+    value = extract_json(text)
+    assert value == expected
+    assert is_repaired(value)
+
+
+def test_truncated_output_with_no_complete_element_raises():
+
+    with pytest.raises(JSONExtractionError):
+        extract_json('{"name": "Sh')
+
+
+def test_unclosed_bracket_in_prose_does_not_hide_the_payload():
+
+    value = extract_json('Note (see [1 below: {"a": 1}')
+    assert value == {"a": 1}
+    assert not is_repaired(value)
+
+
+def test_complete_values_are_not_marked_repaired():
+
+    value = extract_json('Sure!\n```json\n{"a": [1, 2],}\n```', prefer=dict)
+    assert value == {"a": [1, 2]}
+    assert not is_repaired(value)
+
+
+def test_stages_reject_repaired_output_in_is_usable():
+
+    from billing_generator import BillingGenerator
+    from profile_extractor import ProfileExtractor
+
+    profile = (
+        '{"name": "Shop", "budget_inr_per_month": 50000, "description": "A shop.", '
+        '"tech_stack": {"frontend": null, "backend": null, "database": null, "proxy": null, "hosting": null}, '
+        '"non_functional_requirements": ["security", "low latency", "high avail'
+    )
+    extractor = ProfileExtractor(extraction_mode="llm")
+    parsed = extractor._parse_response(profile)
+    assert is_repaired(parsed)
+    assert parsed["non_functional_requirements"] == ["security", "low latency"]
+    assert not extractor._is_usable(profile)
+    assert extractor._is_usable(profile + 'ability"]}')
+
+    record = '{"month": "2025-12", "service": "Compute", "resource_id": "vm", "region": "r", "usage_type": "On-Demand", ' \
+             '"usage_quantity": 1, "unit": "hours", "cost_inr": 10.0, "desc": "d"}'
+    billing = '{"billing_records": [' + ", ".join([record] * 13) + ', {"month": "2025'
+    records = BillingGenerator()._parse_response(billing)
+    assert len(records) == 13 and is_repaired(records)
+    assert not BillingGenerator()._is_usable(billing)
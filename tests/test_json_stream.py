@@ -0,0 +1,59 @@
+import pytest
+
+from json_stream import JsonStreamParser, StreamAbort
+
+
+def _feed_chars(text):
+
+    # Returns (offset of the character that completed the item, item) pairs
+    parser = JsonStreamParser()
+    emitted = []
+    for offset, char in enumerate(text):
+        emitted.extend((offset, item) for item in parser.feed(char))
+    return emitted
+
+
+def test_items_are_emitted_as_their_closing_brace_arrives():
+
+    text = 'Here is the JSON: [{"id": 1}, {"id": 2}] thanks'
+    emitted = _feed_chars(text)
+
+    assert [item for _, item in emitted] == [((), 0, {"id": 1}), ((), 1, {"id": 2})]
+    assert [offset for offset, _ in emitted] == [text.index("}"), text.rindex("}")]
+
+
+def test_items_carry_the_key_path_of_their_array():
+
+    text = '{"summary": {"total": 1}, "analysis": {"rows": [{"a": 1}]}, "recommendations": [{"b": 2}, {"c": 3}]}'
+    items = JsonStreamParser().feed(text)
+
+    assert items == [
+        (("analysis", "rows"), 0, {"a": 1}),
+        (("recommendations",), 0, {"b": 2}),
+        (("recommendations",), 1, {"c": 3})
+    ]
+
+
+def test_brackets_and_quotes_inside_strings_are_ignored():
+
+    text = '[{"desc": "a } ] [ { \\" quoted"}, {"desc": "x"}]'
+    items = [item for _, item in _feed_chars(text)]
+
+    assert [element for _, _, element in items] == [{"desc": 'a } ] [ { " quoted'}, {"desc": "x"}]
+
+
+def test_text_after_the_root_value_is_ignored():
+
+    parser = JsonStreamParser()
+    assert parser.feed('[{"id": 1}]') == [((), 0, {"id": 1})]
+    assert parser.done
+    assert parser.feed(' and [{"id": 2}]') == []
+
+
+@pytest.mark.parametrize("text", ['[{"id": 1}}', '[{"id": 1]', '[{"id": }]', '[{"id": 1,}]'])
+def test_malformed_json_aborts(text):
+
+    parser = JsonStreamParser()
+    with pytest.raises(StreamAbort):
+        for char in text:
+            parser.feed(char)
@@ -0,0 +1,161 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import llm_client
+from json_stream import StreamAbort
+from llm_client import HFInferenceClient
+from profile_extractor import ProfileExtractor
+from response_cache import ResponseCache
+
+PROFILE = {
+    "name": "Shop",
+    "budget_inr_per_month": 50000,
+    "description": "An online shop.",
+    "tech_stack": {"frontend": "React", "backend": "Django", "database": "PostgreSQL", "proxy": None, "hosting": "AWS"},
+    "non_functional_requirements": []
+}
+
+
+class ScriptedClient(HFInferenceClient):
+    """HFInferenceClient whose chat endpoint replays scripted completions instead of calling the API."""
+
+    def __init__(self, responses, cache):
+
+        self.responses = list(responses)
+        self.calls = 0
+        super().__init__(api_key="test-key", model="scripted/model", cache=cache, use_cache=True, hedge_models=[])
+
+    def _create_client(self, api_key):
+
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self._respond)))
+
+    def _respond(self, stream=False, **kwargs):
+
+        self.calls += 1
+        text = self.responses.pop(0)
+        if isinstance(text, Exception):
+            raise text
+        if not stream:
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+        # One token at a time, like a streamed completion
+        return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=c))]) for c in text])
+
+
+@pytest.fixture
+def cache(tmp_path):
+
+    cache = ResponseCache(path=str(tmp_path / "llm_cache.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def _at_least_two(text):
+
+    return len(json.loads(text)) >= 2
+
+
+SHORT = '[{"id": 1}]'
+FULL = '[{"id": 1}, {"id": 2}]'
+
+
+@pytest.mark.parametrize("method", ["query", "query_stream"])
+def test_rejected_text_is_returned_but_not_cached(cache, method):
+
+    client = ScriptedClient([SHORT, FULL], cache)
+    query = getattr(client, method)
+
+    assert query("prompt", accept=_at_least_two) == SHORT
+    assert query("prompt", accept=_at_least_two) == FULL
+    # Third call is served from the cache; the script is exhausted
+    assert query("prompt", accept=_at_least_two) == FULL
+    assert client.calls == 2
+
+
+@pytest.mark.parametrize("method", ["query", "query_stream"])
+def test_cached_text_failing_accept_is_regenerated(cache, method):
+
+    client = ScriptedClient([SHORT, FULL], cache)
+    query = getattr(client, method)
+
+    assert query("prompt") == SHORT
+    assert query("prompt", accept=_at_least_two) == FULL
+    assert query("prompt", accept=_at_least_two) == FULL
+    assert client.calls == 2
+
+
+def test_stream_abort_stops_and_caches_nothing(cache):
+
+    client = ScriptedClient([FULL, FULL], cache)
+    seen = []
+
+    def reject_second(path, index, item):
+        seen.append(index)
+        if index == 1:
+            raise StreamAbort("second item rejected")
+
+    with pytest.raises(StreamAbort):
+        client.query_stream("prompt", on_item=reject_second)
+    assert seen == [0, 1]
+    assert client.query_stream("prompt") == FULL
+    assert client.calls == 2
+
+
+def test_malformed_stream_aborts_and_caches_nothing(cache):
+
+    client = ScriptedClient(['[{"id": 1}}', FULL], cache)
+
+    with pytest.raises(StreamAbort):
+        client.query_stream("prompt")
+    assert client.query_stream("prompt") == FULL
+    assert client.calls == 2
+
+
+def test_transport_retry_replays_items_from_the_start(cache, monkeypatch):
+
+    monkeypatch.setattr(llm_client.time, "sleep", lambda seconds: None)
+    client = ScriptedClient([ConnectionError("connection reset"), FULL], cache)
+    seen = []
+
+    assert client.query_stream("prompt", on_item=lambda path, index, item: seen.append(index)) == FULL
+    assert seen == [0, 1]
+    assert client.calls == 2
+
+
+def test_cached_text_failing_item_checks_is_regenerated(cache):
+
+    client = ScriptedClient([SHORT, FULL], cache)
+    assert client.query_stream("prompt") == SHORT
+
+    def reject_first(path, index, item):
+        if item == {"id": 1} and client.calls == 1:
+            raise StreamAbort("stale")
+
+    assert client.query_stream("prompt", on_item=reject_first) == FULL
+    assert client.calls == 2
+
+
+def test_streaming_profile_stage_does_not_cache_invalid_profiles(cache):
+
+    invalid = json.dumps(dict(PROFILE, budget_inr_per_month="a lot"))
+    client = ScriptedClient([invalid, json.dumps(PROFILE)], cache)
+    extractor = ProfileExtractor(stream=True, extraction_mode="llm")
+    extractor._client = client
+
+    assert extractor.extract("An online shop") == PROFILE
+    assert client.calls == 2
+    # The valid profile is what got cached, so a rerun makes no request
+    assert extractor.extract("An online shop") == PROFILE
+    assert client.calls == 2
+
+
+def test_query_json_does_not_cache_truncated_objects(cache):
+
+    truncated = '{"name": "Shop", "tags": ["a", "b", "c'
+    client = ScriptedClient([truncated, '{"name": "Shop", "tags": ["a"]}'], cache)
+
+    assert client.query_json("prompt") == {"name": "Shop", "tags": ["a", "b"]}
+    assert client.query_json("prompt") == {"name": "Shop", "tags": ["a"]}
+    assert client.query_json("prompt") == {"name": "Shop", "tags": ["a"]}
+    assert client.calls == 2
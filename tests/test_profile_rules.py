@@ -0,0 +1,39 @@
+import pytest
+
+from profile_rules import FX_TO_INR, parse_budget
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("budget: 40000 per month", 40000),
+    ("Our budget : 40000 per month.", 40000),
+    ("Monthly budget for cloud: ₹80,000", 80000),
+    ("budget of 500 dollars", 500 * FX_TO_INR["USD"]),
+    ("₹6 lakh annual budget", 50000),
+    ("$5k per month budget", 5000 * FX_TO_INR["USD"]),
+    ("We spend about $3k a month on AWS", 3000 * FX_TO_INR["USD"]),
+])
+def test_parse_budget(text, expected):
+
+    assert parse_budget(text)[0] == expected
+
+
+@pytest.mark.parametrize("text", [
+    "We currently pay $2,000 per month costs for hosting; our budget is 50000 per month.",
+    "The $2,000 per month costs worry us. Monthly budget is 50000.",
+    "Hosting costs $2,000 per month costs, budget: 50000",
+])
+def test_current_costs_are_not_taken_as_the_budget(text):
+
+    assert parse_budget(text)[0] == 50000
+
+
+def test_budget_keyword_only_applies_to_the_adjacent_amount():
+
+    budget, score = parse_budget("We have a budget of Rs 90,000 but $2,000 per month costs are eating it")
+
+    assert (budget, score) == (90000, 1.0)
+
+
+def test_no_amount():
+
+    assert parse_budget("A small blog with no budget yet") == (None, 0.0)
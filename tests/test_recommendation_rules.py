@@ -0,0 +1,74 @@
+import pytest
+
+from billing_frame import BillingFrame
+from cost_analyzer import CostAnalyzer
+from recommendation_rules import ADVISORY_COUNT, RuleBasedRecommender, _RuleContext, _governance_recommendations
+from synthetic_billing import SyntheticBillingGenerator
+from validators import validate_recommendations
+
+PROFILE = {
+    "name": "Shop",
+    "budget_inr_per_month": 60000,
+    "description": "An online shop.",
+    "tech_stack": {"frontend": "React", "backend": "Django", "database": "PostgreSQL", "proxy": "Nginx", "hosting": "AWS"},
+    "non_functional_requirements": []
+}
+
+
+def _record(service, cost, resource_id="res-1", hours=720, usage_type="On-Demand"):
+
+    return {
+        "month": "2025-12",
+        "service": service,
+        "resource_id": resource_id,
+        "region": "ap-south-1",
+        "usage_type": usage_type,
+        "usage_quantity": hours,
+        "unit": "hours",
+        "cost_inr": cost,
+        "desc": f"{service} resource"
+    }
+
+
+BILLING = {
+    "empty": [],
+    "single_service": [_record("Compute", 30000.0)],
+    "single_idle_database": [_record("Database", 8000.0, hours=100)],
+    "normal": SyntheticBillingGenerator(seed=11).generate(PROFILE)
+}
+
+
+@pytest.mark.parametrize("case", sorted(BILLING))
+def test_rules_report_passes_the_report_schema(case):
+
+    report = CostAnalyzer(recommendation_mode="rules").analyze(PROFILE, BILLING[case])
+
+    assert validate_recommendations(report) == (True, "")
+    advisory = [r for r in report["recommendations"] if r.get("advisory")]
+    assert all(r["potential_savings"] == 0 for r in advisory)
+    rule_savings = sum(r["potential_savings"] for r in report["recommendations"] if not r.get("advisory"))
+    assert report["summary"]["total_potential_savings"] == pytest.approx(rule_savings)
+
+
+def test_advisories_use_real_service_spend():
+
+    ctx = _RuleContext(BillingFrame.from_records(BILLING["single_service"]), {"total_cost": 30000.0})
+    advisories = _governance_recommendations(ctx, PROFILE)
+
+    assert len(advisories) == ADVISORY_COUNT
+    costs = {r["title"]: r["current_cost"] for r in advisories}
+    assert costs["Clean Up Unattached Volumes, Snapshots and IPs"] == 0
+    assert costs["Set Budget Alerts and Anomaly Detection"] == 30000.0
+
+
+def test_idle_rule_reports_the_idle_service():
+
+    report = RuleBasedRecommender().recommend(PROFILE, BILLING["single_idle_database"], {"total_cost": 8000.0})
+    idle = [r for r in report["recommendations"] if r["title"].startswith("Stop or Schedule Idle")]
+    assert [r["service"] for r in idle] == ["Database"]
+
+
+def test_min_recommendations_beyond_the_advisories_is_rejected():
+
+    with pytest.raises(ValueError):
+        RuleBasedRecommender(min_recommendations=ADVISORY_COUNT + 1)
@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+import pytest
+
+import stage_cache
+from stage_cache import StageCache, stage_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(stage_cache, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+
+    caches = []
+
+    def make(**kwargs):
+        cache = StageCache(path=str(tmp_path / "stage_cache.sqlite3"), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def test_stage_key_depends_on_every_input():
+
+    assert stage_key("profile", text="a", model="m") == stage_key("profile", model="m", text="a")
+    assert stage_key("profile", text="a", model="m") != stage_key("profile", text="a", model="n")
+    assert stage_key("profile", text="a") != stage_key("billing", text="a")
+
+
+def test_least_recently_used_entries_are_evicted(make_cache, clock):
+
+    cache = make_cache(max_entries=2)
+    for name in ("a", "b"):
+        cache.put(name, "profile", {"name": name})
+        clock.value += 1
+    cache.get("a")
+    clock.value += 1
+    cache.put("c", "profile", {"name": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"name": "a"} and cache.get("c") == {"name": "c"}
+    assert cache.evictions == 1
+
+
+def test_entries_expire_after_ttl(make_cache, clock):
+
+    cache = make_cache(ttl_seconds=60)
+    cache.put("a", "profile", {"name": "a"})
+    clock.value += 59
+    assert cache.get("a") == {"name": "a"}
+    clock.value += 2
+
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == {}
+
+
+def test_run_computes_once_and_respects_accept(make_cache):
+
+    cache = make_cache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    assert cache.run("profile", {"text": "a"}, compute) == ({"n": 1}, False)
+    assert cache.run("profile", {"text": "a"}, compute) == ({"n": 1}, True)
+
+    rejected = cache.run("billing", {"profile": "a"}, compute, accept=lambda value: False)
+    assert rejected == ({"n": 2}, False)
+    assert cache.run("billing", {"profile": "a"}, compute) == ({"n": 3}, False)
+    assert len(calls) == 3
+
+
+def test_invalidate_drops_the_stage_and_everything_after_it(make_cache):
+
+    cache = make_cache()
+    for stage in stage_cache.STAGES:
+        cache.put(stage, stage, {"stage": stage})
+
+    assert cache.invalidate("billing") == 2
+    assert cache.stats()["entries"] == {"profile": 1}
+    assert cache.invalidate() == 1
+
+
+def test_invalidate_rejects_unknown_stages(make_cache):
+
+    with pytest.raises(ValueError, match="Unknown stage"):
+        make_cache().invalidate("report")
@@ -0,0 +1,55 @@
+import csv
+
+import numpy as np
+import pytest
+
+from billing_ingest import BILLING_FIELDS, iter_billing_chunks
+from synthetic_billing import SERVICE_CATALOG, SyntheticBillingGenerator
+
+PROFILE = {"name": "Shop", "budget_inr_per_month": 80000, "tech_stack": {"database": "PostgreSQL", "frontend": "React"}}
+N_RECORDS = 2500
+CHUNK_SIZE = 1000
+
+
+def _expected(generator):
+
+    # stream_to_file draws the same chunks; costs are written rounded to paise
+    costs = []
+    for chunk_index, offset in enumerate(range(0, N_RECORDS, CHUNK_SIZE)):
+        size = min(CHUNK_SIZE, N_RECORDS - offset)
+        frame = generator.generate_frame(PROFILE, size, chunk_index=chunk_index, total_records=N_RECORDS, with_desc=False)
+        costs.append(frame.measures["cost_inr"])
+    return np.concatenate(costs)
+
+
+@pytest.mark.parametrize("filename", ["billing.csv", "billing.csv.gz", "billing.jsonl", "billing.jsonl.gz"])
+def test_stream_to_file_round_trips_through_ingest(tmp_path, filename):
+
+    generator = SyntheticBillingGenerator(seed=7, service_weights={"Compute": 2, "Monitoring": 1, "Storage": 1})
+    path = str(tmp_path / filename)
+
+    assert generator.stream_to_file(PROFILE, path, N_RECORDS, chunk_size=CHUNK_SIZE) == N_RECORDS
+
+    records = [record for chunk in iter_billing_chunks(path) for record in chunk]
+    expected = _expected(generator)
+    assert len(records) == N_RECORDS
+    assert sum(record["cost_inr"] for record in records) == pytest.approx(float(np.round(expected, 2).sum()))
+    # "Metrics, logs and alerting" contains commas and must come back as one field
+    assert {record["desc"] for record in records} <= {entry[4] for entry in SERVICE_CATALOG.values()}
+    assert all(set(record) == set(BILLING_FIELDS) for record in records)
+
+
+def test_csv_quotes_labels_like_csv_writer(tmp_path):
+
+    region = 'eu "west", 1'
+    generator = SyntheticBillingGenerator(seed=3, service_weights={"Monitoring": 1}, region_weights={region: 1})
+    path = tmp_path / "billing.csv"
+    generator.stream_to_file(PROFILE, str(path), 50)
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == BILLING_FIELDS
+    assert len(rows) == 51
+    assert all(len(row) == len(BILLING_FIELDS) for row in rows)
+    assert {row[3] for row in rows[1:]} == {region}
+    assert {row[8] for row in rows[1:]} == {"Metrics, logs and alerting"}
@@ -0,0 +1,106 @@
+import pytest
+
+from validators import (
+    ANALYSIS_KEYS,
+    SUMMARY_KEYS,
+    collect_billing_errors,
+    collect_recommendation_errors,
+    validate_billing,
+    validate_recommendations,
+)
+
+UNHASHABLE = [["2024-01"], {"month": "2024-01"}]
+
+
+def _record(**overrides):
+
+    record = {
+        "month": "2024-01",
+        "service": "Compute",
+        "resource_id": "vm-1",
+        "region": "ap-south-1",
+        "usage_type": "Linux/UNIX",
+        "usage_quantity": 720,
+        "unit": "hours",
+        "cost_inr": 1500.0,
+        "desc": "App server"
+    }
+    record.update(overrides)
+    return record
+
+
+def _report(**overrides):
+
+    recommendation = {
+        "title": "Rightsize",
+        "service": "Compute",
+        "current_cost": 1500.0,
+        "potential_savings": 300.0,
+        "recommendation_type": "rightsizing",
+        "description": "Use a smaller instance",
+        "implementation_effort": "low",
+        "risk_level": "low",
+        "steps": [],
+        "cloud_providers": []
+    }
+    recommendation.update(overrides)
+    return {
+        "analysis": {key: 0 for key in ANALYSIS_KEYS},
+        "recommendations": [recommendation],
+        "summary": {key: 0 for key in SUMMARY_KEYS}
+    }
+
+
+def test_clean_billing_passes():
+
+    assert validate_billing([_record(), _record(month="2024-02")], None, None) == (True, "")
+
+
+@pytest.mark.parametrize("month", UNHASHABLE)
+def test_unhashable_month_is_reported_by_index(month):
+
+    records = [_record(), _record(month=month)]
+    assert validate_billing(records, None, None) == (False, "Record 1: month must be in YYYY-MM format")
+    assert collect_billing_errors(records) == [(1, "Record 1: month must be in YYYY-MM format")]
+
+
+@pytest.mark.parametrize("cost", [["1500"], {"amount": 1500}, "1500"])
+def test_non_numeric_cost_is_reported_by_index(cost):
+
+    ok, message = validate_billing([_record(cost_inr=cost)], None, None)
+    assert not ok
+    assert message.startswith("Record 0: cost_inr must be a number")
+
+
+@pytest.mark.parametrize("field", ["implementation_effort", "risk_level"])
+@pytest.mark.parametrize("value", UNHASHABLE + [None, 3])
+def test_non_string_level_is_reported_by_index(field, value):
+
+    expected = f"Recommendation 0: {field} must be 'low', 'medium', or 'high'"
+    report = _report(**{field: value})
+    assert validate_recommendations(report, None, None) == (False, expected)
+    assert collect_recommendation_errors(report) == [(0, expected)]
+
+
+def test_clean_report_passes():
+
+    assert validate_recommendations(_report(), None, None) == (True, "")
+
+
+@pytest.mark.parametrize("field", ["analysis", "summary"])
+@pytest.mark.parametrize("value", [5, None, "text", ["total_monthly_cost"]])
+def test_non_object_sections_are_reported(field, value):
+
+    report = dict(_report(), **{field: value})
+    expected = (-1, f"'{field}' must be an object")
+    assert collect_recommendation_errors(report) == [expected]
+    assert validate_recommendations(report, None, None) == (False, expected[1])
+
+
+def test_every_section_error_is_collected():
+
+    report = {"analysis": 5, "recommendations": [], "summary": None}
+    assert collect_recommendation_errors(report) == [
+        (-1, "'analysis' must be an object"),
+        (-1, "'summary' must be an object")
+    ]
@@ -5,6 +5,8 @@ import os
 from pathlib import Path
 from typing import Any, Dict
 
+from report_writers import write_json
+
 
 def load_env_file(env_path: str = ".env") -> Dict[str, str]:
     
@@ -20,14 +22,33 @@ def load_env_file(env_path: str = ".env") -> Dict[str, str]:
     return env_vars
 
 
-def save_json(data: Dict[str, Any], filepath: str) -> bool:
+_config = None
+
+
+def load_config(env_path: str = ".env") -> Dict[str, str]:
+    """Read .env once per process and export it to os.environ (existing variables win)."""
+    global _config
+    if _config is None:
+        from dotenv import dotenv_values
+        
+        _config = {key: value for key, value in dotenv_values(env_path).items() if value is not None}
+        for key, value in _config.items():
+            os.environ.setdefault(key, value)
+    return _config
+
+
+def save_json(data: Dict[str, Any], filepath: str, compact: bool = None) -> bool:
+    """Stream data to filepath as JSON; compact drops the indentation (default: JSON_COMPACT env)."""
+    if compact is None:
+        compact = os.getenv("JSON_COMPACT", "").lower() in ("1", "true", "yes")
     
     try:
         # Ensure directory exists
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        if os.path.dirname(filepath):
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
         with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+            write_json(data, f, compact=compact)
         return True
     except Exception as e:
         print(f"Error saving JSON to {filepath}: {str(e)}")
@@ -48,7 +69,8 @@ def load_json(filepath: str) -> Dict[str, Any]:
 def save_text(content: str, filepath: str) -> bool:
     
     try:
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        if os.path.dirname(filepath):
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
         with open(filepath, 'w') as f:
             f.write(content)
         return True
@@ -87,24 +109,14 @@ def ensure_json_string(data: Any) -> str:
 
 def parse_json_response(response_text: str) -> Dict[str, Any]:
    
-    # Try direct parsing first
+    # Shared extractor: fences, prose with braces, trailing commas and truncated output
+    from json_extract import extract_json
+    
     try:
-        return json.loads(response_text)
+        parsed = extract_json(response_text, prefer=dict)
     except json.JSONDecodeError:
-        pass
-    
-    # Try to extract JSON from response (between first { and last })
-    start_idx = response_text.find('{')
-    end_idx = response_text.rfind('}')
-    
-    if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-        try:
-            json_str = response_text[start_idx:end_idx + 1]
-            return json.loads(json_str)
-        except json.JSONDecodeError:
-            pass
-    
-    return {}
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
 
 
 def create_project_structure():
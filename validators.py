@@ -1,28 +1,165 @@
 
 import json
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from billing_frame import BillingFrame
+
+NUMBER_TYPES = (int, float)
+LEVELS = ("low", "medium", "high")
+TECH_STACK_KEYS = ("frontend", "backend", "database", "proxy", "hosting")
+
+# (index, message); index -1 marks dataset-level errors such as record counts
+IndexedError = Tuple[int, str]
+Message = Union[str, Callable[[Any], str]]
+
+
+class CompiledSchema:
+    """Required keys plus ordered field checks, declared once and reused for every object.
+
+    Message templates may use {idx}, {missing} and {type}; a callable message
+    receives the offending value.
+    """
+
+    def __init__(
+        self,
+        required: Sequence[str],
+        checks: Sequence[Tuple[str, Callable[[Any], bool], Message]],
+        missing_message: str
+    ):
+
+        self.required = tuple(required)
+        self.required_set = frozenset(required)
+        self.checks = tuple(checks)
+        self.missing_message = missing_message
+
+    def _format(self, message: Message, value: Any, idx: int) -> str:
+
+        if callable(message):
+            return message(value)
+        return message.format(idx=idx, type=type(value))
+
+    def first_error(self, obj: Dict[str, Any], idx: int = 0) -> Optional[str]:
+
+        if not self.required_set.issubset(obj.keys()):
+            missing = [key for key in self.required if key not in obj]
+            return self.missing_message.format(idx=idx, missing=", ".join(missing))
+
+        for field, predicate, message in self.checks:
+            value = obj.get(field)
+            if not predicate(value):
+                return self._format(message, value, idx)
+        return None
+
+    def all_errors(self, obj: Dict[str, Any], idx: int = 0) -> List[str]:
+
+        errors = []
+        if not self.required_set.issubset(obj.keys()):
+            missing = [key for key in self.required if key not in obj]
+            errors.append(self.missing_message.format(idx=idx, missing=", ".join(missing)))
+
+        for field, predicate, message in self.checks:
+            if field not in obj:
+                continue
+            value = obj[field]
+            if not predicate(value):
+                errors.append(self._format(message, value, idx))
+        return errors
+
+
+def _is_number(value: Any) -> bool:
+
+    return isinstance(value, NUMBER_TYPES)
+
+
+def _is_month(value: Any) -> bool:
+
+    return isinstance(value, str) and len(value) == 7
+
+
+def _is_level(value: Any) -> bool:
+
+    # Models sometimes answer with a list or object here; those must fail the check, not raise
+    return isinstance(value, str) and value in LEVELS
+
+
+def _missing_tech_key(value: Any) -> Optional[str]:
+
+    if not isinstance(value, dict):
+        return None
+    for key in TECH_STACK_KEYS:
+        if key not in value:
+            return key
+    return None
+
+
+PROFILE_SCHEMA = CompiledSchema(
+    required=["name", "budget_inr_per_month", "description", "tech_stack", "non_functional_requirements"],
+    checks=[
+        ("name", lambda v: isinstance(v, str), "'name' must be a string"),
+        ("budget_inr_per_month", _is_number, "'budget_inr_per_month' must be a number"),
+        ("description", lambda v: isinstance(v, str), "'description' must be a string"),
+        ("tech_stack", lambda v: isinstance(v, dict), "'tech_stack' must be a dictionary"),
+        ("tech_stack", lambda v: _missing_tech_key(v) is None, lambda v: f"tech_stack missing key: {_missing_tech_key(v)}"),
+        ("non_functional_requirements", lambda v: isinstance(v, list), "'non_functional_requirements' must be a list"),
+    ],
+    missing_message="Missing required keys: {missing}"
+)
+
+BILLING_RECORD_SCHEMA = CompiledSchema(
+    required=["month", "service", "resource_id", "region", "usage_type", "usage_quantity", "unit", "cost_inr", "desc"],
+    checks=[
+        ("cost_inr", _is_number, "Record {idx}: cost_inr must be a number, got {type}"),
+        ("month", _is_month, "Record {idx}: month must be in YYYY-MM format"),
+    ],
+    missing_message="Record {idx} missing fields: {missing}"
+)
+
+RECOMMENDATION_SCHEMA = CompiledSchema(
+    required=[
+        "title", "service", "current_cost", "potential_savings", "recommendation_type",
+        "description", "implementation_effort", "risk_level", "steps", "cloud_providers"
+    ],
+    checks=[
+        ("implementation_effort", _is_level,
+         "Recommendation {idx}: implementation_effort must be 'low', 'medium', or 'high'"),
+        ("risk_level", _is_level, "Recommendation {idx}: risk_level must be 'low', 'medium', or 'high'"),
+        ("steps", lambda v: isinstance(v, list), "Recommendation {idx}: steps must be a list"),
+        ("cloud_providers", lambda v: isinstance(v, list), "Recommendation {idx}: cloud_providers must be a list"),
+    ],
+    missing_message="Recommendation {idx} missing fields: {missing}"
+)
+
+REPORT_KEYS = ("analysis", "recommendations", "summary")
+ANALYSIS_KEYS = ("total_monthly_cost", "budget", "budget_variance", "is_over_budget", "service_costs", "high_cost_services")
+SUMMARY_KEYS = ("total_potential_savings", "savings_percentage", "recommendations_count", "high_impact_recommendations")
+
+
+def _parse(data: Any) -> Any:
+
+    # If data is a string, parse it
+    if isinstance(data, str):
+        return json.loads(data)
+    return data
 
 
 def validate_json_structure(data: Any, required_keys: List[str]) -> Tuple[bool, str]:
-   
+
     try:
-        # If data is a string, parse it
-        if isinstance(data, str):
-            parsed_data = json.loads(data)
-        else:
-            parsed_data = data
-        
+        parsed_data = _parse(data)
+
         # Check if it's a dictionary
         if not isinstance(parsed_data, dict):
             return False, "Response must be a JSON object (dict), not a list or primitive"
-        
+
         # Check required keys
         missing_keys = [key for key in required_keys if key not in parsed_data]
         if missing_keys:
             return False, f"Missing required keys: {', '.join(missing_keys)}"
-        
+
         return True, ""
-    
+
     except json.JSONDecodeError as e:
         return False, f"Invalid JSON: {str(e)}"
     except Exception as e:
@@ -30,174 +167,260 @@ def validate_json_structure(data: Any, required_keys: List[str]) -> Tuple[bool,
 
 
 def validate_profile(data: Any) -> Tuple[bool, str]:
-   
+
     try:
-        if isinstance(data, str):
-            parsed_data = json.loads(data)
-        else:
-            parsed_data = data
-        
+        parsed_data = _parse(data)
+
         if not isinstance(parsed_data, dict):
             return False, "Profile must be a JSON object (dict)"
-        
-        # Check required keys
-        required_keys = ["name", "budget_inr_per_month", "description", "tech_stack", "non_functional_requirements"]
-        missing_keys = [key for key in required_keys if key not in parsed_data]
-        if missing_keys:
-            return False, f"Missing required keys: {', '.join(missing_keys)}"
-        
-        # Validate types
-        if not isinstance(parsed_data.get("name"), str):
-            return False, "'name' must be a string"
-        
-        if not isinstance(parsed_data.get("budget_inr_per_month"), (int, float)):
-            return False, "'budget_inr_per_month' must be a number"
-        
-        if not isinstance(parsed_data.get("description"), str):
-            return False, "'description' must be a string"
-        
-        if not isinstance(parsed_data.get("tech_stack"), dict):
-            return False, "'tech_stack' must be a dictionary"
-        
-        # Validate tech_stack keys
-        expected_tech_keys = ["frontend", "backend", "database", "proxy", "hosting"]
-        for key in expected_tech_keys:
-            if key not in parsed_data["tech_stack"]:
-                return False, f"tech_stack missing key: {key}"
-        
-        if not isinstance(parsed_data.get("non_functional_requirements"), list):
-            return False, "'non_functional_requirements' must be a list"
-        
+
+        error = PROFILE_SCHEMA.first_error(parsed_data)
+        if error:
+            return False, error
+
         return True, ""
-    
+
     except json.JSONDecodeError as e:
         return False, f"Invalid JSON: {str(e)}"
     except Exception as e:
         return False, f"Validation error: {str(e)}"
 
 
-def validate_billing(data: Any) -> Tuple[bool, str]:
-    
-    try:
-        if isinstance(data, str):
-            parsed_data = json.loads(data)
+def _billing_records(parsed_data: Any) -> Tuple[Any, Optional[str]]:
+
+    # Handle BillingFrame, plain arrays and objects with a billing_records key
+    if isinstance(parsed_data, BillingFrame):
+        return parsed_data, None
+    if isinstance(parsed_data, dict):
+        if "billing_records" in parsed_data:
+            records = parsed_data["billing_records"]
         else:
-            parsed_data = data
-        
-        # Handle both array and object with billing_records key
-        if isinstance(parsed_data, dict):
-            if "billing_records" in parsed_data:
-                records = parsed_data["billing_records"]
-            else:
-                return False, "Billing data must be an array or object with 'billing_records' key"
-        elif isinstance(parsed_data, list):
-            records = parsed_data
+            return None, "Billing data must be an array or object with 'billing_records' key"
+    elif isinstance(parsed_data, list):
+        records = parsed_data
+    else:
+        return None, "Billing data must be an array or object"
+
+    if not isinstance(records, list):
+        return None, "'billing_records' must be a list"
+    return records, None
+
+
+def validate_billing_record(record: Any, idx: int = 0) -> Tuple[bool, str]:
+    """Check one billing record, e.g. as it arrives in a streamed response."""
+    if not isinstance(record, dict):
+        return False, f"Record {idx} is not a dictionary"
+    message = BILLING_RECORD_SCHEMA.first_error(record, idx)
+    if message:
+        return False, message
+    return True, ""
+
+
+def _count_errors(count: int, min_records: Optional[int], max_records: Optional[int]) -> List[IndexedError]:
+
+    if min_records is not None and count < min_records:
+        return [(-1, f"Expected at least {min_records} billing records, got {count}")]
+    if max_records is not None and count > max_records:
+        return [(-1, f"Expected at most {max_records} billing records, got {count}")]
+    return []
+
+
+def _chunk_is_clean(chunk: List[Any]) -> bool:
+    """Whole-chunk checks using set and map operations instead of a per-record walk."""
+    if not all(type(record) is dict for record in chunk):
+        return False
+    if not all(map(BILLING_RECORD_SCHEMA.required_set.issubset, chunk)):
+        return False
+    if not {type(record["cost_inr"]) for record in chunk} <= {int, float}:
+        return False
+    # Only hash months once they are known to be strings; a list value would raise
+    if not {type(record["month"]) for record in chunk} <= {str}:
+        return False
+    return all(_is_month(month) for month in {record["month"] for record in chunk})
+
+
+def _record_errors(chunk: List[Any], offset: int, collect_all: bool) -> List[IndexedError]:
+
+    errors = []
+    for position, record in enumerate(chunk):
+        idx = offset + position
+        if not isinstance(record, dict):
+            errors.append((idx, f"Record {idx} is not a dictionary"))
+        elif collect_all:
+            errors.extend((idx, message) for message in BILLING_RECORD_SCHEMA.all_errors(record, idx))
         else:
-            return False, "Billing data must be an array or object"
-        
-        if not isinstance(records, list):
-            return False, "'billing_records' must be a list"
-        
-        if len(records) < 12:
-            return False, f"Expected at least 12 billing records, got {len(records)}"
-        
-        if len(records) > 20:
-            return False, f"Expected at most 20 billing records, got {len(records)}"
-        
-        # Validate each record has required fields
-        required_fields = ["month", "service", "resource_id", "region", "usage_type", "usage_quantity", "unit", "cost_inr", "desc"]
-        for idx, record in enumerate(records):
-            if not isinstance(record, dict):
-                return False, f"Record {idx} is not a dictionary"
-            
-            missing = [f for f in required_fields if f not in record]
-            if missing:
-                return False, f"Record {idx} missing fields: {', '.join(missing)}"
-            
-            # Validate cost_inr is a number
-            if not isinstance(record.get("cost_inr"), (int, float)):
-                return False, f"Record {idx}: cost_inr must be a number, got {type(record.get('cost_inr'))}"
-            
-            # Validate month format
-            if not isinstance(record.get("month"), str) or len(record["month"]) != 7:
-                return False, f"Record {idx}: month must be in YYYY-MM format"
-        
-        return True, ""
-    
+            message = BILLING_RECORD_SCHEMA.first_error(record, idx)
+            if message:
+                errors.append((idx, message))
+        if errors and not collect_all:
+            break
+    return errors
+
+
+def _frame_errors(frame: BillingFrame, max_errors: Optional[int]) -> List[IndexedError]:
+
+    # Columns are already typed; only month categories and non-finite costs can be wrong
+    errors = []
+    bad_months = [code for code, month in enumerate(frame.categories["month"]) if not _is_month(month)]
+    bad_rows = np.isin(frame.codes["month"], bad_months) if bad_months else np.zeros(len(frame), dtype=bool)
+    bad_costs = ~np.isfinite(frame.measures["cost_inr"])
+
+    for idx in np.flatnonzero(bad_rows | bad_costs).tolist():
+        if bad_costs[idx]:
+            errors.append((idx, f"Record {idx}: cost_inr must be a number, got {frame.measures['cost_inr'][idx]}"))
+        if bad_rows[idx]:
+            errors.append((idx, f"Record {idx}: month must be in YYYY-MM format"))
+        if max_errors is not None and len(errors) >= max_errors:
+            break
+    return errors
+
+
+def collect_billing_errors(
+    data: Any,
+    min_records: Optional[int] = None,
+    max_records: Optional[int] = None,
+    chunk_size: int = 100000,
+    max_errors: Optional[int] = None
+) -> List[IndexedError]:
+    """All billing errors as (record index, message), checked chunk by chunk.
+
+    Clean chunks are accepted by whole-chunk set/map checks; only chunks that
+    fail are walked record by record to locate the offending indices.
+    """
+    try:
+        records, error = _billing_records(_parse(data))
     except json.JSONDecodeError as e:
-        return False, f"Invalid JSON: {str(e)}"
+        return [(-1, f"Invalid JSON: {str(e)}")]
+    if error:
+        return [(-1, error)]
+
+    errors = _count_errors(len(records), min_records, max_records)
+    if isinstance(records, BillingFrame):
+        return errors + _frame_errors(records, max_errors)
+
+    collect_all = max_errors is None or max_errors > 1
+    for offset in range(0, len(records), chunk_size):
+        if max_errors is not None and len(errors) >= max_errors:
+            break
+        chunk = records[offset:offset + chunk_size]
+        if not _chunk_is_clean(chunk):
+            errors.extend(_record_errors(chunk, offset, collect_all))
+
+    return errors if max_errors is None else errors[:max_errors]
+
+
+def validate_billing(data: Any, min_records: Optional[int] = 12, max_records: Optional[int] = 20) -> Tuple[bool, str]:
+    """Fail-fast billing validation; pass None to lift either record-count limit."""
+    try:
+        errors = collect_billing_errors(data, min_records, max_records, max_errors=1)
+        if errors:
+            return False, errors[0][1]
+        return True, ""
+
     except Exception as e:
         return False, f"Validation error: {str(e)}"
 
 
-def validate_recommendations(data: Any) -> Tuple[bool, str]:
-   
-    try:
-        if isinstance(data, str):
-            parsed_data = json.loads(data)
-        else:
-            parsed_data = data
-        
-        if not isinstance(parsed_data, dict):
-            return False, "Report must be a JSON object"
-        
-        # Check top-level keys
-        required_top_keys = ["analysis", "recommendations", "summary"]
-        missing_keys = [key for key in required_top_keys if key not in parsed_data]
-        if missing_keys:
-            return False, f"Missing required keys: {', '.join(missing_keys)}"
-        
-        # Validate analysis object
-        analysis = parsed_data.get("analysis", {})
-        analysis_keys = ["total_monthly_cost", "budget", "budget_variance", "is_over_budget", "service_costs", "high_cost_services"]
-        for key in analysis_keys:
+def _report_errors(
+    parsed_data: Any,
+    min_recommendations: Optional[int],
+    max_recommendations: Optional[int],
+    collect_all: bool
+) -> List[IndexedError]:
+
+    if not isinstance(parsed_data, dict):
+        return [(-1, "Report must be a JSON object")]
+
+    # Check top-level keys
+    missing_keys = [key for key in REPORT_KEYS if key not in parsed_data]
+    if missing_keys:
+        return [(-1, f"Missing required keys: {', '.join(missing_keys)}")]
+
+    errors = []
+    analysis = parsed_data.get("analysis")
+    if not isinstance(analysis, dict):
+        errors.append((-1, "'analysis' must be an object"))
+        if not collect_all:
+            return errors
+    else:
+        for key in ANALYSIS_KEYS:
             if key not in analysis:
-                return False, f"analysis missing key: {key}"
-        
-        # Validate recommendations array
-        if not isinstance(parsed_data.get("recommendations"), list):
-            return False, "'recommendations' must be a list"
-        
-        if len(parsed_data["recommendations"]) < 6:
-            return False, f"Expected at least 6 recommendations, got {len(parsed_data['recommendations'])}"
-        
-        if len(parsed_data["recommendations"]) > 10:
-            return False, f"Expected at most 10 recommendations, got {len(parsed_data['recommendations'])}"
-        
-        # Validate each recommendation
-        req_fields = ["title", "service", "current_cost", "potential_savings", "recommendation_type", "description", "implementation_effort", "risk_level", "steps", "cloud_providers"]
-        for idx, rec in enumerate(parsed_data["recommendations"]):
-            if not isinstance(rec, dict):
-                return False, f"Recommendation {idx} is not a dictionary"
-            
-            missing = [f for f in req_fields if f not in rec]
-            if missing:
-                return False, f"Recommendation {idx} missing fields: {', '.join(missing)}"
-            
-            # Validate effort and risk levels
-            if rec.get("implementation_effort") not in ["low", "medium", "high"]:
-                return False, f"Recommendation {idx}: implementation_effort must be 'low', 'medium', or 'high'"
-            
-            if rec.get("risk_level") not in ["low", "medium", "high"]:
-                return False, f"Recommendation {idx}: risk_level must be 'low', 'medium', or 'high'"
-            
-            if not isinstance(rec.get("steps"), list):
-                return False, f"Recommendation {idx}: steps must be a list"
-            
-            if not isinstance(rec.get("cloud_providers"), list):
-                return False, f"Recommendation {idx}: cloud_providers must be a list"
-        
-        # Validate summary object
-        summary = parsed_data.get("summary", {})
-        summary_keys = ["total_potential_savings", "savings_percentage", "recommendations_count", "high_impact_recommendations"]
-        for key in summary_keys:
-            if key not in summary:
-                return False, f"summary missing key: {key}"
-        
+                errors.append((-1, f"analysis missing key: {key}"))
+                if not collect_all:
+                    return errors
+
+    recommendations = parsed_data.get("recommendations")
+    if not isinstance(recommendations, list):
+        return errors + [(-1, "'recommendations' must be a list")]
+
+    count = len(recommendations)
+    if min_recommendations is not None and count < min_recommendations:
+        errors.append((-1, f"Expected at least {min_recommendations} recommendations, got {count}"))
+    elif max_recommendations is not None and count > max_recommendations:
+        errors.append((-1, f"Expected at most {max_recommendations} recommendations, got {count}"))
+    if errors and not collect_all:
+        return errors
+
+    for idx, rec in enumerate(recommendations):
+        if not isinstance(rec, dict):
+            errors.append((idx, f"Recommendation {idx} is not a dictionary"))
+        elif collect_all:
+            errors.extend((idx, message) for message in RECOMMENDATION_SCHEMA.all_errors(rec, idx))
+        else:
+            message = RECOMMENDATION_SCHEMA.first_error(rec, idx)
+            if message:
+                errors.append((idx, message))
+        if errors and not collect_all:
+            return errors
+
+    summary = parsed_data.get("summary")
+    if not isinstance(summary, dict):
+        errors.append((-1, "'summary' must be an object"))
+        return errors
+    for key in SUMMARY_KEYS:
+        if key not in summary:
+            errors.append((-1, f"summary missing key: {key}"))
+            if not collect_all:
+                return errors
+
+    return errors
+
+
+def validate_recommendation(recommendation: Any, idx: int = 0) -> Tuple[bool, str]:
+    """Check one recommendation, e.g. as it arrives in a streamed response."""
+    if not isinstance(recommendation, dict):
+        return False, f"Recommendation {idx} is not a dictionary"
+    message = RECOMMENDATION_SCHEMA.first_error(recommendation, idx)
+    if message:
+        return False, message
+    return True, ""
+
+
+def collect_recommendation_errors(
+    data: Any,
+    min_recommendations: Optional[int] = None,
+    max_recommendations: Optional[int] = None
+) -> List[IndexedError]:
+    """Every report error as (recommendation index, message); -1 for report-level errors."""
+    try:
+        return _report_errors(_parse(data), min_recommendations, max_recommendations, collect_all=True)
+    except json.JSONDecodeError as e:
+        return [(-1, f"Invalid JSON: {str(e)}")]
+
+
+def validate_recommendations(
+    data: Any,
+    min_recommendations: Optional[int] = 6,
+    max_recommendations: Optional[int] = 10
+) -> Tuple[bool, str]:
+    """Fail-fast report validation; pass None to lift either recommendation-count limit."""
+    try:
+        errors = _report_errors(_parse(data), min_recommendations, max_recommendations, collect_all=False)
+        if errors:
+            return False, errors[0][1]
         return True, ""
-    
+
     except json.JSONDecodeError as e:
         return False, f"Invalid JSON: {str(e)}"
     except Exception as e:
         return False, f"Validation error: {str(e)}"
-